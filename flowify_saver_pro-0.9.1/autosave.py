@@ -0,0 +1,148 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+import sqlite3
+import time
+from collections import deque
+from bpy.app.handlers import persistent
+
+from .notifications import show_notification
+from .metrics import save_metrics
+from .watcher import directory_watcher
+from .replication import replication_spec
+from .core import FlowifyCore, project_coordinator, replicator
+
+def project_settings():
+    """Auto-save settings for the open file, taken from the first scene that enables auto-save."""
+    for scene in bpy.data.scenes:
+        if scene.flowify_props.auto_save_enabled:
+            return scene.flowify_props, scene
+    return bpy.context.scene.flowify_props, bpy.context.scene
+
+class AutoSaveScheduler:
+    """Decides whether an auto-save tick saves, skips an unchanged file, or waits for the user to pause."""
+    SKIP_REASONS = {'SKIPPED_CLEAN': "no changes since the last backup", 'DEFERRED': "user was working"}
+
+    def __init__(self):
+        self.last_activity = time.monotonic()
+        self.changed_since_backup = True
+        self.deferred_since = None
+        self.decisions = deque(maxlen=200)
+        self.counts = {'SAVED': 0, 'SKIPPED_CLEAN': 0, 'DEFERRED': 0, 'FORCED': 0}
+        self.bytes_avoided = 0
+
+    def _record(self, decision, nbytes=0):
+        self.decisions.append((datetime.datetime.now(), decision, nbytes))
+        self.counts[decision] += 1
+        self.bytes_avoided += nbytes
+        if decision in self.SKIP_REASONS:
+            save_metrics.add(decision, reason=self.SKIP_REASONS[decision])
+
+    def note_activity(self):
+        self.last_activity = time.monotonic()
+        self.changed_since_backup = True
+
+    def note_saved(self):
+        self.changed_since_backup = False
+        self.deferred_since = None
+
+    @staticmethod
+    def _modal_running():
+        for window in bpy.context.window_manager.windows:
+            if getattr(window, 'modal_operators', None):
+                return True
+        return False
+
+    def tick(self, props):
+        """Run one auto-save decision and return the delay until the next tick."""
+        interval = props.auto_save_interval * 60
+        now = time.monotonic()
+
+        # save_as_mainfile(copy=True) leaves is_dirty set, so also require an edit since the last backup
+        if not bpy.data.is_dirty or not self.changed_since_backup:
+            self._record('SKIPPED_CLEAN', save_metrics.last_bytes(props.auto_save_mode, bpy.data.filepath))
+            self.deferred_since = None
+            project_coordinator.backup_libraries(props)
+            return interval
+
+        idle = now - self.last_activity
+        busy = idle < props.idle_grace_period or self._modal_running()
+        if busy:
+            if self.deferred_since is None:
+                self.deferred_since = now
+            waited = now - self.deferred_since
+            if waited < props.max_deferral * 60:
+                self._record('DEFERRED')
+                return max(1.0, min(props.idle_grace_period - idle, props.max_deferral * 60 - waited))
+
+        if bpy.ops.wm.flowify_auto_save() == {'FINISHED'}:
+            self._record('FORCED' if busy else 'SAVED')
+            self.note_saved()
+        return interval
+
+autosave_scheduler = AutoSaveScheduler()
+
+def autosave_timer():
+    if not bpy.data.is_saved or not bpy.data.filepath:
+        show_notification("Cannot auto-save: File is not saved", icon='WARNING')
+        return 60
+    props = project_settings()[0]
+    if props.auto_save_enabled:
+        return autosave_scheduler.tick(props)
+    return props.auto_save_interval * 60
+
+def journal_recovery_timer():
+    """Replay the journal shortly after startup, in case a crash interrupted a save."""
+    try:
+        finished, rolled_back = FlowifyCore.recover_journal()
+    except sqlite3.Error:
+        return None
+    if finished or rolled_back:
+        show_notification(f"Recovered {finished} interrupted saves, discarded {rolled_back} incomplete ones",
+                          icon='INFO')
+    return None
+
+def replication_timer():
+    """Resume the queue after a restart and retry failed uploads once their delay has passed."""
+    props = project_settings()[0]
+    if props.replication_enabled and props.replication_target:
+        replicator.configure(replication_spec(props.replication_target), props.replication_endpoint,
+                             props.replication_bandwidth * 1024 * 1024, props.replication_connections)
+        replicator.kick()
+    return 60.0
+
+def project_watch_timer():
+    """Start watching the project folders when the add-on is enabled with a file already open."""
+    directory_watcher.watch(project_coordinator.directories())
+    return None
+
+@persistent
+def flowify_depsgraph_update(scene, depsgraph):
+    # Selection and viewport changes also land here with none of these flags set
+    edits = [update for update in depsgraph.updates
+             if update.is_updated_geometry or update.is_updated_shading or update.is_updated_transform]
+    if edits:
+        autosave_scheduler.note_activity()
+        project_coordinator.note_updates(edits)
+
+@persistent
+def flowify_file_saved(*args):
+    autosave_scheduler.note_saved()
+    directory_watcher.watch(project_coordinator.directories())
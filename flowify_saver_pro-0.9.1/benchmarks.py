@@ -0,0 +1,323 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+from pathlib import Path
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+import numpy as np
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .utils import COMPRESSION_SUFFIXES, compress_file, RecentFilesCache
+from .metrics import save_metrics
+from .catalog import version_allocator, VersionDatabase
+from .stores import DeltaStore
+from .core import FlowifyCore
+
+def benchmark_compression(sample_paths, codecs=('ZSTD', 'GZIP', 'LZMA'), level=3):
+    """Compress each sample with each codec and return bytes written, CPU time and wall time."""
+    results = []
+    staging = Path(tempfile.mkdtemp(prefix="flowify_bench_"))
+    try:
+        for sample_path in map(Path, sample_paths):
+            input_bytes = sample_path.stat().st_size
+            for codec in codecs:
+                if codec == 'ZSTD' and zstandard is None:
+                    continue
+                out_path = staging / f"{sample_path.name}{COMPRESSION_SUFFIXES.get(codec, '')}"
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                if codec == 'BLENDER':
+                    # Needs the sample loaded, so only meaningful in a background session
+                    bpy.ops.wm.open_mainfile(filepath=str(sample_path))
+                    cpu_start, wall_start = time.process_time(), time.perf_counter()
+                    bpy.ops.wm.save_as_mainfile(filepath=str(out_path), copy=True, compress=True)
+                else:
+                    compress_file(sample_path, out_path, codec, level)
+                results.append({
+                    'sample': sample_path.name,
+                    'codec': codec,
+                    'level': level,
+                    'input_bytes': input_bytes,
+                    'bytes_written': out_path.stat().st_size,
+                    'ratio': out_path.stat().st_size / input_bytes if input_bytes else 0.0,
+                    'cpu_seconds': time.process_time() - cpu_start,
+                    'wall_seconds': time.perf_counter() - wall_start,
+                })
+                out_path.unlink()
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return results
+
+def benchmark_delta(version_paths, keyframe_intervals=(1, 5, 10, 20)):
+    """Store consecutive versions as delta chains and report bytes stored against worst-case restore time."""
+    version_paths = [Path(path) for path in version_paths]
+    input_bytes = sum(path.stat().st_size for path in version_paths)
+    results = []
+    for interval in keyframe_intervals:
+        root = Path(tempfile.mkdtemp(prefix="flowify_bench_"))
+        try:
+            store = DeltaStore(root)
+            chains = []
+            basis_chunks = None
+            stored_bytes = 0
+            encode_start = time.perf_counter()
+            for index, path in enumerate(version_paths):
+                object_name = f"{index:06d}"
+                if basis_chunks is None or len(chains[-1]) >= interval:
+                    stored_bytes += store.write_keyframe(path, object_name)
+                    basis_chunks = store.index_file(path)
+                    chains.append([object_name])
+                else:
+                    delta_bytes, basis_chunks = store.write_delta(path, basis_chunks, object_name)
+                    stored_bytes += delta_bytes
+                    chains[-1].append(object_name)
+            encode_seconds = time.perf_counter() - encode_start
+
+            longest = max(chains, key=len)
+            restore_start = time.perf_counter()
+            store.restore(longest, root / "restored.blend")
+            results.append({
+                'keyframe_interval': interval,
+                'versions': len(version_paths),
+                'input_bytes': input_bytes,
+                'stored_bytes': stored_bytes,
+                'ratio': stored_bytes / input_bytes if input_bytes else 0.0,
+                'encode_seconds': encode_seconds,
+                'max_chain_length': len(longest) - 1,
+                'worst_restore_seconds': time.perf_counter() - restore_start,
+            })
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+# Element counts for generate_benchmark_scene; meshes are grids of (subdivisions + 1)^2 vertices
+SCENE_PRESETS = {
+    'small': {'meshes': 20, 'subdivisions': 16, 'images': 2, 'image_size': 256, 'modifiers': 1},
+    'medium': {'meshes': 200, 'subdivisions': 32, 'images': 8, 'image_size': 512, 'modifiers': 2},
+    'large': {'meshes': 1000, 'subdivisions': 64, 'images': 16, 'image_size': 1024, 'modifiers': 3},
+}
+
+BENCHMARK_MODIFIERS = ('SUBSURF', 'BEVEL', 'ARRAY', 'SOLIDIFY', 'WEIGHTED_NORMAL')
+
+BENCHMARK_BACKUP_CASES = (('OVERWRITE', 'VERSIONED'), ('SUFFIX', 'VERSIONED'), ('SUFFIX', 'TIMESTAMPED'),
+                          ('DEDUPLICATED', 'VERSIONED'), ('DELTA', 'VERSIONED'))
+
+BENCHMARK_METRICS = ('median_seconds', 'wall_seconds', 'encode_seconds', 'worst_restore_seconds')
+
+# Sub-millisecond queries jitter by more than any threshold, so smaller slowdowns never count
+BENCHMARK_NOISE_FLOOR = 0.001
+
+def timing_summary(samples):
+    ordered = sorted(samples)
+    return {'runs': len(ordered), 'min_seconds': ordered[0], 'median_seconds': ordered[len(ordered) // 2],
+            'max_seconds': ordered[-1]}
+
+def generate_benchmark_scene(meshes=20, subdivisions=16, images=2, image_size=256, modifiers=1, seed=0):
+    """Replace the open file with a synthetic scene; the same arguments always give the same data."""
+    rng = np.random.default_rng(seed)
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    side = subdivisions + 1
+    xs, ys = np.meshgrid(np.linspace(-1.0, 1.0, side), np.linspace(-1.0, 1.0, side))
+    grid = np.arange(side * side).reshape(side, side)
+    loops = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=-1).ravel()
+    face_count = len(loops) // 4
+    for index in range(meshes):
+        mesh = bpy.data.meshes.new(f"BenchMesh{index:04d}")
+        coords = np.column_stack([xs.ravel(), ys.ravel(), rng.normal(scale=0.1, size=side * side)])
+        mesh.vertices.add(side * side)
+        mesh.vertices.foreach_set('co', coords.astype(np.float32).ravel())
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set('vertex_index', loops.astype(np.int32))
+        mesh.polygons.add(face_count)
+        mesh.polygons.foreach_set('loop_start', np.arange(0, len(loops), 4, dtype=np.int32))
+        mesh.update(calc_edges=True)
+        obj = bpy.data.objects.new(mesh.name, mesh)
+        obj.location = rng.uniform(-50.0, 50.0, 3)
+        scene.collection.objects.link(obj)
+        for kind in BENCHMARK_MODIFIERS[:modifiers]:
+            obj.modifiers.new(kind.title(), kind)
+    for index in range(images):
+        image = bpy.data.images.new(f"BenchImage{index:02d}", image_size, image_size)
+        image.pixels.foreach_set(rng.random(image_size * image_size * 4, dtype=np.float32))
+        image.pack()
+        image.use_fake_user = True
+    return {'meshes': meshes, 'vertices': meshes * side * side, 'images': images, 'image_size': image_size,
+            'modifiers': min(modifiers, len(BENCHMARK_MODIFIERS))}
+
+def perturb_benchmark_scene(rng, fraction=0.05):
+    """Move the vertices of a few meshes, like an edit between two saves."""
+    meshes = list(bpy.data.meshes)
+    for index in rng.choice(len(meshes), size=max(1, int(len(meshes) * fraction)), replace=False):
+        mesh = meshes[index]
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get('co', coords)
+        coords[2::3] += rng.normal(scale=0.01, size=len(mesh.vertices)).astype(np.float32)
+        mesh.vertices.foreach_set('co', coords)
+        mesh.update()
+
+def benchmark_create_backup(scene_name, cases=BENCHMARK_BACKUP_CASES, repeats=5, compression='NONE'):
+    """Time FlowifyCore.create_backup of the open, saved file in each mode and naming pattern."""
+    results = []
+    for mode, pattern in cases:
+        settings = SimpleNamespace(auto_save_mode=mode, backup_pattern=pattern, backup_compression=compression,
+                                   compression_level=3, delta_keyframe_interval=10, retention_enabled=False,
+                                   replication_enabled=False)
+        samples, stalls, written, phases = [], [], 0, {}
+        for _ in range(repeats):
+            start = time.perf_counter()
+            if FlowifyCore.create_backup(bpy.context, settings) is None:
+                raise OSError(f"{mode} backup of the benchmark scene failed")
+            samples.append(time.perf_counter() - start)
+            record = save_metrics.snapshot()[-1]
+            stalls.append(record['stall_seconds'])
+            written += record['bytes_written']
+            for phase, seconds in record['phases'].items():
+                phases[phase] = phases.get(phase, 0.0) + seconds / repeats
+        results.append({
+            'suite': 'backup',
+            'case': f"{scene_name}/{mode}/{pattern}",
+            **timing_summary(samples),
+            'stall_median_seconds': sorted(stalls)[len(stalls) // 2],
+            'bytes_written': written // repeats,
+            'phases': phases,
+        })
+    return results
+
+def benchmark_get_suffix(root, counts=(10, 1000, 10000), repeats=20):
+    """Time _get_suffix in directories that already hold count backups of the project.
+
+    A cold lookup rescans the directory; a warm one trusts the catalogued counter.
+    """
+    results = []
+    for count in counts:
+        directory = Path(root) / f"suffix_{count}"
+        directory.mkdir(parents=True)
+        original_path = directory / "bench.blend"
+        original_path.touch()
+        versioned = min(count, 999)
+        for version in range(1, versioned + 1):
+            (directory / f"bench_v{version:03d}.blend").touch()
+        first = datetime.datetime(2020, 1, 1)
+        for offset in range(count - versioned):
+            stamp = (first + datetime.timedelta(seconds=offset)).strftime("_backup_%d%m%Y_%H-%M-%S")
+            (directory / f"bench{stamp}.blend").touch()
+        suffix, _ = FlowifyCore._get_suffix('VERSIONED', original_path, directory)
+        version_allocator.commit(directory, "bench", version_allocator.version_of(suffix))
+
+        for case, pattern in (('warm', 'VERSIONED'), ('cold', 'VERSIONED'), ('timestamped', 'TIMESTAMPED')):
+            samples = []
+            for _ in range(repeats):
+                if case == 'cold':
+                    stat = directory.stat()
+                    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+                start = time.perf_counter()
+                suffix, _ = FlowifyCore._get_suffix(pattern, original_path, directory)
+                samples.append(time.perf_counter() - start)
+                version_allocator.release(directory, "bench", version_allocator.version_of(suffix))
+            results.append({'suite': 'suffix', 'case': f"{case}/{count}", 'files': count, **timing_summary(samples)})
+    return results
+
+def benchmark_recent_files(root, counts=(10, 1000, 10000), repeats=5):
+    """Time re-reading a recent-files list of each length, its background stats and the cached lookup."""
+    results = []
+    for count in counts:
+        directory = Path(root) / f"recent_{count}"
+        directory.mkdir(parents=True)
+        files = [directory / f"project_{index:05d}.blend" for index in range(count)]
+        # Half of the entries point at files that were moved or deleted since
+        for path in files[::2]:
+            path.touch()
+        list_path = directory / "recent-files.txt"
+        list_path.write_text(''.join(f"{path}\n" for path in files), encoding='utf-8')
+        cache = RecentFilesCache(list_path)
+        reads, stats, cached = [], [], []
+        try:
+            for _ in range(repeats):
+                cache.signature = None
+                start = time.perf_counter()
+                cache.refresh()
+                cache.get_items()
+                reads.append(time.perf_counter() - start)
+                cache.executor.shutdown(wait=True)
+                cache.executor = None
+                cache.get_items()
+                stats.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                cache.get_items()
+                cached.append(time.perf_counter() - start)
+        finally:
+            cache.shutdown()
+        results.append({'suite': 'recent', 'case': f"read/{count}", 'entries': count, **timing_summary(reads)})
+        results.append({'suite': 'recent', 'case': f"stat/{count}", 'entries': count, **timing_summary(stats)})
+        results.append({'suite': 'recent', 'case': f"cached/{count}", 'entries': count, **timing_summary(cached)})
+    return results
+
+def benchmark_catalog(root, counts=(1000, 10000, 100000), repeats=20):
+    """Time the catalog queries behind the panels and the batch commands on projects of each size."""
+    db = VersionDatabase()
+    results = []
+    for count in counts:
+        directory = Path(root) / f"catalog_{count}"
+        first = datetime.datetime(2020, 1, 1)
+        with db.transaction():
+            for index in range(count):
+                db.add_version(directory / f"bench_{index:06d}.blend", base_name="bench", size=1024,
+                               content_hash=f"{index:040x}", timestamp=first + datetime.timedelta(seconds=index))
+        middle = ((first + datetime.timedelta(seconds=count // 2)).isoformat(), 2 ** 62)
+        queries = {
+            'latest': lambda: db.get_latest_version(directory, "bench"),
+            'count': lambda: db.count_versions(directory, "bench"),
+            'first_page': lambda: db.get_versions_page(directory, "bench"),
+            'middle_page': lambda: db.get_versions_page(directory, "bench", after=middle),
+            'tree': lambda: db.get_versions_under(directory),
+        }
+        for name, query in queries.items():
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                query()
+                samples.append(time.perf_counter() - start)
+            results.append({'suite': 'catalog', 'case': f"{name}/{count}", 'rows': count, **timing_summary(samples)})
+    return results
+
+def compare_benchmarks(results, baseline, threshold=0.2):
+    """Annotate results with their change against a baseline run; return the cases over threshold slower."""
+    previous = {(result['suite'], result['case']): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result['suite'], result['case']))
+        if old is None:
+            continue
+        result['change'] = {}
+        for metric in BENCHMARK_METRICS:
+            if result.get(metric) is None or not old.get(metric):
+                continue
+            change = result[metric] / old[metric] - 1
+            result['change'][metric] = change
+            if change > threshold and result[metric] - old[metric] > BENCHMARK_NOISE_FLOOR:
+                regressions.append(f"{result['suite']} {result['case']}: {metric} "
+                                   f"{old[metric] * 1000:.3f} -> {result[metric] * 1000:.3f} ms ({change:+.0%})")
+    return regressions
@@ -0,0 +1,246 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from pathlib import Path
+import re
+import struct
+import mmap
+
+from .utils import STREAM_BLOCK_SIZE, decompressing_reader, stream_codec
+from .catalog import VersionDatabase
+from .integrity import BLEND_MAGIC
+
+class BlendBlockReader:
+    """Walks the header and block list of a .blend without loading it in Blender."""
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self.buffer = memoryview(source)
+            self.stream = None
+        else:
+            self.buffer = None
+            self.stream = source
+        self.offset = 0
+        self.remaining = 0
+        header = bytes(self._read(12))
+        if len(header) < 12 or not header.startswith(BLEND_MAGIC):
+            self.release()
+            raise ValueError("not a .blend file")
+        if header[7:9] == b'17':
+            # Blender 5 header (BLENDER17-01v0500) with 64-bit block lengths
+            header += bytes(self._read(5))
+            self.endian = '<' if header[12:13] == b'v' else '>'
+            self.version = header[13:17].decode('ascii', 'replace')
+            self.pointer_size = 8
+            self.bhead = struct.Struct(self.endian + '4siQqq')
+            self.fields = (3, 1, 4)
+        else:
+            self.endian = '<' if header[8:9] == b'v' else '>'
+            self.version = header[9:12].decode('ascii', 'replace')
+            self.pointer_size = 8 if header[7:8] == b'-' else 4
+            self.bhead = struct.Struct(self.endian + ('4siQii' if self.pointer_size == 8 else '4siIii'))
+            self.fields = (1, 3, 4)
+
+    def _read(self, size):
+        if self.buffer is not None:
+            data = self.buffer[self.offset:self.offset + size]
+            self.offset += len(data)
+            return data
+        return self.stream.read(size)
+
+    def _skip(self, size):
+        if self.buffer is not None:
+            self.offset = min(self.offset + size, len(self.buffer))
+            return
+        while size > 0 and (block := self.stream.read(min(size, STREAM_BLOCK_SIZE))):
+            size -= len(block)
+
+    def blocks(self):
+        """Yield (code, length, sdna_index, count) per block, up to ENDB; read_body() returns the block's data."""
+        length_field, sdna_field, count_field = self.fields
+        while True:
+            self._skip(self.remaining)
+            raw = self._read(self.bhead.size)
+            if len(raw) < self.bhead.size:
+                return
+            fields = self.bhead.unpack(raw)
+            code = fields[0]
+            if code == b'ENDB':
+                return
+            self.remaining = fields[length_field]
+            yield code, fields[length_field], fields[sdna_field], fields[count_field]
+
+    def read_body(self, limit=None):
+        """Up to limit bytes of the current block's data; a memoryview slice when reading a buffer."""
+        size = self.remaining if limit is None else min(limit, self.remaining)
+        data = self._read(size)
+        self.remaining -= len(data)
+        return data
+
+    def release(self):
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+
+class BlendDNA:
+    """The struct layout table (SDNA) a .blend stores in its DNA1 block."""
+    def __init__(self, data, endian, pointer_size):
+        data = bytes(data)
+        self.pointer_size = pointer_size
+        pos = 8  # 'SDNA' 'NAME'
+        names, pos = self._strings(data, pos, endian)
+        pos = (pos + 3) & ~3
+        self.types, pos = self._strings(data, pos + 4, endian)
+        pos = (pos + 3) & ~3
+        count = len(self.types)
+        self.type_lengths = struct.unpack_from(f'{endian}{count}h', data, pos + 4)
+        pos = (pos + 4 + 2 * count + 3) & ~3
+        (struct_count,) = struct.unpack_from(endian + 'i', data, pos + 4)
+        pos += 8
+        self.structs = []
+        for _ in range(struct_count):
+            type_index, field_count = struct.unpack_from(endian + 'hh', data, pos)
+            fields = struct.unpack_from(f'{endian}{2 * field_count}h', data, pos + 4)
+            self.structs.append((type_index, [(fields[i], names[fields[i + 1]]) for i in range(0, len(fields), 2)]))
+            pos += 4 + 4 * field_count
+        self.struct_index = {self.types[type_index]: index for index, (type_index, fields) in enumerate(self.structs)}
+
+    @staticmethod
+    def _strings(data, pos, endian):
+        (count,) = struct.unpack_from(endian + 'i', data, pos)
+        pos += 4
+        strings = []
+        for _ in range(count):
+            end = data.index(b'\0', pos)
+            strings.append(data[pos:end].decode('latin-1'))
+            pos = end + 1
+        return strings, pos
+
+    def struct_name(self, sdna_index):
+        if 0 <= sdna_index < len(self.structs):
+            return self.types[self.structs[sdna_index][0]]
+        return None
+
+    def field(self, struct_name, field_name):
+        """(offset, size) of a field such as name[66] within a struct, or None."""
+        offset = 0
+        for type_index, name in self.structs[self.struct_index[struct_name]][1]:
+            if name.startswith(('*', '(*')):
+                size = self.pointer_size
+            else:
+                size = self.type_lengths[type_index]
+            for dimension in re.findall(r'\[(\d+)\]', name):
+                size *= int(dimension)
+            if re.sub(r'\[.*', '', name.lstrip('*(')) == field_name:
+                return offset, size
+            offset += size
+        return None
+
+def read_blend_blocks(filepath):
+    """Open a .blend or a compressed backup of one and return (reader, file, mmap or None) for reading."""
+    f = open(filepath, 'rb')
+    try:
+        codec = stream_codec(f)
+        if codec != 'NONE':
+            return BlendBlockReader(decompressing_reader(f, codec)), f, None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return BlendBlockReader(mapped), f, mapped
+        except ValueError:
+            mapped.close()
+            raise
+    except BaseException:
+        f.close()
+        raise
+
+# Enough of an ID block to hold its name, with room for Blender 5's longer names
+ID_PREFIX_SIZE = 1024
+
+def read_blend_index(filepath):
+    """List a .blend's local datablocks as [(type, name, bytes)], counting the DATA blocks after each."""
+    reader, f, mapped = read_blend_blocks(filepath)
+    try:
+        pending = []
+        current = None
+        dna = None
+        for code, length, sdna_index, count in reader.blocks():
+            if code == b'DATA':
+                if current is not None:
+                    current[3] += length + reader.bhead.size
+            elif code[2:] == b'\0\0' and code[:2].isalpha() and code != b'ID\0\0':
+                current = [code, sdna_index, bytes(reader.read_body(ID_PREFIX_SIZE)), length + reader.bhead.size]
+                pending.append(current)
+            else:
+                # Anything else ends the data belonging to the last datablock
+                current = None
+                if code == b'DNA1':
+                    dna = BlendDNA(reader.read_body(), reader.endian, reader.pointer_size)
+        if dna is None:
+            raise ValueError("no DNA1 block")
+        name_offset, name_size = dna.field('ID', 'name')
+        datablocks = []
+        for code, sdna_index, prefix, size in pending:
+            name = prefix[name_offset + 2:name_offset + name_size].split(b'\0', 1)[0].decode('utf-8', 'replace')
+            datablocks.append((dna.struct_name(sdna_index) or code[:2].decode('ascii'), name, size))
+        return reader.version, datablocks
+    finally:
+        reader.release()
+        if mapped is not None:
+            mapped.close()
+        f.close()
+
+# bpy.data collections by DNA struct name, for the datablock types that can be appended
+DATABLOCK_COLLECTIONS = {
+    'Object': 'objects', 'Mesh': 'meshes', 'Material': 'materials', 'Image': 'images', 'Tex': 'textures',
+    'Collection': 'collections', 'Scene': 'scenes', 'World': 'worlds', 'Camera': 'cameras', 'Light': 'lights',
+    'Lamp': 'lights', 'Curve': 'curves', 'Curves': 'hair_curves', 'PointCloud': 'pointclouds', 'Volume': 'volumes',
+    'MetaBall': 'metaballs', 'Lattice': 'lattices', 'bArmature': 'armatures', 'bAction': 'actions',
+    'bNodeTree': 'node_groups', 'ParticleSettings': 'particles', 'bGPdata': 'grease_pencils',
+    'GreasePencil': 'grease_pencils_v3', 'FreestyleLineStyle': 'linestyles', 'Brush': 'brushes', 'Palette': 'palettes',
+    'Text': 'texts', 'VFont': 'fonts', 'bSound': 'sounds', 'Speaker': 'speakers', 'LightProbe': 'lightprobes',
+    'MovieClip': 'movieclips', 'Mask': 'masks', 'CacheFile': 'cache_files', 'WorkSpace': 'workspaces',
+}
+
+def blend_index(filepath):
+    """read_blend_index, cached in the catalog and reused until the file's size or mtime change."""
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    db = VersionDatabase()
+    cached = db.get_block_index(filepath, stat.st_size, stat.st_mtime_ns)
+    if cached is not None:
+        return cached
+    version, datablocks = read_blend_index(filepath)
+    db.set_block_index(filepath, stat.st_size, stat.st_mtime_ns, version, datablocks)
+    return datablocks
+
+def summarize_blend_index(datablocks):
+    """{type: (count, bytes)}, e.g. {'Object': (12, 40960)}."""
+    summary = {}
+    for kind, name, size in datablocks:
+        count, total = summary.get(kind, (0, 0))
+        summary[kind] = (count + 1, total + size)
+    return summary
+
+def diff_blend_indexes(old, new):
+    """Datablocks added, removed and resized between two indexes, as sorted lists."""
+    old_sizes = {(kind, name): size for kind, name, size in old}
+    new_sizes = {(kind, name): size for kind, name, size in new}
+    added = sorted(key for key in new_sizes if key not in old_sizes)
+    removed = sorted(key for key in old_sizes if key not in new_sizes)
+    resized = sorted((kind, name, old_sizes[(kind, name)], size) for (kind, name), size in new_sizes.items()
+                     if (kind, name) in old_sizes and old_sizes[(kind, name)] != size)
+    return added, removed, resized
@@ -0,0 +1,239 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import bpy.utils.previews
+from pathlib import Path
+import os
+import hashlib
+import struct
+import queue
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import numpy as np
+
+from .notifications import NotificationManager
+from .utils import DECODE_ERRORS, data_dir, open_decompressed
+from .catalog import VersionDatabase
+from .blendfile import blend_index, BlendBlockReader, diff_blend_indexes, summarize_blend_index
+from .core import FlowifyCore
+
+THUMBNAIL_MAX_SIZE = 512
+
+def read_blend_thumbnail(f):
+    """Read the preview embedded at the start of a .blend stream as (width, height, rgba), or None."""
+    try:
+        reader = BlendBlockReader(f)
+    except ValueError:
+        return None
+    for code, length, sdna_index, count in reader.blocks():
+        if code == b'TEST':
+            data = bytes(reader.read_body())
+            if len(data) < 8:
+                return None
+            width, height = struct.unpack(reader.endian + 'ii', data[:8])
+            if 0 < width <= THUMBNAIL_MAX_SIZE and 0 < height <= THUMBNAIL_MAX_SIZE \
+                    and len(data) >= 8 + width * height * 4:
+                return width, height, data[8:8 + width * height * 4]
+            return None
+        if code != b'REND':
+            return None
+    return None
+
+class ThumbnailCache:
+    """Backup previews decoded off the main thread, kept in an in-memory LRU and on disk."""
+    MEMORY_ITEMS = 256
+    DISK_ITEMS = 4096
+
+    def __init__(self):
+        self.previews = None
+        self.icons = OrderedDict()
+        self.pending = set()
+        self.results = queue.Queue()
+        self.executor = None
+        self.disk_writes = 0
+
+    @staticmethod
+    def key_for(content_hash, filepath, timestamp):
+        if content_hash:
+            return content_hash
+        return hashlib.blake2b(f"{filepath}\0{timestamp}".encode(), digest_size=20).hexdigest()
+
+    def disk_path(self, key):
+        return data_dir() / 'thumbnails' / key[:2] / f"{key}.thumb"
+
+    def icon_id(self, key, filepath):
+        """Icon of a backup's preview; 0 while it is being read or if the backup has none."""
+        if key in self.icons:
+            self.icons.move_to_end(key)
+            return self.icons[key]
+        if key not in self.pending:
+            self.pending.add(key)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flowify_thumbnails")
+            self.executor.submit(self._load, key, filepath)
+            if not bpy.app.timers.is_registered(self.poll):
+                bpy.app.timers.register(self.poll, first_interval=0.05)
+        return 0
+
+    def _load(self, key, filepath):
+        path = self.disk_path(key)
+        try:
+            data = path.read_bytes()
+            width, height = struct.unpack('<II', data[:8])
+            os.utime(path)
+        except (OSError, struct.error):
+            try:
+                with open_decompressed(filepath) as f:
+                    thumbnail = read_blend_thumbnail(f)
+            except DECODE_ERRORS + (struct.error,):
+                thumbnail = None
+            # A 0x0 entry remembers backups without a preview
+            width, height, rgba = thumbnail or (0, 0, b'')
+            data = struct.pack('<II', width, height) + rgba
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+                self.disk_writes += 1
+                if self.disk_writes % 256 == 0:
+                    self._trim_disk()
+            except OSError:
+                pass
+        self.results.put((key, width, height, data[8:]))
+
+    def _trim_disk(self):
+        """Drop the least recently used previews from disk beyond DISK_ITEMS."""
+        entries = []
+        for path in (data_dir() / 'thumbnails').glob('*/*.thumb'):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        entries.sort(reverse=True)
+        for mtime, path in entries[self.DISK_ITEMS:]:
+            path.unlink(missing_ok=True)
+
+    def poll(self):
+        """Turn decoded pixels into icons; bpy.utils.previews can only be used on the main thread."""
+        if self.previews is None:
+            self.previews = bpy.utils.previews.new()
+        while True:
+            try:
+                key, width, height, rgba = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(key)
+            if not width:
+                self.icons[key] = 0
+                continue
+            preview = self.previews.get(key) or self.previews.new(key)
+            preview.image_size = (width, height)
+            preview.image_pixels_float.foreach_set(np.frombuffer(rgba, dtype=np.uint8).astype(np.float32) / 255.0)
+            self.icons[key] = preview.icon_id
+        while len(self.icons) > self.MEMORY_ITEMS:
+            key, icon = self.icons.popitem(last=False)
+            if key in self.previews:
+                del self.previews[key]
+        NotificationManager.tag_redraw()
+        return 0.1 if self.pending else None
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        if bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.unregister(self.poll)
+        if self.previews is not None:
+            bpy.utils.previews.remove(self.previews)
+            self.previews = None
+        self.icons.clear()
+        self.pending.clear()
+
+thumbnail_cache = ThumbnailCache()
+
+class VersionBrowser:
+    """Pages through the open file's catalogued backups, PAGE_SIZE rows at a time."""
+    PAGE_SIZE = 50
+
+    def __init__(self):
+        self.project = None
+        self.page = 0
+        self.cursors = [None]
+        self.total = 0
+        self.has_next = False
+        self.rows = []
+        self.comparison = None
+
+    @staticmethod
+    def project_for(original_path, pattern):
+        return str(original_path.parent), FlowifyCore.project_base_name(original_path, pattern)
+
+    def load(self, window_manager, original_path, pattern, page):
+        project = self.project_for(original_path, pattern)
+        if project != self.project:
+            self.project = project
+            self.cursors = [None]
+            self.comparison = None
+            page = 0
+        page = max(0, min(page, len(self.cursors) - 1))
+        db = VersionDatabase()
+        rows = db.get_versions_page(*project, after=self.cursors[page], limit=self.PAGE_SIZE + 1)
+        self.has_next = len(rows) > self.PAGE_SIZE
+        rows = rows[:self.PAGE_SIZE]
+        if self.has_next and len(self.cursors) == page + 1:
+            self.cursors.append((rows[-1][2], rows[-1][0]))
+        self.page = page
+        self.rows = [(version_id, filepath, timestamp) for version_id, filepath, timestamp, *rest in rows]
+        self.total = db.count_versions(*project)
+
+        items = window_manager.flowify_versions
+        items.clear()
+        for version_id, filepath, timestamp, size, content_hash, status in rows:
+            item = items.add()
+            item.name = Path(filepath).name
+            item.filepath = filepath
+            item.timestamp = timestamp[:19].replace('T', ' ')
+            item.size_mb = (size or 0) / (1024 * 1024)
+            item.status = status or ''
+            item.thumbnail_key = ThumbnailCache.key_for(content_hash, filepath, timestamp)
+        window_manager.flowify_version_index = 0
+
+    def previous_version(self, index):
+        """Path of the backup made before the one at index, looking past the end of the page."""
+        if index + 1 < len(self.rows):
+            return self.rows[index + 1][1]
+        version_id, filepath, timestamp = self.rows[index]
+        rows = VersionDatabase().get_versions_page(*self.project, after=(timestamp, version_id), limit=1)
+        return rows[0][1] if rows else None
+
+    def compare(self, index):
+        """Diff the datablocks of the backup at index against the one before it."""
+        filepath = self.rows[index][1]
+        previous = self.previous_version(index)
+        datablocks = blend_index(filepath)
+        added, removed, resized = diff_blend_indexes(blend_index(previous) if previous else [], datablocks)
+        self.comparison = SimpleNamespace(filepath=filepath, previous=previous,
+                                          summary=summarize_blend_index(datablocks),
+                                          added=added, removed=removed, resized=resized)
+        return self.comparison
+
+version_browser = VersionBrowser()
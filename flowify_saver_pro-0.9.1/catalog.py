@@ -0,0 +1,824 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import datetime
+import sqlite3
+from pathlib import Path
+import os
+import re
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from .utils import SESSION_ID, VERSION_PATTERN, backup_base_name, data_dir, is_blend_path, strip_compression_suffix
+
+class VersionDatabase:
+    _instance = None
+    _instance_lock = threading.Lock()
+    SCHEMA_VERSION = 9
+    SCRUBBED_TABLES = ('versions', 'manifests', 'delta_versions')
+    
+    def __new__(cls):
+        if not cls._instance:
+            with cls._instance_lock:
+                # Only publish the instance once migrated; batch workers open it concurrently
+                if not cls._instance:
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+    
+    # Seconds to wait for another process holding the write lock
+    BUSY_TIMEOUT = 30.0
+    CACHED_STATEMENTS = 256
+
+    def _initialize(self):
+        self.db_path = data_dir() / 'flowify_versions.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; SQLite allows one writer, so writes share this lock
+        self.lock = threading.RLock()
+        self.local = threading.local()
+        self.connections = {}
+        self.connections_lock = threading.Lock()
+        self._transaction_depth = 0
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self._migrate()
+
+    @property
+    def conn(self):
+        """This thread's connection, opened on first use."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, cached_statements=self.CACHED_STATEMENTS,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self.connections_lock:
+                for thread in [thread for thread in self.connections if not thread.is_alive()]:
+                    self.connections.pop(thread).close()
+                self.connections[threading.current_thread()] = conn
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        """Close every thread's connection; the next VersionDatabase() opens the catalog again."""
+        with self.lock, self.connections_lock:
+            for conn in self.connections.values():
+                conn.close()
+            self.connections.clear()
+            self.local = threading.local()
+            if VersionDatabase._instance is self:
+                VersionDatabase._instance = None
+
+    @contextmanager
+    def transaction(self):
+        """Commit the enclosed writes together; nested transactions join the outermost one."""
+        with self.lock:
+            conn = self.conn
+            if not self._transaction_depth and not conn.in_transaction:
+                # Take the write lock up front so a concurrent process makes us wait, not fail
+                conn.execute('BEGIN IMMEDIATE')
+            self._transaction_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    conn.rollback()
+                raise
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                conn.commit()
+
+    @contextmanager
+    def snapshot(self):
+        """Run the enclosed reads against one consistent state of the catalog without waiting for writers."""
+        conn = self.conn
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+    def _migrate(self):
+        """Bring the catalog schema up to SCHEMA_VERSION, one step at a time."""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        while version < self.SCHEMA_VERSION:
+            # Another process may have applied this step since the version was read
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+                if version < self.SCHEMA_VERSION:
+                    version += 1
+                    getattr(self, f'_migrate_to_{version}')()
+                    self.conn.execute(f'PRAGMA user_version = {version}')
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+    def _migrate_to_1(self):
+        # Older releases recreated this table on every load with only these columns
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS versions (
+            id INTEGER PRIMARY KEY,
+            filepath TEXT UNIQUE,
+            timestamp DATETIME,
+            base_name TEXT
+        )''')
+        for column in ('directory TEXT', 'size INTEGER', 'content_hash TEXT', 'save_duration REAL'):
+            self.conn.execute(f'ALTER TABLE versions ADD COLUMN {column}')
+        rows = self.conn.execute('SELECT id, filepath FROM versions').fetchall()
+        self.conn.executemany('UPDATE versions SET directory = ?, base_name = ? WHERE id = ?',
+                              [(str(Path(filepath).parent), backup_base_name(Path(filepath).stem), version_id)
+                               for version_id, filepath in rows])
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_versions_base_time ON versions (base_name, timestamp)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_versions_directory ON versions (directory, base_name, timestamp)')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS manifests (
+            id INTEGER PRIMARY KEY,
+            directory TEXT,
+            base_name TEXT,
+            version INTEGER,
+            timestamp DATETIME,
+            size INTEGER,
+            stored_bytes INTEGER,
+            UNIQUE (directory, base_name, version)
+        )''')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS manifest_chunks (
+            manifest_id INTEGER,
+            seq INTEGER,
+            digest TEXT,
+            length INTEGER,
+            PRIMARY KEY (manifest_id, seq)
+        )''')
+
+    def _migrate_to_2(self):
+        self.conn.execute('''CREATE TABLE version_counters (
+            directory TEXT,
+            base_name TEXT,
+            last_version INTEGER,
+            dir_mtime_ns INTEGER,
+            PRIMARY KEY (directory, base_name)
+        )''')
+
+    def _migrate_to_3(self):
+        self.conn.execute('CREATE INDEX idx_manifest_chunks_digest ON manifest_chunks (digest)')
+
+    def _migrate_to_4(self):
+        self.conn.execute('''CREATE TABLE delta_versions (
+            id INTEGER PRIMARY KEY,
+            directory TEXT,
+            base_name TEXT,
+            version INTEGER,
+            timestamp DATETIME,
+            size INTEGER,
+            stored_bytes INTEGER,
+            kind TEXT,
+            parent_id INTEGER,
+            chain_length INTEGER,
+            object_name TEXT,
+            UNIQUE (directory, base_name, version)
+        )''')
+
+    def _migrate_to_5(self):
+        # status is NULL until a scrub, then OK, CORRUPT or MISSING
+        for table in self.SCRUBBED_TABLES:
+            self.conn.execute(f'ALTER TABLE {table} ADD COLUMN status TEXT')
+            self.conn.execute(f'ALTER TABLE {table} ADD COLUMN verified_at DATETIME')
+        self.conn.execute('ALTER TABLE delta_versions ADD COLUMN object_hash TEXT')
+
+    def _migrate_to_6(self):
+        # Journal of file operations, replayed after a crash
+        self.conn.execute('''CREATE TABLE journal (
+            id INTEGER PRIMARY KEY,
+            session TEXT,
+            operation TEXT,
+            source TEXT,
+            target TEXT,
+            created DATETIME
+        )''')
+
+    def _migrate_to_7(self):
+        # Upload queue; finished rows stay so nothing is queued for a target twice
+        self.conn.execute('''CREATE TABLE replication_queue (
+            id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL,
+            key TEXT NOT NULL,
+            source TEXT,
+            payload BLOB,
+            size INTEGER,
+            state TEXT NOT NULL DEFAULT 'PENDING',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt DATETIME,
+            error TEXT,
+            created DATETIME,
+            UNIQUE (target, key)
+        )''')
+        self.conn.execute('CREATE INDEX idx_replication_state ON replication_queue (target, state, id)')
+
+    def _migrate_to_8(self):
+        # Datablock listings read from backups, valid while the file keeps the same size and mtime
+        self.conn.execute('''CREATE TABLE block_index (
+            filepath TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            blender_version TEXT,
+            datablocks TEXT
+        )''')
+
+    def _migrate_to_9(self):
+        self.conn.execute('''CREATE TABLE search_files (
+            id INTEGER PRIMARY KEY,
+            filepath TEXT UNIQUE NOT NULL,
+            directory TEXT NOT NULL,
+            size INTEGER,
+            mtime_ns INTEGER,
+            modified DATETIME,
+            blender_version TEXT
+        )''')
+        self.conn.execute('CREATE INDEX idx_search_directory ON search_files (directory)')
+        self.conn.execute('CREATE INDEX idx_search_modified ON search_files (modified)')
+        try:
+            self.conn.execute('CREATE VIRTUAL TABLE search_text USING fts5(filename, datablocks)')
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search() falls back to LIKE over the same columns
+            self.conn.execute('CREATE TABLE search_text (filename TEXT, datablocks TEXT)')
+
+    def journal_begin(self, operation, source, target=None):
+        with self.transaction():
+            cursor = self.conn.execute('''INSERT INTO journal (session, operation, source, target, created)
+                VALUES (?, ?, ?, ?, ?)''', (SESSION_ID, operation, str(source), str(target) if target else None,
+                                            datetime.datetime.now().isoformat()))
+        return cursor.lastrowid
+
+    def journal_update(self, entry_id, operation, source, target):
+        with self.transaction():
+            self.conn.execute('UPDATE journal SET operation = ?, source = ?, target = ? WHERE id = ?',
+                              (operation, str(source), str(target), entry_id))
+
+    def journal_end(self, entry_ids):
+        with self.transaction():
+            self.conn.executemany('DELETE FROM journal WHERE id = ?', [(i,) for i in entry_ids])
+
+    def get_abandoned_journal(self, before):
+        """Journal entries left by other sessions that started before a cutoff."""
+        with self.snapshot():
+            return self.conn.execute('''SELECT id, operation, source, target, created FROM journal
+                                     WHERE session != ? AND created < ? ORDER BY id''',
+                                     (SESSION_ID, before.isoformat())).fetchall()
+
+    def get_version_counter(self, directory, base_name):
+        with self.snapshot():
+            return self.conn.execute('''SELECT last_version, dir_mtime_ns FROM version_counters
+                                     WHERE directory = ? AND base_name = ?''',
+                                     (str(directory), base_name)).fetchone()
+
+    def set_version_counter(self, directory, base_name, last_version, dir_mtime_ns):
+        with self.transaction():
+            self.conn.execute('''INSERT OR REPLACE INTO version_counters
+                (directory, base_name, last_version, dir_mtime_ns) VALUES (?, ?, ?, ?)''',
+                (str(directory), base_name, last_version, dir_mtime_ns))
+
+    def get_version_counters(self, directory):
+        """{base_name: (last_version, dir_mtime_ns)} for every project in a directory."""
+        with self.snapshot():
+            rows = self.conn.execute('''SELECT base_name, last_version, dir_mtime_ns FROM version_counters
+                                     WHERE directory = ?''', (str(directory),)).fetchall()
+        return {base_name: (last_version, dir_mtime) for base_name, last_version, dir_mtime in rows}
+
+    def delete_version_counter(self, directory, base_name):
+        with self.transaction():
+            self.conn.execute('DELETE FROM version_counters WHERE directory = ? AND base_name = ?',
+                              (str(directory), base_name))
+
+    UPSERT_VERSION = '''INSERT INTO versions
+        (filepath, timestamp, base_name, directory, size, content_hash, save_duration)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (filepath) DO UPDATE SET
+            timestamp = excluded.timestamp, size = excluded.size,
+            content_hash = excluded.content_hash, save_duration = excluded.save_duration'''
+
+    def add_version(self, filepath, base_name=None, size=None, content_hash=None, save_duration=None, timestamp=None):
+        filepath = Path(filepath)
+        if base_name is None:
+            base_name = backup_base_name(filepath.stem)
+        timestamp = (timestamp or datetime.datetime.now()).isoformat()
+        with self.transaction():
+            self.conn.execute(self.UPSERT_VERSION, (str(filepath), timestamp, base_name, str(filepath.parent),
+                                                    size, content_hash, save_duration))
+        return True
+
+    def add_versions(self, rows):
+        """Catalog (filepath, base_name, size, content_hash, timestamp) rows with one statement."""
+        with self.transaction():
+            self.conn.executemany(self.UPSERT_VERSION, [
+                (str(filepath), timestamp.isoformat(), base_name, str(Path(filepath).parent), size, content_hash, None)
+                for filepath, base_name, size, content_hash, timestamp in rows])
+
+    def get_versions(self, directory=None, base_name=None, limit=-1):
+        """List catalogued backups, newest first, optionally for one project."""
+        query = 'SELECT filepath, timestamp FROM versions'
+        params = []
+        if directory is not None:
+            query += ' WHERE directory = ? AND base_name = ?'
+            params = [str(directory), base_name]
+        query += ' ORDER BY timestamp DESC LIMIT ?'
+        with self.snapshot():
+            return self.conn.execute(query, (*params, limit)).fetchall()
+
+    def get_versions_page(self, directory, base_name, after=None, limit=50):
+        """One page of a project's backups, newest first, as (id, filepath, timestamp, size, content_hash, status).
+
+        after is the (timestamp, id) of the previous page's last row.
+        """
+        query = '''SELECT id, filepath, timestamp, size, content_hash, status FROM versions
+                   WHERE directory = ? AND base_name = ?'''
+        params = [str(directory), base_name]
+        if after is not None:
+            query += ' AND (timestamp, id) < (?, ?)'
+            params += list(after)
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        with self.snapshot():
+            return self.conn.execute(query, (*params, limit)).fetchall()
+
+    def forget_version(self, filepath):
+        """Drop the entry of a backup deleted outside the add-on."""
+        with self.transaction():
+            self.conn.execute('DELETE FROM versions WHERE filepath = ?', (str(filepath),))
+            self.conn.execute('DELETE FROM block_index WHERE filepath = ?', (str(filepath),))
+
+    def is_catalogued(self, filepath):
+        with self.snapshot():
+            return self.conn.execute('SELECT 1 FROM versions WHERE filepath = ?', (str(filepath),)).fetchone() is not None
+
+    def count_versions(self, directory, base_name):
+        with self.snapshot():
+            return self.conn.execute('SELECT COUNT(*) FROM versions WHERE directory = ? AND base_name = ?',
+                                     (str(directory), base_name)).fetchone()[0]
+
+    def get_version_sizes(self, directory, base_name):
+        with self.snapshot():
+            return self.conn.execute('''SELECT id, filepath, timestamp, size FROM versions
+                                     WHERE directory = ? AND base_name = ?''',
+                                     (str(directory), base_name)).fetchall()
+
+    def delete_versions(self, version_ids):
+        with self.transaction():
+            self.conn.executemany('DELETE FROM block_index WHERE filepath IN (SELECT filepath FROM versions WHERE id = ?)',
+                                  [(i,) for i in version_ids])
+            self.conn.executemany('DELETE FROM versions WHERE id = ?', [(i,) for i in version_ids])
+
+    def get_search_stamps(self, root):
+        """Size and mtime of every indexed file in a directory tree, keyed by path."""
+        clause, params = self._tree_clause(root)
+        with self.snapshot():
+            return {filepath: (size, mtime_ns) for filepath, size, mtime_ns in self.conn.execute(
+                f'SELECT filepath, size, mtime_ns FROM search_files WHERE {clause}', params)}
+
+    def update_search_entries(self, entries):
+        """Index (filepath, size, mtime_ns, blender_version, datablocks) rows read by the search indexer."""
+        with self.transaction():
+            for filepath, size, mtime_ns, blender_version, datablocks in entries:
+                path = Path(filepath)
+                modified = datetime.datetime.fromtimestamp(mtime_ns / 1e9).isoformat()
+                row = self.conn.execute('SELECT id FROM search_files WHERE filepath = ?', (str(path),)).fetchone()
+                if row:
+                    file_id = row[0]
+                    self.conn.execute('''UPDATE search_files SET size = ?, mtime_ns = ?, modified = ?, blender_version = ?
+                                      WHERE id = ?''', (size, mtime_ns, modified, blender_version, file_id))
+                    self.conn.execute('DELETE FROM search_text WHERE rowid = ?', (file_id,))
+                else:
+                    file_id = self.conn.execute('''INSERT INTO search_files
+                        (filepath, directory, size, mtime_ns, modified, blender_version) VALUES (?, ?, ?, ?, ?, ?)''',
+                        (str(path), str(path.parent), size, mtime_ns, modified, blender_version)).lastrowid
+                names = '\n'.join(sorted({name for kind, name, nbytes in datablocks}))
+                self.conn.execute('INSERT INTO search_text (rowid, filename, datablocks) VALUES (?, ?, ?)',
+                                  (file_id, path.name, names))
+                if blender_version is not None:
+                    self.conn.execute('''INSERT OR REPLACE INTO block_index
+                                      (filepath, size, mtime_ns, blender_version, datablocks) VALUES (?, ?, ?, ?, ?)''',
+                                      (str(path), size, mtime_ns, blender_version, json.dumps(datablocks)))
+
+    def remove_search_entries(self, filepaths):
+        with self.transaction():
+            for filepath in filepaths:
+                row = self.conn.execute('SELECT id FROM search_files WHERE filepath = ?', (str(filepath),)).fetchone()
+                if row:
+                    self.conn.execute('DELETE FROM search_text WHERE rowid = ?', (row[0],))
+                    self.conn.execute('DELETE FROM search_files WHERE id = ?', (row[0],))
+
+    def search(self, terms, after=None, before=None, limit=100):
+        """Indexed files whose names start with every term, newest first, as (filepath, modified, size, matches)."""
+        with self.snapshot():
+            full_text = 'fts5' in (self.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'search_text'").fetchone()[0] or '').lower()
+            conditions, params = [], []
+            if terms and full_text:
+                conditions.append('search_text MATCH ?')
+                params.append(' '.join('"' + term.replace('"', '""') + '"*' for term in terms))
+            for term in (terms if not full_text else ()):
+                conditions.append('(search_text.filename LIKE ? OR search_text.datablocks LIKE ?)')
+                params += [f'%{term}%'] * 2
+            if after is not None:
+                conditions.append('f.modified >= ?')
+                params.append(after)
+            if before is not None:
+                conditions.append('f.modified < ?')
+                params.append(before)
+            matches = "highlight(search_text, 1, char(2), char(3))" if terms and full_text else "''"
+            where = ' AND '.join(conditions) or '1'
+            rows = self.conn.execute(f'''SELECT f.filepath, f.modified, f.size, {matches}
+                FROM search_text JOIN search_files AS f ON f.id = search_text.rowid
+                WHERE {where} ORDER BY f.modified DESC LIMIT ?''', (*params, limit)).fetchall()
+        return [(filepath, modified, size,
+                 [line.replace('\x02', '').replace('\x03', '') for line in matched.split('\n') if '\x02' in line])
+                for filepath, modified, size, matched in rows]
+
+    def get_block_index(self, filepath, size, mtime_ns):
+        """The cached datablock listing of a file as [(type, name, bytes)], or None if missing or stale."""
+        with self.snapshot():
+            row = self.conn.execute('''SELECT datablocks FROM block_index
+                                    WHERE filepath = ? AND size = ? AND mtime_ns = ?''',
+                                    (str(filepath), size, mtime_ns)).fetchone()
+        return [tuple(entry) for entry in json.loads(row[0])] if row else None
+
+    def set_block_index(self, filepath, size, mtime_ns, blender_version, datablocks):
+        with self.transaction():
+            self.conn.execute('''INSERT OR REPLACE INTO block_index
+                              (filepath, size, mtime_ns, blender_version, datablocks) VALUES (?, ?, ?, ?, ?)''',
+                              (str(filepath), size, mtime_ns, blender_version, json.dumps(datablocks)))
+
+    def get_latest_version(self, directory, base_name):
+        with self.snapshot():
+            return self.conn.execute('''SELECT filepath, timestamp, size, content_hash FROM versions
+                                     WHERE directory = ? AND base_name = ?
+                                     ORDER BY timestamp DESC LIMIT 1''',
+                                     (str(directory), base_name)).fetchone()
+
+    @staticmethod
+    def _tree_clause(root):
+        """Match a directory and everything below it as index range scans rather than a LIKE."""
+        root = str(Path(root))
+        return ('(directory = ? OR (directory >= ? AND directory < ?))',
+                (root, root + os.sep, root + chr(ord(os.sep) + 1)))
+
+    def get_versions_under(self, root):
+        """List catalogued backups in a directory tree as (id, filepath, timestamp, size, content_hash)."""
+        clause, params = self._tree_clause(root)
+        with self.snapshot():
+            return self.conn.execute(f'''SELECT id, filepath, timestamp, size, content_hash FROM versions
+                                     WHERE {clause}''', params).fetchall()
+
+    def get_projects_under(self, root):
+        """(directory, base_name) of every project in a directory tree with backups of any kind."""
+        clause, params = self._tree_clause(root)
+        with self.snapshot():
+            return self.conn.execute(f'''SELECT directory, base_name FROM versions WHERE {clause}
+                                     UNION SELECT directory, base_name FROM manifests WHERE {clause}
+                                     UNION SELECT directory, base_name FROM delta_versions WHERE {clause}''',
+                                     params * 3).fetchall()
+
+    def get_manifests_under(self, root):
+        clause, params = self._tree_clause(root)
+        with self.snapshot():
+            return self.conn.execute(f'''SELECT id, directory, base_name, version FROM manifests
+                                     WHERE {clause}''', params).fetchall()
+
+    def get_delta_versions_under(self, root):
+        clause, params = self._tree_clause(root)
+        with self.snapshot():
+            return self.conn.execute(f'''SELECT id, directory, base_name, version, kind, parent_id, object_name,
+                                     object_hash FROM delta_versions WHERE {clause}''', params).fetchall()
+
+    def record_scrub(self, table, results):
+        """Store (id, status) pairs from a scrub of one of SCRUBBED_TABLES."""
+        if table not in self.SCRUBBED_TABLES:
+            raise ValueError(f"{table} is not scrubbed")
+        verified_at = datetime.datetime.now().isoformat()
+        with self.transaction():
+            self.conn.executemany(f'UPDATE {table} SET status = ?, verified_at = ? WHERE id = ?',
+                                  [(status, verified_at, row_id) for row_id, status in results])
+
+    def set_content_hash(self, version_id, content_hash):
+        with self.transaction():
+            self.conn.execute('UPDATE versions SET content_hash = ? WHERE id = ?', (content_hash, version_id))
+
+    def get_damaged(self, directory, base_name):
+        """(name, status) of one project's backups that the last scrub found corrupt or missing."""
+        directory = str(directory)
+        with self.snapshot():
+            rows = self.conn.execute('''SELECT filepath, status FROM versions
+                                     WHERE directory = ? AND base_name = ? AND status IN ('CORRUPT', 'MISSING')''',
+                                     (directory, base_name)).fetchall()
+            damaged = [(Path(filepath).name, status) for filepath, status in rows]
+            for table, kind in (('manifests', 'deduplicated'), ('delta_versions', 'delta')):
+                rows = self.conn.execute(f'''SELECT version, status FROM {table}
+                                         WHERE directory = ? AND base_name = ? AND status IN ('CORRUPT', 'MISSING')
+                                         ORDER BY version''', (directory, base_name)).fetchall()
+                damaged.extend((f"{base_name} v{version:03d} ({kind})", status) for version, status in rows)
+        return damaged
+
+    def enqueue_replication(self, target, items):
+        """Queue (key, source, payload, size) items for a target; keys it already has are skipped."""
+        created = datetime.datetime.now().isoformat()
+        with self.transaction():
+            cursor = self.conn.executemany('''INSERT OR IGNORE INTO replication_queue
+                (target, key, source, payload, size, created) VALUES (?, ?, ?, ?, ?, ?)''',
+                [(target, key, source and str(source), payload, size, created) for key, source, payload, size in items])
+        return cursor.rowcount
+
+    def get_pending_replication(self, target, limit):
+        """Items due for upload as (id, key, source, payload, size, attempts); files go before descriptions."""
+        with self.snapshot():
+            return self.conn.execute('''SELECT id, key, source, payload, size, attempts FROM replication_queue
+                WHERE target = ? AND state = 'PENDING' AND (next_attempt IS NULL OR next_attempt <= ?)
+                ORDER BY payload IS NOT NULL, id LIMIT ?''',
+                (target, datetime.datetime.now().isoformat(), limit)).fetchall()
+
+    def finish_replication(self, entry_ids):
+        with self.transaction():
+            self.conn.executemany('''UPDATE replication_queue SET state = 'DONE', error = NULL, payload = NULL
+                WHERE id = ?''', [(i,) for i in entry_ids])
+
+    def retry_replication(self, entry_id, error, next_attempt=None):
+        """Count a failed upload; without a next attempt the item is marked FAILED."""
+        with self.transaction():
+            self.conn.execute('''UPDATE replication_queue SET attempts = attempts + 1, error = ?, next_attempt = ?,
+                state = ? WHERE id = ?''', (error, next_attempt and next_attempt.isoformat(),
+                                             'PENDING' if next_attempt else 'FAILED', entry_id))
+
+    def requeue_failed_replication(self, target):
+        with self.transaction():
+            self.conn.execute('''UPDATE replication_queue SET state = 'PENDING', attempts = 0, next_attempt = NULL
+                WHERE target = ? AND state = 'FAILED' ''', (target,))
+
+    def get_replication_counts(self, target):
+        """{state: (items, bytes)} for a target."""
+        with self.snapshot():
+            rows = self.conn.execute('''SELECT state, COUNT(*), COALESCE(SUM(size), 0) FROM replication_queue
+                WHERE target = ? GROUP BY state''', (target,)).fetchall()
+        return {state: (count, size) for state, count, size in rows}
+
+    def move_version(self, version_id, filepath, size, content_hash):
+        """Point a catalogued backup at its rewritten file, keeping its timestamp."""
+        with self.transaction():
+            self.conn.execute('DELETE FROM block_index WHERE filepath IN (SELECT filepath FROM versions WHERE id = ?)',
+                              (version_id,))
+            self.conn.execute('''UPDATE versions SET filepath = ?, size = ?, content_hash = ?, status = NULL
+                              WHERE id = ?''',
+                              (str(filepath), size, content_hash, version_id))
+
+    def add_manifest(self, directory, base_name, chunks, size, stored_bytes):
+        """Record a deduplicated version as its ordered chunk list and return its version number."""
+        directory = str(directory)
+        timestamp = datetime.datetime.now().isoformat()
+        with self.transaction():
+            row = self.conn.execute('''SELECT COALESCE(MAX(version), 0) FROM manifests
+                WHERE directory = ? AND base_name = ?''', (directory, base_name)).fetchone()
+            version = row[0] + 1
+            cursor = self.conn.execute('''INSERT INTO manifests
+                (directory, base_name, version, timestamp, size, stored_bytes)
+                VALUES (?, ?, ?, ?, ?, ?)''',
+                (directory, base_name, version, timestamp, size, stored_bytes)
+            )
+            self.conn.executemany('''INSERT INTO manifest_chunks
+                (manifest_id, seq, digest, length) VALUES (?, ?, ?, ?)''',
+                [(cursor.lastrowid, seq, digest, length) for seq, (digest, length) in enumerate(chunks)]
+            )
+        return version
+
+    def get_manifests(self, directory, base_name):
+        with self.snapshot():
+            cursor = self.conn.execute('''SELECT id, version, timestamp, size, status
+                                       FROM manifests WHERE directory = ? AND base_name = ?
+                                       ORDER BY version DESC''', (str(directory), base_name))
+            return cursor.fetchall()
+
+    def get_manifest_chunks(self, manifest_id):
+        with self.snapshot():
+            cursor = self.conn.execute('''SELECT digest, length FROM manifest_chunks
+                                       WHERE manifest_id = ? ORDER BY seq''', (manifest_id,))
+            return cursor.fetchall()
+
+    def delete_manifests(self, manifest_ids):
+        """Delete manifests and return the digests of chunks no other manifest uses."""
+        orphaned = set()
+        with self.transaction():
+            for manifest_id in manifest_ids:
+                orphaned.update(row[0] for row in self.conn.execute('''SELECT digest FROM manifest_chunks
+                    WHERE manifest_id = ?''', (manifest_id,)))
+                self.conn.execute('DELETE FROM manifest_chunks WHERE manifest_id = ?', (manifest_id,))
+                self.conn.execute('DELETE FROM manifests WHERE id = ?', (manifest_id,))
+            return [digest for digest in orphaned
+                    if not self.conn.execute('SELECT 1 FROM manifest_chunks WHERE digest = ? LIMIT 1',
+                                             (digest,)).fetchone()]
+
+    def add_delta_version(self, directory, base_name, kind, parent_id, chain_length, object_name, size, stored_bytes,
+                          object_hash=None):
+        """Record a keyframe or delta and return (id, version)."""
+        directory = str(directory)
+        timestamp = datetime.datetime.now().isoformat()
+        with self.transaction():
+            row = self.conn.execute('''SELECT COALESCE(MAX(version), 0) FROM delta_versions
+                WHERE directory = ? AND base_name = ?''', (directory, base_name)).fetchone()
+            version = row[0] + 1
+            cursor = self.conn.execute('''INSERT INTO delta_versions
+                (directory, base_name, version, timestamp, size, stored_bytes, kind, parent_id, chain_length,
+                 object_name, object_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (directory, base_name, version, timestamp, size, stored_bytes, kind, parent_id, chain_length,
+                 object_name, object_hash)
+            )
+        return cursor.lastrowid, version
+
+    def get_delta_versions(self, directory, base_name):
+        with self.snapshot():
+            cursor = self.conn.execute('''SELECT id, version, timestamp, size, kind, chain_length, parent_id,
+                                       object_name, stored_bytes, status FROM delta_versions
+                                       WHERE directory = ? AND base_name = ?
+                                       ORDER BY version DESC''', (str(directory), base_name))
+            return cursor.fetchall()
+
+    def get_delta_chain(self, version_id):
+        """Return the object names to apply, from the keyframe up to version_id."""
+        chain = []
+        with self.snapshot():
+            while version_id is not None:
+                row = self.conn.execute('SELECT parent_id, object_name FROM delta_versions WHERE id = ?',
+                                        (version_id,)).fetchone()
+                if row is None:
+                    return []
+                chain.append(row[1])
+                version_id = row[0]
+        return chain[::-1]
+
+    def delete_delta_versions(self, version_ids):
+        with self.transaction():
+            self.conn.executemany('DELETE FROM delta_versions WHERE id = ?', [(i,) for i in version_ids])
+
+class CatalogWriter:
+    """Groups small catalog writes from many threads into a few transactions on one writer thread."""
+    def __init__(self, batch_size=1000, interval=0.5):
+        self.db = VersionDatabase()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.errors = []
+        self.errors_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="flowify_catalog_writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, method, *args, **kwargs):
+        self.queue.put((method, args, kwargs))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.task_done()
+                    self.queue.put(None)
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            finally:
+                # flush() must never hang on a batch that failed to write
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write(self, batch):
+        try:
+            with self.db.transaction():
+                for method, args, kwargs in batch:
+                    method(*args, **kwargs)
+        except Exception:
+            # The batch rolled back; redo it one write at a time
+            for method, args, kwargs in batch:
+                try:
+                    with self.db.transaction():
+                        method(*args, **kwargs)
+                except Exception as e:
+                    with self.errors_lock:
+                        self.errors.append(e)
+
+    def flush(self):
+        """Wait until everything submitted so far is committed."""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class VersionAllocator:
+    """Hands out backup names from catalogued counters instead of scanning the directory each time."""
+    def __init__(self):
+        self.reserved = {}
+        self.timestamps = {}
+
+    @staticmethod
+    def _scan(directory, base_name):
+        max_num = 0
+        for file in directory.glob(f"{base_name}_v*"):
+            match = is_blend_path(file) and re.search(VERSION_PATTERN, strip_compression_suffix(file).stem)
+            if match:
+                max_num = max(max_num, int(match.group(1)))
+        return max_num
+
+    @staticmethod
+    def version_of(suffix):
+        """The version number in a suffix from reserve(), or None for a timestamp suffix."""
+        match = re.fullmatch(r'_v(\d+)', suffix)
+        return int(match.group(1)) if match else None
+
+    def reserve(self, directory, base_name, extension, floor=0):
+        """Reserve the next version number for base_name; pair with commit() or release()."""
+        db = VersionDatabase()
+        with db.transaction():
+            dir_mtime = directory.stat().st_mtime_ns
+            counter = db.get_version_counter(directory, base_name)
+            if counter is None or counter[1] != dir_mtime:
+                last_version = self._scan(directory, base_name)
+            else:
+                last_version = counter[0]
+            version = max(last_version, floor) + 1
+            while (directory / f"{base_name}_v{version:03d}{extension}").exists():
+                version += 1
+            db.set_version_counter(directory, base_name, version, dir_mtime)
+            # Keyed by number, so concurrent reservations for one project do not overwrite each other
+            self.reserved[(str(directory), base_name, version)] = (counter, dir_mtime)
+        return version
+
+    def reserve_timestamp(self, directory, base_name, extension, timestamp):
+        """Return a free timestamp suffix, adding the _NNN counter when the second is already taken."""
+        key = (str(directory), base_name)
+        with VersionDatabase().lock:
+            last_timestamp, counter = self.timestamps.get(key, (None, 0))
+            counter = counter + 1 if last_timestamp == timestamp else 0
+            while True:
+                suffix = timestamp if counter == 0 else f"{timestamp}_{counter:03d}"
+                if not (directory / f"{base_name}{suffix}{extension}").exists():
+                    break
+                counter += 1
+            self.timestamps[key] = (timestamp, counter)
+        return suffix
+
+    def commit(self, directory, base_name, version):
+        """Record the directory mtime after our own write, if the counter still holds this reservation."""
+        db = VersionDatabase()
+        reservation = self.reserved.pop((str(directory), base_name, version), None)
+        if reservation is None:
+            return
+        with db.transaction():
+            if db.get_version_counter(directory, base_name) == (version, reservation[1]):
+                db.set_version_counter(directory, base_name, version, directory.stat().st_mtime_ns)
+
+    def release(self, directory, base_name, version):
+        """Give back a reserved version number that was never written."""
+        db = VersionDatabase()
+        reservation = self.reserved.pop((str(directory), base_name, version), None)
+        if reservation is None:
+            return
+        previous = reservation[0]
+        with db.transaction():
+            counter = db.get_version_counter(directory, base_name)
+            if counter is not None and counter[0] == version:
+                if previous is None:
+                    db.delete_version_counter(directory, base_name)
+                else:
+                    db.set_version_counter(directory, base_name, *previous)
+
+version_allocator = VersionAllocator()
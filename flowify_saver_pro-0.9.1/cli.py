@@ -0,0 +1,467 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+import sqlite3
+from pathlib import Path
+import os
+import platform
+import argparse
+import sys
+import json
+import lzma
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from types import SimpleNamespace
+import numpy as np
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .utils import (COMPRESSION_SUFFIXES, STREAM_BLOCK_SIZE, backup_base_name, decompress_file, file_digest,
+    is_backup_path, iter_project_files, open_compressed, open_decompressed, parse_backup_name,
+    strip_compression_suffix)
+from .metrics import write_text_atomic
+from .catalog import CatalogWriter, VersionDatabase
+from .retention import prune_backups, RetentionPolicy
+from .integrity import BandwidthLimiter, Scrubber
+from .replication import replication_spec
+from .core import FlowifyCore, replicator
+from .search import parse_search_query, search_indexer
+from .benchmarks import (SCENE_PRESETS, benchmark_catalog, benchmark_compression, benchmark_create_backup,
+    benchmark_delta, benchmark_get_suffix, benchmark_recent_files, compare_benchmarks, generate_benchmark_scene,
+    perturb_benchmark_scene)
+
+class BatchStats:
+    """Files and bytes handled by a batch command, for the throughput summary."""
+    def __init__(self, command):
+        self.command = command
+        self.start = time.perf_counter()
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-6)
+        megabytes = self.bytes / (1024 * 1024)
+        return (f"{self.command}: {self.files} files, {megabytes:.1f} MB in {elapsed:.1f} s "
+                f"({self.files / elapsed:.1f} files/s, {megabytes / elapsed:.1f} MB/s), "
+                f"{self.skipped} skipped, {self.errors} errors")
+
+def run_batch(command, func, items, workers, label=str):
+    """Run func over items in threads and print throughput; func returns (bytes or None if skipped, message)."""
+    stats = BatchStats(command)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowify_cli") as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                nbytes, message = future.result()
+            except (OSError, EOFError, ValueError, lzma.LZMAError, sqlite3.Error) as e:
+                stats.errors += 1
+                print(f"{label(futures[future])}: {e}", file=sys.stderr)
+                continue
+            if message:
+                print(message)
+            if nbytes is None:
+                stats.skipped += 1
+            else:
+                stats.files += 1
+                stats.bytes += nbytes
+    print(stats.summary())
+    return stats
+
+def last_backup_time(original_path, settings):
+    """When original_path was last backed up in the settings' mode, as a POSIX timestamp."""
+    db = VersionDatabase()
+    directory = original_path.parent
+    if settings.auto_save_mode == 'DEDUPLICATED':
+        rows = db.get_manifests(directory, FlowifyCore.project_base_name(original_path, 'VERSIONED'))
+        latest = rows[0][2] if rows else None
+    elif settings.auto_save_mode == 'DELTA':
+        rows = db.get_delta_versions(directory, FlowifyCore.project_base_name(original_path, 'VERSIONED'))
+        latest = rows[0][2] if rows else None
+    else:
+        row = db.get_latest_version(directory, FlowifyCore.project_base_name(original_path, settings.backup_pattern))
+        latest = row[1] if row else None
+    return datetime.datetime.fromisoformat(latest).timestamp() if latest else 0.0
+
+def cli_backup(path, settings, project_locks):
+    stat = path.stat()
+    # Version numbers and delta chains are per project, so files sharing a base name go one at a time
+    with project_locks.setdefault((path.parent, backup_base_name(path.stem)), threading.Lock()):
+        if not settings.all and stat.st_mtime <= last_backup_time(path, settings):
+            return None, None
+        job = FlowifyCore.stage_file_backup(path, settings)
+        if job is None:
+            raise PermissionError(f"No write permission for {path.parent}")
+        FlowifyCore.finalize_backup(job)
+    if job.error:
+        raise OSError(job.error)
+    return stat.st_size, None
+
+def cli_prune(project, policy, dry_run):
+    directory, base_name = project
+    report = prune_backups(directory, base_name, policy, dry_run=dry_run)
+    if not report.entries:
+        return None, None
+    return report.freed_bytes, f"{Path(directory) / base_name}: {report.summary()}"
+
+def cli_recompress(row, codec, level):
+    version_id, filepath = row[0], Path(row[1])
+    blend_path = strip_compression_suffix(filepath)
+    target_path = blend_path.with_name(blend_path.name + COMPRESSION_SUFFIXES.get(codec, ''))
+    if target_path == filepath:
+        return None, None
+    size = filepath.stat().st_size
+    tmp_path = target_path.with_name(f".{target_path.name}.{uuid.uuid4().hex[:8]}.flowify_tmp")
+    try:
+        if codec in COMPRESSION_SUFFIXES:
+            with open_decompressed(filepath) as src, open(tmp_path, 'wb') as raw:
+                with open_compressed(raw, codec, level) as dst:
+                    shutil.copyfileobj(src, dst, STREAM_BLOCK_SIZE)
+        else:
+            decompress_file(filepath, tmp_path)
+        os.replace(tmp_path, target_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    # Catalog first so a crash leaves an extra file rather than a dangling entry
+    VersionDatabase().move_version(version_id, target_path, target_path.stat().st_size, file_digest(target_path))
+    filepath.unlink()
+    return size, None
+
+def scan_backups(roots, workers):
+    """Yield (path, size, mtime) for every backup under roots, listing directories in parallel."""
+    def list_directory(directory):
+        subdirectories, backups = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                        elif is_backup_path(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            backups.append((Path(entry.path), stat.st_size, stat.st_mtime))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"{directory}: {e}", file=sys.stderr)
+        return subdirectories, backups
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowify_scan") as executor:
+        pending = {executor.submit(list_directory, str(root)) for root in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirectories, backups = future.result()
+                pending |= {executor.submit(list_directory, directory) for directory in subdirectories}
+                yield from backups
+
+def guarded_digest(path):
+    try:
+        return file_digest(path)
+    except OSError as e:
+        print(f"{path}: {e}", file=sys.stderr)
+        return None
+
+ADOPT_BATCH_SIZE = 500
+
+ADOPT_PROGRESS_INTERVAL = 2.0
+
+def cli_adopt(roots, workers, hash_files=True):
+    """Catalog every backup under roots that is not catalogued yet and return the BatchStats."""
+    db = VersionDatabase()
+    catalogued = {row[1]: row[3] for root in roots for row in db.get_versions_under(root)}
+    stats = BatchStats('adopt')
+    found = 0
+    last_report = time.monotonic()
+
+    def flush(batch):
+        digests = list(hasher.map(guarded_digest, [path for path, size, mtime in batch])) if hash_files \
+            else [None] * len(batch)
+        rows = []
+        for (path, size, mtime), digest in zip(batch, digests):
+            if hash_files and digest is None:
+                stats.errors += 1
+                continue
+            base_name, version, timestamp = parse_backup_name(path)
+            rows.append((path, base_name, size, digest, timestamp or datetime.datetime.fromtimestamp(mtime)))
+            stats.files += 1
+            stats.bytes += size
+        if rows:
+            writer.submit(db.add_versions, rows)
+
+    with CatalogWriter() as writer, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowify_hash") as hasher:
+        batch = []
+        for path, size, mtime in scan_backups(roots, workers):
+            found += 1
+            if catalogued.get(str(path)) == size:
+                stats.skipped += 1
+            else:
+                batch.append((path, size, mtime))
+            if len(batch) >= ADOPT_BATCH_SIZE:
+                flush(batch)
+                batch = []
+            if time.monotonic() - last_report > ADOPT_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                elapsed = time.perf_counter() - stats.start
+                print(f"adopt: {found} backups found, {stats.files} added, {stats.skipped} already catalogued "
+                      f"({found / elapsed:.0f} files/s)", flush=True)
+        flush(batch)
+    for error in writer.errors:
+        print(f"adopt: {error}", file=sys.stderr)
+    stats.errors += len(writer.errors)
+    print(stats.summary())
+    return stats
+
+def cli_benchmark(args):
+    """Run the selected suites in a scratch directory and write the results as JSON."""
+    work_dir = Path(tempfile.mkdtemp(prefix="flowify_bench_"))
+    if not args.data_dir:
+        # Keep benchmark backups and catalog rows out of the real catalog
+        os.environ['FLOWIFY_DATA_DIR'] = str(work_dir / "data")
+    results = []
+    try:
+        if {'backup', 'compression', 'delta'} & set(args.suites):
+            rng = np.random.default_rng(args.seed)
+            for scene_name in args.scenes:
+                scene_dir = work_dir / scene_name
+                scene_dir.mkdir()
+                scene_path = scene_dir / "bench.blend"
+                counts = generate_benchmark_scene(**SCENE_PRESETS[scene_name], seed=args.seed)
+                # Blender 5 compresses saves by default; the codec suites need the raw file
+                bpy.ops.wm.save_as_mainfile(filepath=str(scene_path), compress=False)
+                print(f"benchmark: {scene_name} scene, {counts['meshes']} meshes, {counts['vertices']} vertices, "
+                      f"{counts['images']} images, {scene_path.stat().st_size / (1024 * 1024):.1f} MB", file=sys.stderr)
+                if 'compression' in args.suites:
+                    for result in benchmark_compression([scene_path]):
+                        results.append({'suite': 'compression', 'case': f"{scene_name}/{result['codec']}", **result})
+                if 'delta' in args.suites:
+                    version_paths = []
+                    for index in range(args.versions):
+                        perturb_benchmark_scene(rng)
+                        version_paths.append(scene_dir / f"edit_{index:03d}.blend")
+                        bpy.ops.wm.save_as_mainfile(filepath=str(version_paths[-1]), copy=True,
+                                                      compress=False)
+                    for result in benchmark_delta(version_paths):
+                        results.append({'suite': 'delta', 'case': f"{scene_name}/{result['keyframe_interval']}",
+                                        **result})
+                    for path in version_paths:
+                        path.unlink()
+                if 'backup' in args.suites:
+                    results += benchmark_create_backup(scene_name, repeats=args.repeats, compression=args.compression)
+        if 'suffix' in args.suites:
+            results += benchmark_get_suffix(work_dir / "suffix", repeats=args.repeats * 4)
+        if 'recent' in args.suites:
+            results += benchmark_recent_files(work_dir / "recent", repeats=args.repeats)
+        if 'catalog' in args.suites:
+            results += benchmark_catalog(work_dir / "catalog", repeats=args.repeats * 4)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_benchmarks(results, json.load(f), args.threshold)
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'blender': bpy.app.version_string,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'repeats': args.repeats,
+        'results': results,
+        'regressions': regressions,
+    }
+    if args.output:
+        write_text_atomic(args.output, json.dumps(report, indent=2) + '\n')
+    else:
+        print(json.dumps(report, indent=2))
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+def cli_replicate(spec):
+    """Drain the replication queue for spec, print what is left and return the number of failed items."""
+    start = time.perf_counter()
+    # A drain that was finishing as the last backups were queued may have missed them
+    replicator.wait()
+    replicator.kick()
+    replicator.wait()
+    counts = VersionDatabase().get_replication_counts(spec)
+    pending, pending_bytes = counts.get('PENDING', (0, 0))
+    failed = counts.get('FAILED', (0, 0))[0]
+    print(f"replicate: {counts.get('DONE', (0, 0))[0]} items on {spec}, {pending} queued "
+          f"({pending_bytes / (1024 * 1024):.1f} MB), {failed} failed, {time.perf_counter() - start:.1f} s")
+    if replicator.last_error:
+        print(f"replicate: {replicator.last_error}", file=sys.stderr)
+    return failed + (1 if pending else 0)
+
+def cli_arguments():
+    parser = argparse.ArgumentParser(
+        prog="blender --background --python __init__.py --",
+        description="Back up, replicate, verify, prune, re-compress, catalog, index and benchmark Flowify backups.")
+    parser.add_argument('--data-dir', help="Catalog and store location (default: the add-on's user directory)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help="Files processed in parallel")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backup = commands.add_parser('backup', help="Back up every working .blend changed since its last backup")
+    backup.add_argument('--mode', dest='auto_save_mode', choices=('SUFFIX', 'DEDUPLICATED', 'DELTA'), default='SUFFIX')
+    backup.add_argument('--pattern', dest='backup_pattern', choices=('VERSIONED', 'TIMESTAMPED'), default='VERSIONED')
+    backup.add_argument('--compression', dest='backup_compression', choices=('NONE', 'ZSTD', 'GZIP', 'LZMA'),
+                        default='NONE')
+    backup.add_argument('--level', dest='compression_level', type=int, default=3)
+    backup.add_argument('--keyframe-interval', dest='delta_keyframe_interval', type=int, default=10)
+    backup.add_argument('--all', action='store_true', help="Back up unchanged files too")
+    backup.add_argument('--replicate', dest='replication_target', default='',
+                        help="Also copy new backups to this folder or s3://bucket/prefix")
+
+    replicate = commands.add_parser('replicate', help="Send everything still queued for a replication target")
+    replicate.add_argument('replication_target', help="Folder or s3://bucket/prefix given to backup --replicate")
+    replicate.add_argument('--retry-failed', action='store_true', help="Also retry uploads that gave up")
+
+    for command in (backup, replicate):
+        command.add_argument('--endpoint', dest='replication_endpoint', default='',
+                             help="S3 endpoint URL, for MinIO and other S3-compatible servers")
+        command.add_argument('--max-bandwidth', dest='replication_bandwidth', type=float, default=0,
+                             help="Upload limit in MB/s, 0 for unlimited")
+        command.add_argument('--connections', dest='replication_connections', type=int, default=4)
+
+    scrub = commands.add_parser('scrub', aliases=['verify'],
+                                help="Re-verify every catalogued backup and flag corrupt or missing versions")
+    scrub.add_argument('--max-bandwidth', type=float, default=0, help="Read limit in MB/s, 0 for unlimited")
+
+    prune = commands.add_parser('prune', help="Apply a retention policy to every project")
+    prune.add_argument('--keep-last', dest='retention_keep_last', type=int, default=10)
+    prune.add_argument('--hourly-hours', dest='retention_hourly_hours', type=int, default=24)
+    prune.add_argument('--daily-days', dest='retention_daily_days', type=int, default=30)
+    prune.add_argument('--weekly-weeks', dest='retention_weekly_weeks', type=int, default=0)
+    prune.add_argument('--max-size', dest='retention_max_size', type=int, default=0, help="Per project, in MB")
+    prune.add_argument('--dry-run', action='store_true')
+
+    recompress = commands.add_parser('recompress', help="Rewrite catalogued backups with another codec")
+    recompress.add_argument('--compression', choices=('NONE', 'ZSTD', 'GZIP', 'LZMA'), default='ZSTD')
+    recompress.add_argument('--level', type=int, default=3)
+
+    catalog = commands.add_parser('catalog', aliases=['adopt'],
+                                  help="Add existing _v### and _backup_ backups found on disk to the catalog")
+    catalog.add_argument('--no-hash', dest='hash_files', action='store_false',
+                         help="Skip checksums for speed; the next verify records them")
+
+    index = commands.add_parser('index', help="Update the search index with every .blend under the roots")
+
+    search = commands.add_parser('search', help="Query the search index")
+    search.add_argument('query', nargs='+', help="Name prefixes, plus date:, after: or before: filters")
+    search.add_argument('--limit', type=int, default=100)
+
+    for command in (backup, scrub, prune, recompress, catalog, index):
+        command.add_argument('roots', nargs='+', type=lambda root: Path(root).resolve())
+
+    benchmark = commands.add_parser('benchmark', help="Time the save and backup path on synthetic scenes")
+    suites = ('backup', 'suffix', 'recent', 'catalog', 'compression', 'delta')
+    benchmark.add_argument('--suites', nargs='+', choices=suites, default=list(suites))
+    benchmark.add_argument('--scenes', nargs='+', choices=tuple(SCENE_PRESETS), default=['small', 'medium'])
+    benchmark.add_argument('--repeats', type=int, default=5, help="Runs per backup case; the faster suites do 4x")
+    benchmark.add_argument('--versions', type=int, default=10, help="Edited versions saved for the delta suite")
+    benchmark.add_argument('--compression', choices=('NONE', 'ZSTD', 'GZIP', 'LZMA'), default='NONE',
+                           help="Codec for the suffix-mode backup cases")
+    benchmark.add_argument('--seed', type=int, default=0)
+    benchmark.add_argument('--output', help="Write the JSON report here instead of to stdout")
+    benchmark.add_argument('--baseline', help="Earlier JSON report to compare against")
+    benchmark.add_argument('--threshold', type=float, default=0.2,
+                           help="Slowdown that counts as a regression and fails the run, as a fraction")
+    return parser
+
+def main(argv=None):
+    """Batch entry point; returns the process exit status."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    args = cli_arguments().parse_args(argv)
+    if args.data_dir:
+        os.environ['FLOWIFY_DATA_DIR'] = str(Path(args.data_dir).resolve())
+    if args.command == 'benchmark':
+        return cli_benchmark(args)
+    finished, rolled_back = FlowifyCore.recover_journal()
+    if finished or rolled_back:
+        print(f"journal: finished {finished} interrupted operations, rolled back {rolled_back}")
+
+    if args.command == 'backup':
+        if args.backup_compression == 'ZSTD' and zstandard is None:
+            print("zstandard is not available, backups are stored uncompressed", file=sys.stderr)
+            args.backup_compression = 'NONE'
+        settings = SimpleNamespace(**vars(args), retention_enabled=False,
+                                   replication_enabled=bool(args.replication_target))
+        project_locks = {}
+        stats = run_batch('backup', lambda path: cli_backup(path, settings, project_locks),
+                          iter_project_files(args.roots), args.workers)
+        if args.replication_target:
+            stats.errors += cli_replicate(replication_spec(args.replication_target))
+    elif args.command == 'replicate':
+        spec = replication_spec(args.replication_target)
+        replicator.configure(spec, args.replication_endpoint, args.replication_bandwidth * 1024 * 1024,
+                             args.replication_connections)
+        if args.retry_failed:
+            VersionDatabase().requeue_failed_replication(spec)
+        return 1 if cli_replicate(spec) else 0
+    elif args.command in {'scrub', 'verify'}:
+        stats = BatchStats('scrub')
+        report = Scrubber(BandwidthLimiter(args.max_bandwidth * 1024 * 1024)).run(args.roots, args.workers)
+        for label, problem in report.problems:
+            print(f"{label}: {problem}", file=sys.stderr)
+        stats.files, stats.bytes, stats.errors = report.checked, report.bytes, len(report.problems)
+        print(stats.summary())
+    elif args.command == 'prune':
+        policy = RetentionPolicy.from_props(args)
+        projects = {project for root in args.roots for project in VersionDatabase().get_projects_under(root)}
+        stats = run_batch('prune', lambda project: cli_prune(project, policy, args.dry_run),
+                          sorted(projects), args.workers, label=lambda project: Path(*project))
+    elif args.command == 'index':
+        start = time.perf_counter()
+        done, removed, unchanged = search_indexer.run(args.roots, args.workers, processes=True)
+        print(f"index: {done} files read, {removed} removed, {unchanged} unchanged, "
+              f"{time.perf_counter() - start:.1f} s")
+        return 0
+    elif args.command == 'search':
+        try:
+            terms, after, before = parse_search_query(' '.join(args.query))
+        except ValueError as e:
+            print(f"search: {e}", file=sys.stderr)
+            return 2
+        for filepath, modified, size, matches in VersionDatabase().search(terms, after, before, args.limit):
+            print(f"{modified[:19].replace('T', ' ')}  {filepath}" + (f"  ({', '.join(matches)})" if matches else ""))
+        return 0
+    elif args.command == 'recompress':
+        if args.compression == 'ZSTD' and zstandard is None:
+            print("zstandard is not available", file=sys.stderr)
+            return 2
+        rows = [row for root in args.roots for row in VersionDatabase().get_versions_under(root)]
+        stats = run_batch('recompress', lambda row: cli_recompress(row, args.compression, args.level),
+                          rows, args.workers, label=lambda row: row[1])
+    else:
+        stats = cli_adopt(args.roots, args.workers, args.hash_files)
+    return 1 if stats.errors else 0
@@ -0,0 +1,832 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+import sqlite3
+from pathlib import Path
+import os
+import re
+import shutil
+import tempfile
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .notifications import show_notification
+from .utils import (COMPRESSION_SUFFIXES, DECODE_ERRORS, STAGING_DIR, TIMESTAMP_PATTERN, VERSION_PATTERN,
+    compress_file, decompress_file, durable_replace, file_digest, fsync_directory, strip_compression_suffix)
+from .metrics import save_metrics
+from .catalog import version_allocator, VersionDatabase
+from .stores import ChunkStore, DeltaStore
+from .retention import prune_backups, RetentionPolicy
+from .integrity import BandwidthLimiter, inspect_backup, Scrubber, ScrubReport
+from .replication import (REPLICATION_ERRORS, open_replication_target, remote_directory, replication_document,
+    replication_spec)
+from .blendfile import DATABLOCK_COLLECTIONS
+
+class FlowifyCore:
+    @classmethod
+    def safe_save(cls, filepath, overwrite=False, compress=False, atomic=False):
+        filepath = Path(filepath)
+        if not filepath.parent.exists():
+            return False
+        if not os.access(filepath.parent, os.W_OK):
+            return False
+        
+        if atomic and overwrite and bpy.data.filepath and filepath == Path(bpy.data.filepath):
+            return cls.atomic_save(filepath)
+        with save_metrics.phase('save'):
+            if overwrite:
+                # Save As has to move the session to the new path, which only save_mainfile can do
+                bpy.ops.wm.save_mainfile(filepath=str(filepath))
+            else:
+                # Staged copies end up beside the project, so keep paths relative to it
+                bpy.ops.wm.save_as_mainfile(filepath=str(filepath), copy=True, compress=compress,
+                                            relative_remap=False)
+        return True
+
+    @staticmethod
+    def atomic_save(filepath):
+        """Save the open file over itself, then flush it to disk and read it back."""
+        try:
+            with save_metrics.phase('save'):
+                bpy.ops.wm.save_mainfile(filepath=str(filepath))
+            with save_metrics.phase('sync'):
+                with open(filepath, 'r+b') as f:
+                    os.fsync(f.fileno())
+                fsync_directory(filepath.parent)
+            with save_metrics.phase('verify'):
+                problem = inspect_backup(filepath)[1]
+        except (OSError, RuntimeError):
+            return False
+        if problem:
+            show_notification(f"Saved file failed verification: {problem}", icon='ERROR')
+            return False
+        return True
+
+    @staticmethod
+    def recover_journal(min_age=datetime.timedelta(minutes=10)):
+        """Finish or roll back file operations that a crashed session left in the journal.
+
+        Entries younger than min_age may belong to another running session and are left alone.
+        """
+        db = VersionDatabase()
+        finished = rolled_back = 0
+        for entry_id, operation, source, target, created in db.get_abandoned_journal(
+                datetime.datetime.now() - min_age):
+            source = Path(source)
+            target = Path(target) if target else None
+            try:
+                if operation != 'STAGE' and source.exists():
+                    content_hash, problem = inspect_backup(source)
+                    superseded = target is not None and target.exists() and \
+                        datetime.datetime.fromtimestamp(target.stat().st_mtime) >= datetime.datetime.fromisoformat(created)
+                    if problem or superseded:
+                        source.unlink()
+                        rolled_back += 1
+                    else:
+                        durable_replace(source, target)
+                        finished += 1
+                else:
+                    source.unlink(missing_ok=True)
+                    for suffix in COMPRESSION_SUFFIXES.values():
+                        source.with_name(source.name + suffix).unlink(missing_ok=True)
+                if operation == 'BACKUP' and target.exists() and not db.is_catalogued(target):
+                    db.add_version(target, size=target.stat().st_size, content_hash=file_digest(target),
+                                   timestamp=datetime.datetime.fromtimestamp(target.stat().st_mtime))
+            except (OSError, ValueError, TypeError, sqlite3.Error):
+                # A damaged or foreign entry must not stop recovery of the ones after it
+                continue
+            db.journal_end([entry_id])
+        return finished, rolled_back
+
+    @classmethod
+    def create_backup(cls, context, props=None):
+        """Save a backup and wait until it is fully written and catalogued."""
+        props = props or context.scene.flowify_props
+        if props.auto_save_mode == 'OVERWRITE':
+            start = time.perf_counter()
+            original_path = cls._writable_original()
+            if original_path is None:
+                return None
+            phases = {}
+            with save_metrics.collecting(phases):
+                saved = cls.safe_save(original_path, overwrite=True, atomic=True)
+            save_metrics.add('SAVED' if saved else 'FAILED', 'OVERWRITE', original_path,
+                             stall=time.perf_counter() - start, nbytes=original_path.stat().st_size if saved else 0,
+                             phases=phases)
+            return original_path if saved else None
+
+        job = cls.stage_backup(context, props)
+        if job is None:
+            return None
+        start = time.perf_counter()
+        cls.finalize_backup(job)
+        job.worker_time = time.perf_counter() - start
+        save_metrics.add_job(job)
+        return job.backup_path
+
+    @staticmethod
+    def _writable_original():
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            show_notification("Cannot create backup: File is not saved", icon='WARNING')
+            return None
+
+        original_path = Path(bpy.data.filepath)
+        if not original_path.parent.exists() or not os.access(original_path.parent, os.W_OK):
+            show_notification(f"No write permission for directory", icon='ERROR')
+            return None
+        return original_path
+
+    @classmethod
+    def stage_backup(cls, context, props=None):
+        """Do the main-thread part of a suffix, deduplicated or delta backup: save a temporary copy."""
+        start = time.perf_counter()
+        original_path = cls._writable_original()
+        if original_path is None:
+            return None
+
+        job = cls._new_job(original_path, props or context.scene.flowify_props)
+        with save_metrics.collecting(job.phases):
+            saved = cls.safe_save(job.tmp_path, compress=job.compression == 'BLENDER')
+        job.stall_time = time.perf_counter() - start
+        if not saved:
+            VersionDatabase().journal_end([job.journal_id])
+            save_metrics.add('FAILED', job.save_mode, original_path, job.stall_time, phases=job.phases,
+                             reason="could not write the temporary copy")
+            return None
+        return job
+
+    @classmethod
+    def stage_file_backup(cls, filepath, props):
+        """Prepare a backup of a .blend on disk, such as a linked library; the worker copies it."""
+        filepath = Path(filepath)
+        if not filepath.exists() or not os.access(filepath.parent, os.W_OK):
+            return None
+        job = cls._new_job(filepath, props)
+        if job.compression == 'BLENDER':
+            # Recompressing needs the file loaded in Blender; keep the library's own bytes
+            job.compression = 'NONE'
+        job.copy_from = filepath
+        return job
+
+    @staticmethod
+    def _new_job(original_path, props):
+        if props.auto_save_mode == 'DEDUPLICATED':
+            tmp_dir = ChunkStore().root
+        elif props.auto_save_mode == 'DELTA':
+            tmp_dir = DeltaStore().root
+        else:
+            # A subdirectory keeps the temporary copy from touching the project directory's mtime
+            tmp_dir = original_path.parent / STAGING_DIR
+            tmp_dir.mkdir(exist_ok=True)
+        tmp_path = tmp_dir / f".{original_path.stem}.{uuid.uuid4().hex[:8]}.flowify_tmp{original_path.suffix}"
+        compression = props.backup_compression
+        if compression == 'ZSTD' and zstandard is None:
+            # Blender's own compression is Zstandard as well
+            compression = 'BLENDER'
+        if props.auto_save_mode in {'DEDUPLICATED', 'DELTA'}:
+            # Compressed streams change completely on small edits and would defeat chunk sharing
+            compression = 'NONE'
+
+        job = BackupJob(original_path, props.auto_save_mode, props.backup_pattern, tmp_path)
+        job.journal_id = VersionDatabase().journal_begin('STAGE', tmp_path)
+        job.compression = compression
+        job.compression_level = props.compression_level
+        job.keyframe_interval = props.delta_keyframe_interval
+        if props.retention_enabled:
+            job.retention = RetentionPolicy.from_props(props)
+        if props.replication_enabled and props.replication_target:
+            job.replication_target = replication_spec(props.replication_target)
+            replicator.configure(job.replication_target, props.replication_endpoint,
+                                 props.replication_bandwidth * 1024 * 1024, props.replication_connections)
+        return job
+
+    @staticmethod
+    def project_base_name(original_path, pattern):
+        """The base name backups of original_path are catalogued under for a pattern."""
+        if pattern == 'VERSIONED':
+            return re.sub(VERSION_PATTERN, '', Path(original_path).stem)
+        return re.sub(TIMESTAMP_PATTERN, '', Path(original_path).stem)
+
+    @classmethod
+    def finalize_backup(cls, job, commit=True):
+        """Turn a staged temporary copy into a catalogued backup. Safe to run off the main thread."""
+        try:
+            with save_metrics.collecting(job.phases):
+                if job.copy_from is not None:
+                    with save_metrics.phase('copy'):
+                        shutil.copyfile(job.copy_from, job.tmp_path)
+                if job.save_mode == 'DEDUPLICATED':
+                    cls._store_deduplicated(job)
+                elif job.save_mode == 'DELTA':
+                    cls._store_delta(job)
+                else:
+                    job.backup_path = cls._store_suffixed(job)
+        except (OSError, sqlite3.Error) as e:
+            job.error = str(e)
+            job.catalog_record = None
+        finally:
+            # A delta's staged copy becomes the basis for the next one once it is catalogued
+            if job.error or job.save_mode != 'DELTA':
+                job.tmp_path.unlink(missing_ok=True)
+
+        if commit:
+            cls.commit_backups([job])
+        return job
+
+    @classmethod
+    def commit_backups(cls, jobs):
+        """Catalog finalized backups in one transaction, then apply retention."""
+        db = VersionDatabase()
+        try:
+            with db.transaction():
+                for job in jobs:
+                    if job.catalog_record:
+                        with save_metrics.collecting(job.phases), save_metrics.phase('catalog'):
+                            cls._catalog(db, job)
+                    if job.backup_path and job.replication_items:
+                        db.enqueue_replication(job.replication_target, job.replication_items)
+                db.journal_end([job.journal_id for job in jobs if job.journal_id])
+            store = DeltaStore()
+            for job in jobs:
+                if job.save_mode == 'DELTA' and job.backup_path:
+                    try:
+                        store.save_basis(job.tmp_path, job.original_path.parent, job.base_name,
+                                         job.catalog_record[1]['version_id'], job.catalog_record[1]['chunks'])
+                    except OSError:
+                        # Only a cache: without it the next backup is a keyframe
+                        pass
+        finally:
+            for job in jobs:
+                if job.save_mode == 'DELTA':
+                    job.tmp_path.unlink(missing_ok=True)
+        if any(job.backup_path and job.replication_items for job in jobs):
+            replicator.kick()
+
+        for job in jobs:
+            if job.backup_path and job.retention:
+                try:
+                    with save_metrics.collecting(job.phases), save_metrics.phase('retention'):
+                        job.retention_report = prune_backups(job.original_path.parent, job.base_name, job.retention,
+                                                             protected=(job.original_path, job.backup_path))
+                except sqlite3.Error:
+                    pass
+
+    @staticmethod
+    def _catalog(db, job):
+        """Write the catalog row a finalized job describes and name its backup after the version it gets."""
+        kind, record = job.catalog_record
+        if kind == 'version':
+            db.add_version(job.backup_path, **record)
+            return
+        directory = job.original_path.parent
+        base_name = job.base_name
+        if kind == 'manifest':
+            version = db.add_manifest(directory, base_name, record['chunks'], record['size'], record['stored_bytes'])
+            if job.replication_target:
+                job.replication_items.append(replication_document(
+                    f"manifests/{remote_directory(directory)}/{base_name}_v{version:03d}.json",
+                    {'base_name': base_name, 'version': version, 'size': record['size'], 'chunks': record['chunks']}))
+        else:
+            record['version_id'], version = db.add_delta_version(
+                directory, base_name, record['kind'], record['parent_id'], record['chain_length'],
+                record['object_name'], record['size'], record['stored_bytes'], record['object_hash'])
+            if job.replication_target:
+                # The queue skips objects the target already has
+                store = DeltaStore()
+                chain = db.get_delta_chain(record['version_id'])
+                job.replication_items = [(f"deltas/{name}", store.object_path(name), None,
+                                          store.object_path(name).stat().st_size) for name in chain]
+                job.replication_items.append(replication_document(
+                    f"deltas/{remote_directory(directory)}/{base_name}_v{version:03d}.json",
+                    {'base_name': base_name, 'version': version, 'kind': record['kind'], 'size': record['size'],
+                     'chain': chain}))
+        job.backup_path = directory / f"{base_name}_v{version:03d}{job.original_path.suffix}"
+
+    @classmethod
+    def _store_suffixed(cls, job):
+        original_path = job.original_path
+        extension = original_path.suffix + COMPRESSION_SUFFIXES.get(job.compression, '')
+        with save_metrics.phase('allocate'):
+            suffix, base_name = cls._get_suffix(job.pattern, original_path, original_path.parent, job.created, extension)
+        job.base_name = base_name
+        version = version_allocator.version_of(suffix)
+        backup_path = original_path.parent / f"{base_name}{suffix}{extension}"
+        source = job.tmp_path
+        try:
+            if job.compression in COMPRESSION_SUFFIXES:
+                source = job.tmp_path.with_name(job.tmp_path.name + COMPRESSION_SUFFIXES[job.compression])
+                with save_metrics.phase('compress'):
+                    compress_file(job.tmp_path, source, job.compression, job.compression_level)
+            with save_metrics.phase('verify'):
+                content_hash, problem = inspect_backup(source)
+            if problem:
+                raise OSError(f"{backup_path.name} failed verification: {problem}")
+            if job.journal_id:
+                VersionDatabase().journal_update(job.journal_id, 'BACKUP', source, backup_path)
+            with save_metrics.phase('sync'):
+                durable_replace(source, backup_path)
+        except OSError:
+            if version is not None:
+                version_allocator.release(original_path.parent, base_name, version)
+            raise
+        finally:
+            if source != job.tmp_path:
+                source.unlink(missing_ok=True)
+        if version is not None:
+            version_allocator.commit(original_path.parent, base_name, version)
+        job.bytes_written = backup_path.stat().st_size
+        if job.replication_target:
+            job.replication_items = [(f"versions/{remote_directory(backup_path.parent)}/{backup_path.name}",
+                                      backup_path, None, job.bytes_written)]
+        job.catalog_record = ('version', {
+            'base_name': base_name,
+            'size': backup_path.stat().st_size,
+            'content_hash': content_hash,
+            'save_duration': job.stall_time,
+            'timestamp': job.created,
+        })
+        return backup_path
+
+    @classmethod
+    def _store_deduplicated(cls, job):
+        original_path = job.original_path
+        job.base_name = cls.project_base_name(original_path, 'VERSIONED')
+        with save_metrics.phase('chunk'):
+            chunks, size, stored_bytes = ChunkStore().store_file(job.tmp_path)
+        job.bytes_written = stored_bytes
+        job.catalog_record = ('manifest', {'chunks': chunks, 'size': size, 'stored_bytes': stored_bytes})
+        if job.replication_target:
+            store = ChunkStore()
+            job.replication_items = [(f"chunks/{digest[:2]}/{digest}", store.chunk_path(digest), None, length)
+                                     for digest, length in dict(chunks).items()]
+
+    @classmethod
+    def _store_delta(cls, job):
+        original_path = job.original_path
+        base_name = job.base_name = cls.project_base_name(original_path, 'VERSIONED')
+        db = VersionDatabase()
+        store = DeltaStore()
+        size = job.tmp_path.stat().st_size
+        object_name = uuid.uuid4().hex
+
+        history = db.get_delta_versions(original_path.parent, base_name)
+        last = history[0] if history else None
+        basis = store.load_basis(original_path.parent, base_name, last[0]) if last else None
+        kind = 'FULL'
+        if basis is not None and last[5] + 1 < job.keyframe_interval:
+            with save_metrics.phase('delta'):
+                stored_bytes, chunks = store.write_delta(job.tmp_path, basis[1], object_name)
+            if stored_bytes < size // 2:
+                kind = 'DELTA'
+            else:
+                store.remove([object_name])
+        if kind == 'FULL':
+            with save_metrics.phase('compress'):
+                stored_bytes = store.write_keyframe(job.tmp_path, object_name)
+                chunks = store.index_file(job.tmp_path)
+            with save_metrics.phase('verify'):
+                object_hash, problem = inspect_backup(store.object_path(object_name))
+            if problem:
+                store.remove([object_name])
+                raise OSError(f"Keyframe failed verification: {problem}")
+        else:
+            object_hash = file_digest(store.object_path(object_name))
+        job.bytes_written = stored_bytes
+        job.catalog_record = ('delta', {
+            'kind': kind,
+            'parent_id': last[0] if kind == 'DELTA' else None,
+            'chain_length': last[5] + 1 if kind == 'DELTA' else 0,
+            'object_name': object_name,
+            'size': size,
+            'stored_bytes': stored_bytes,
+            'object_hash': object_hash,
+            'chunks': chunks,
+        })
+
+    @classmethod
+    def restore_delta_version(cls, version_id, target_path):
+        """Rebuild a delta version by applying its chain to the keyframe."""
+        chain = VersionDatabase().get_delta_chain(version_id)
+        if not chain:
+            return False
+        return DeltaStore().restore(chain, target_path)
+
+    @staticmethod
+    def decompress_backup(filepath):
+        """Unpack a stream-compressed backup next to itself and return the .blend path."""
+        target_path = strip_compression_suffix(filepath)
+        if target_path.exists():
+            target_path = target_path.with_name(f"{target_path.stem}_restored{target_path.suffix}")
+        tmp_path = target_path.with_name(target_path.name + '.tmp')
+        try:
+            decompress_file(filepath, tmp_path)
+            os.replace(tmp_path, target_path)
+        except DECODE_ERRORS:
+            tmp_path.unlink(missing_ok=True)
+            return None
+        return target_path
+
+    @staticmethod
+    def append_datablocks(filepath, selection, scene, link=False):
+        """Append or link (type, name) datablocks from a backup into the open file and return them."""
+        wanted = {}
+        for kind, name in selection:
+            if kind in DATABLOCK_COLLECTIONS:
+                wanted.setdefault(DATABLOCK_COLLECTIONS[kind], []).append(name)
+        filepath = Path(filepath)
+        source = filepath
+        if filepath.suffix in COMPRESSION_SUFFIXES.values():
+            # Hidden, and not a backup name, so the watcher and search index pass it by
+            fd, name = tempfile.mkstemp(prefix='.flowify_', suffix='.blend', dir=filepath.parent)
+            os.close(fd)
+            source = Path(name)
+            link = False
+        try:
+            if source != filepath:
+                decompress_file(filepath, source)
+            with bpy.data.libraries.load(str(source), link=link) as (data_from, data_to):
+                for attr, names in wanted.items():
+                    available = set(getattr(data_from, attr, ()))
+                    if available:
+                        setattr(data_to, attr, [name for name in names if name in available])
+            loaded = [block for attr in wanted for block in getattr(data_to, attr, ()) if block is not None]
+        finally:
+            if source != filepath:
+                source.unlink(missing_ok=True)
+        for block in loaded:
+            if isinstance(block, bpy.types.Collection) and block.users == 0:
+                scene.collection.children.link(block)
+        for block in loaded:
+            if isinstance(block, bpy.types.Object) and not block.users_collection:
+                scene.collection.objects.link(block)
+        return loaded
+
+    @classmethod
+    def restore_deduplicated_version(cls, manifest_id, target_path):
+        """Rebuild a deduplicated version as a regular .blend file."""
+        chunks = VersionDatabase().get_manifest_chunks(manifest_id)
+        if not chunks:
+            return False
+        return ChunkStore().restore_file(chunks, target_path)
+
+    @staticmethod
+    def _get_suffix(pattern, original_path, directory, now=None, extension=None):
+        base_name = original_path.stem
+        
+        if pattern == 'VERSIONED':
+            version_match = re.search(VERSION_PATTERN, base_name)
+            if version_match:
+                current_version = int(version_match.group(1))
+                base_name = base_name[:version_match.start()]
+            else:
+                current_version = 0
+            
+            version = version_allocator.reserve(directory, base_name, extension or original_path.suffix, current_version)
+            suffix = f"_v{version:03d}"
+            return suffix, base_name
+        else:
+            timestamp_match = re.search(TIMESTAMP_PATTERN, base_name)
+            if timestamp_match:
+                base_name = base_name[:timestamp_match.start()]
+            
+            timestamp = (now or datetime.datetime.now()).strftime("_backup_%d%m%Y_%H-%M-%S")
+            suffix = version_allocator.reserve_timestamp(directory, base_name, extension or original_path.suffix, timestamp)
+            return suffix, base_name
+
+class BackupJob:
+    """A backup whose temporary copy is saved and whose remaining work can run off the main thread."""
+    def __init__(self, original_path, save_mode, pattern, tmp_path):
+        self.original_path = original_path
+        self.save_mode = save_mode
+        self.pattern = pattern
+        self.tmp_path = tmp_path
+        self.created = datetime.datetime.now()
+        self.backup_path = None
+        self.error = None
+        self.stall_time = 0.0
+        self.worker_time = 0.0
+        self.base_name = None
+        self.copy_from = None
+        self.catalog_record = None
+        self.compression = 'NONE'
+        self.compression_level = 3
+        self.keyframe_interval = 10
+        self.retention = None
+        self.retention_report = None
+        self.journal_id = None
+        self.phases = {}
+        self.bytes_written = 0
+        self.replication_target = None
+        self.replication_items = []
+
+class BackupWorker:
+    """Finalizes staged backups on a worker thread and reports back through a main-thread timer."""
+    def __init__(self):
+        self.executor = None
+        self.results = queue.Queue()
+        self.pending = 0
+
+    def submit(self, *jobs):
+        """Finalize jobs in order on the worker; several jobs are catalogued in one transaction."""
+        if self.executor is None:
+            # One worker keeps version numbers allocated in submission order
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flowify_backup")
+        self.pending += len(jobs)
+        self.executor.submit(self._run, jobs)
+        if not bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.register(self.poll, first_interval=0.1, persistent=True)
+
+    def _run(self, jobs):
+        for job in jobs:
+            start = time.perf_counter()
+            FlowifyCore.finalize_backup(job, commit=False)
+            job.worker_time = time.perf_counter() - start
+        start = time.perf_counter()
+        try:
+            FlowifyCore.commit_backups(jobs)
+        except sqlite3.Error as e:
+            for job in jobs:
+                job.error = job.error or str(e)
+                job.backup_path = None
+        commit_time = time.perf_counter() - start
+        for job in jobs:
+            job.worker_time += commit_time
+            save_metrics.add_job(job)
+            self.results.put(job)
+
+    def poll(self):
+        """Report finished jobs; runs on the main thread."""
+        finished = []
+        while True:
+            try:
+                finished.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        self.pending -= len(finished)
+        saved = [job for job in finished if job.backup_path]
+        for job in finished:
+            project_coordinator.backup_finished(job)
+            if not job.backup_path:
+                show_notification(f"Auto-save failed: {job.error or 'could not catalog backup'}", icon='ERROR')
+        if len(saved) == 1:
+            show_notification(f"Auto-saved in '{saved[0].backup_path}'", icon='INFO')
+        elif saved:
+            show_notification(f"Auto-saved {len(saved)} files", icon='INFO')
+        return 0.1 if self.pending else None
+
+    def shutdown(self):
+        """Wait for queued backups so no temporary copies are left behind."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.unregister(self.poll)
+        self.pending = 0
+
+backup_worker = BackupWorker()
+
+class ScrubRunner:
+    """Verifies a project's backups on a background thread and reports through a main-thread timer."""
+    def __init__(self):
+        self.thread = None
+        self.scrubber = None
+        self.report = None
+        self.damaged_cache = {}
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, root, bytes_per_second):
+        if self.running:
+            return False
+        self.scrubber = Scrubber(BandwidthLimiter(bytes_per_second))
+        self.report = None
+        self.thread = threading.Thread(target=self._run, args=(root,), name="flowify_scrub", daemon=True)
+        self.thread.start()
+        if not bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.register(self.poll, first_interval=0.5, persistent=True)
+        return True
+
+    def _run(self, root):
+        try:
+            self.report = self.scrubber.run([root], workers=2)
+        except sqlite3.Error as e:
+            self.report = ScrubReport()
+            self.report.problems.append(("catalog", str(e)))
+
+    def poll(self):
+        if self.running:
+            return 0.5
+        self.damaged_cache.clear()
+        if self.report is not None and not self.scrubber.cancelled:
+            show_notification(self.report.summary(), icon='ERROR' if self.report.problems else 'INFO')
+        return None
+
+    def damaged(self, original_path, pattern):
+        """Backups of the open file flagged by the last scrub, cached between redraws."""
+        key = (str(original_path), pattern)
+        if key not in self.damaged_cache:
+            base_name = FlowifyCore.project_base_name(original_path, pattern)
+            self.damaged_cache[key] = VersionDatabase().get_damaged(original_path.parent, base_name)
+        return self.damaged_cache[key]
+
+    def shutdown(self):
+        if self.scrubber is not None:
+            self.scrubber.cancelled = True
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.unregister(self.poll)
+
+scrub_runner = ScrubRunner()
+
+class Replicator:
+    """Mirrors backups to a second target on background threads, working from the catalog's queue."""
+    BATCH_SIZE = 64
+    MAX_ATTEMPTS = 8
+
+    def __init__(self):
+        self.thread = None
+        self.stop = threading.Event()
+        self.target = None
+        self.endpoint = ''
+        self.bytes_per_second = 0
+        self.connections = 4
+        self.last_error = None
+        self.status_cache = (0.0, None, {})
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def configure(self, target, endpoint='', bytes_per_second=0, connections=4):
+        self.target = target
+        self.endpoint = endpoint
+        self.bytes_per_second = bytes_per_second
+        self.connections = connections
+
+    def kick(self):
+        """Start draining the queue unless that is already happening; safe to call from any thread."""
+        if not self.target or self.running:
+            return
+        self.stop.clear()
+        self.thread = threading.Thread(target=self._run, args=(self.target,), name="flowify_replicate", daemon=True)
+        self.thread.start()
+
+    def _run(self, spec):
+        try:
+            target = open_replication_target(spec, self.endpoint, self.connections)
+        except REPLICATION_ERRORS as e:
+            self.last_error = str(e)
+            return
+        db = VersionDatabase()
+        limiter = BandwidthLimiter(self.bytes_per_second)
+        try:
+            with ThreadPoolExecutor(max_workers=self.connections, thread_name_prefix="flowify_upload") as executor:
+                while not self.stop.is_set():
+                    rows = db.get_pending_replication(spec, self.BATCH_SIZE)
+                    if not rows:
+                        break
+                    futures = {executor.submit(self._send, target, row, limiter): row for row in rows}
+                    finished = []
+                    for future in as_completed(futures):
+                        row = futures[future]
+                        try:
+                            if future.result() is not None:
+                                finished.append(row[0])
+                        except FileNotFoundError:
+                            # Retention removed the backup before it was sent
+                            db.retry_replication(row[0], "local copy no longer exists")
+                        except REPLICATION_ERRORS as e:
+                            self.last_error = f"{row[1]}: {e}"
+                            attempts = row[5] + 1
+                            next_attempt = None
+                            if attempts < self.MAX_ATTEMPTS:
+                                next_attempt = datetime.datetime.now() + datetime.timedelta(seconds=30 * 2 ** attempts)
+                            db.retry_replication(row[0], str(e), next_attempt)
+                    db.finish_replication(finished)
+                    if not finished:
+                        break
+        except sqlite3.Error as e:
+            self.last_error = str(e)
+        finally:
+            target.close()
+
+    def _send(self, target, row, limiter):
+        entry_id, key, source, payload, size, attempts = row
+        if payload is not None:
+            target.put_bytes(payload, key)
+            return len(payload)
+        source = Path(source)
+        if not source.exists():
+            raise FileNotFoundError(source)
+        if target.exists(key, size):
+            # Already there, for example sent by another machine sharing the target
+            return 0
+        return target.put(source, key, limiter, self.stop)
+
+    def status(self, target):
+        """Queue counts for the panel, re-read at most every two seconds."""
+        checked, cached_target, counts = self.status_cache
+        if cached_target != target or time.monotonic() - checked > 2.0:
+            try:
+                counts = VersionDatabase().get_replication_counts(target)
+            except sqlite3.Error:
+                counts = {}
+            self.status_cache = (time.monotonic(), target, counts)
+        return counts
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    def shutdown(self):
+        self.stop.set()
+        self.wait()
+        self.thread = None
+
+replicator = Replicator()
+
+class ProjectCoordinator:
+    """Keeps a schedule per file, the open .blend plus every linked library, and batches their backups."""
+    def __init__(self):
+        self.dirty = set()
+        # Libraries staged but not yet committed by the worker
+        self.in_flight = set()
+
+    def _library_paths(self):
+        for library in bpy.data.libraries:
+            yield Path(bpy.path.abspath(library.filepath, library=library.library)).resolve()
+
+    def note_updates(self, updates):
+        """Mark the libraries whose linked datablocks these depsgraph updates changed."""
+        for update in updates:
+            library = getattr(update.id.original, 'library', None)
+            if library is not None:
+                self.dirty.add(str(Path(bpy.path.abspath(library.filepath, library=library.library)).resolve()))
+
+    def library_jobs(self, props):
+        """Stage backups for every library edited since its last backup."""
+        jobs = []
+        if props.auto_save_mode == 'OVERWRITE':
+            return jobs
+        for library_path in self._library_paths():
+            key = str(library_path)
+            if key in self.in_flight or key not in self.dirty:
+                continue
+            job = FlowifyCore.stage_file_backup(library_path, props)
+            if job is not None:
+                jobs.append(job)
+                self.dirty.discard(key)
+                self.in_flight.add(key)
+        return jobs
+
+    def backup_finished(self, job):
+        """Release a library job once the worker is done with it; a failed one stays dirty for the next tick."""
+        key = str(job.original_path)
+        if key not in self.in_flight:
+            return
+        self.in_flight.discard(key)
+        if not job.backup_path:
+            self.dirty.add(key)
+
+    def directories(self):
+        """Folders holding the open file and its linked libraries, where their backups are written."""
+        directories = {path.parent for path in self._library_paths()}
+        if bpy.data.filepath:
+            directories.add(Path(bpy.data.filepath).parent)
+        return directories
+
+    def backup_libraries(self, props):
+        jobs = self.library_jobs(props)
+        if jobs:
+            backup_worker.submit(*jobs)
+        return len(jobs)
+
+project_coordinator = ProjectCoordinator()
@@ -0,0 +1,229 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from pathlib import Path
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .utils import DECODE_ERRORS, STREAM_BLOCK_SIZE, decompressing_reader, file_digest, stream_codec
+from .catalog import CatalogWriter, VersionDatabase
+from .stores import ChunkStore, DeltaStore
+
+BLEND_MAGIC = b'BLENDER'
+
+class BandwidthLimiter:
+    """Paces reads shared by several threads to a byte rate; a rate of 0 means unlimited."""
+    BURST_SECONDS = 0.25
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def consume(self, nbytes):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.next_time = max(self.next_time, now - self.BURST_SECONDS) + nbytes / self.rate
+            delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+class HashingReader:
+    """Binary reader that hashes, and optionally paces, every byte a decoder pulls through it."""
+    def __init__(self, f, limiter=None):
+        self.f = f
+        self.limiter = limiter
+        self.digest = hashlib.blake2b(digest_size=20)
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        if self.limiter is not None:
+            self.limiter.consume(len(data))
+        self.digest.update(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+def inspect_backup(filepath, limiter=None):
+    """Hash a backup and check that it decodes to a complete .blend; returns (digest, problem or None)."""
+    with open(filepath, 'rb') as raw:
+        codec = stream_codec(raw)
+        reader = HashingReader(raw, limiter)
+        problem = None
+        if codec != 'ZSTD' or zstandard is not None:
+            stream = decompressing_reader(reader, codec)
+            tail = b''
+            try:
+                head = stream.read(len(BLEND_MAGIC))
+                while block := stream.read(STREAM_BLOCK_SIZE):
+                    tail = (tail + block)[-32:]
+            except DECODE_ERRORS as e:
+                problem = f"cannot be decompressed ({e})"
+            else:
+                if head != BLEND_MAGIC:
+                    problem = "not a .blend file"
+                elif b'ENDB' not in tail:
+                    problem = "truncated"
+        # The decoder may stop before trailing bytes; hash the whole stored file
+        while reader.read(STREAM_BLOCK_SIZE):
+            pass
+    return reader.digest.hexdigest(), problem
+
+class ScrubReport:
+    """What a scrub checked and which backups it found damaged."""
+    def __init__(self):
+        self.checked = 0
+        self.bytes = 0
+        self.problems = []
+
+    def summary(self):
+        if not self.problems:
+            return f"Verified {self.checked} backups ({self.bytes / (1024 * 1024):.1f} MB), all intact"
+        return f"Verified {self.checked} backups, {len(self.problems)} corrupt or missing"
+
+class Scrubber:
+    """Re-reads catalogued backups in parallel and records OK, CORRUPT or MISSING in the catalog."""
+    def __init__(self, limiter=None):
+        self.limiter = limiter
+        self.db = VersionDatabase()
+        self.chunk_status = {}
+        self.cancelled = False
+        self.report = ScrubReport()
+        self.writer = None
+        self.lock = threading.Lock()
+
+    def _check_version(self, row):
+        version_id, filepath, timestamp, size, content_hash = row
+        filepath = Path(filepath)
+        if not filepath.exists():
+            return 'MISSING', "missing", 0
+        digest, problem = inspect_backup(filepath, self.limiter)
+        if content_hash is None and problem is None:
+            # Catalogued before checksums were kept; trust what we can decode
+            self.writer.submit(self.db.set_content_hash, version_id, digest)
+        elif content_hash is not None and digest != content_hash:
+            problem = "checksum mismatch"
+        return ('CORRUPT' if problem else 'OK'), problem, filepath.stat().st_size
+
+    def _check_chunk(self, store, digest, length):
+        with self.lock:
+            if digest in self.chunk_status:
+                return self.chunk_status[digest], 0
+        try:
+            data = store.chunk_path(digest).read_bytes()
+        except FileNotFoundError:
+            status = 'MISSING'
+            data = b''
+        else:
+            if self.limiter is not None:
+                self.limiter.consume(len(data))
+            intact = len(data) == length and hashlib.blake2b(data, digest_size=20).hexdigest() == digest
+            status = 'OK' if intact else 'CORRUPT'
+        with self.lock:
+            self.chunk_status[digest] = status
+        return status, len(data)
+
+    def _check_manifest(self, row):
+        store = ChunkStore()
+        nbytes = 0
+        statuses = set()
+        for digest, length in self.db.get_manifest_chunks(row[0]):
+            status, read = self._check_chunk(store, digest, length)
+            statuses.add(status)
+            nbytes += read
+        if 'CORRUPT' in statuses:
+            return 'CORRUPT', "damaged chunks", nbytes
+        if 'MISSING' in statuses:
+            return 'MISSING', "missing chunks", nbytes
+        return 'OK', None, nbytes
+
+    def _check_delta(self, row):
+        object_path = DeltaStore().object_path(row[6])
+        if not object_path.exists():
+            return 'MISSING', "missing", 0
+        if row[4] == 'FULL':
+            digest, problem = inspect_backup(object_path, self.limiter)
+        else:
+            digest, problem = file_digest(object_path, self.limiter), None
+        if problem is None and row[7] is not None and digest != row[7]:
+            problem = "checksum mismatch"
+        return ('CORRUPT' if problem else 'OK'), problem, object_path.stat().st_size
+
+    def _check(self, task):
+        table, label, row = task
+        if self.cancelled:
+            return
+        check = {'versions': self._check_version, 'manifests': self._check_manifest,
+                 'delta_versions': self._check_delta}[table]
+        try:
+            status, problem, nbytes = check(row)
+        except OSError as e:
+            status, problem, nbytes = 'CORRUPT', str(e), 0
+        self.writer.submit(self.db.record_scrub, table, [(row[0], status)])
+        with self.lock:
+            self.report.checked += 1
+            self.report.bytes += nbytes
+            if problem:
+                self.report.problems.append((label, problem))
+        return status
+
+    def _propagate_chains(self, rows, statuses):
+        """A delta can only be restored if its keyframe and every earlier delta are intact."""
+        rows = {row[0]: row for row in rows}
+        broken = []
+        for version_id, row in rows.items():
+            parent_id = row[5]
+            while parent_id is not None and statuses.get(version_id) == 'OK':
+                if statuses.get(parent_id) in {'CORRUPT', 'MISSING'}:
+                    broken.append(version_id)
+                    self.report.problems.append((f"{row[2]} v{row[3]:03d} (delta)", "depends on a damaged version"))
+                    break
+                parent_id = rows[parent_id][5] if parent_id in rows else None
+        if broken:
+            self.db.record_scrub('delta_versions', [(version_id, 'CORRUPT') for version_id in broken])
+
+    def run(self, roots, workers=4):
+        """Scrub every catalogued backup under roots and return a ScrubReport."""
+        tasks = []
+        delta_rows = []
+        for root in roots:
+            tasks.extend(('versions', row[1], row) for row in self.db.get_versions_under(root))
+            tasks.extend(('manifests', f"{row[2]} v{row[3]:03d} (deduplicated)", row)
+                         for row in self.db.get_manifests_under(root))
+            rows = self.db.get_delta_versions_under(root)
+            delta_rows.extend(rows)
+            tasks.extend(('delta_versions', f"{row[2]} v{row[3]:03d} (delta)", row) for row in rows)
+
+        statuses = {}
+        with CatalogWriter() as self.writer, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowify_scrub") as executor:
+            for task, status in zip(tasks, executor.map(self._check, tasks)):
+                if task[0] == 'delta_versions':
+                    statuses[task[2][0]] = status
+        self.report.problems.extend(("catalog", str(e)) for e in self.writer.errors)
+        self._propagate_chains(delta_rows, statuses)
+        return self.report
@@ -0,0 +1,137 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import datetime
+from pathlib import Path
+import os
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+import math
+
+class SaveMetrics:
+    """Ring buffer of recent save outcomes with per-phase timings, bytes written and skip reasons."""
+    def __init__(self, size=500):
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def collecting(self, phases):
+        """Attribute phases timed on this thread to the given dict."""
+        previous = getattr(self.local, 'phases', None)
+        self.local.phases = phases
+        try:
+            yield phases
+        finally:
+            self.local.phases = previous
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = getattr(self.local, 'phases', None)
+            if phases is not None:
+                phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, outcome, mode=None, filepath=None, stall=0.0, worker=0.0, nbytes=0, phases=None, reason=None):
+        record = {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'outcome': outcome,
+            'mode': mode,
+            'file': Path(filepath).name if filepath else None,
+            'stall_seconds': stall,
+            'worker_seconds': worker,
+            'total_seconds': stall + worker,
+            'bytes_written': nbytes,
+            'phases': dict(phases or {}),
+            'reason': reason,
+        }
+        with self.lock:
+            self.records.append(record)
+
+    def add_job(self, job):
+        self.add('SAVED' if job.backup_path else 'FAILED', job.save_mode, job.original_path, job.stall_time,
+                 job.worker_time, job.bytes_written, job.phases, job.error)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+    def last_bytes(self, mode, filepath):
+        """Bytes the most recent successful save of filepath in mode stored, or 0 if there is none yet."""
+        name = Path(filepath).name
+        for record in reversed(self.snapshot()):
+            if record['outcome'] == 'SAVED' and record['mode'] == mode and record['file'] == name:
+                return record['bytes_written']
+        return 0
+
+    def stats(self, field):
+        """(last, mean, p95) of a field over successful saves, or None before the first one."""
+        values = [record[field] for record in self.snapshot() if record['outcome'] == 'SAVED']
+        if not values:
+            return None
+        ordered = sorted(values)
+        return values[-1], sum(values) / len(values), ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def export_jsonl(self, filepath):
+        write_text_atomic(filepath, ''.join(json.dumps(record) + '\n' for record in self.snapshot()))
+
+    def export_prometheus(self, filepath):
+        """Write the buffer as a node_exporter textfile: summaries, counters and phase totals."""
+        records = self.snapshot()
+        saved = [record for record in records if record['outcome'] == 'SAVED']
+        lines = []
+        for name, field, help_text in (('flowify_save_duration_seconds', 'total_seconds', "Time from save start to catalogued backup"),
+                                       ('flowify_save_stall_seconds', 'stall_seconds', "Time the interface was blocked"),
+                                       ('flowify_save_written_bytes', 'bytes_written', "Bytes written per save")):
+            values = sorted(record[field] for record in saved)
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for quantile in (0.5, 0.95):
+                if values:
+                    lines.append(f'{name}{{quantile="{quantile}"}} {values[math.ceil(quantile * len(values)) - 1]}')
+            lines += [f"{name}_sum {sum(values)}", f"{name}_count {len(values)}"]
+        lines += ["# HELP flowify_save_outcomes Saves in the buffer by outcome", "# TYPE flowify_save_outcomes gauge"]
+        outcomes = {}
+        for record in records:
+            outcomes[record['outcome']] = outcomes.get(record['outcome'], 0) + 1
+        lines += [f'flowify_save_outcomes{{outcome="{outcome}"}} {count}' for outcome, count in sorted(outcomes.items())]
+        lines += ["# HELP flowify_save_phase_seconds Time spent per save phase", "# TYPE flowify_save_phase_seconds gauge"]
+        phases = {}
+        for record in saved:
+            for phase, seconds in record['phases'].items():
+                phases[phase] = phases.get(phase, 0.0) + seconds
+        lines += [f'flowify_save_phase_seconds{{phase="{phase}"}} {seconds}' for phase, seconds in sorted(phases.items())]
+        write_text_atomic(filepath, '\n'.join(lines) + '\n')
+
+save_metrics = SaveMetrics()
+
+def write_text_atomic(filepath, text):
+    """Replace a text file in one step so readers such as a metrics collector never see half of it."""
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(f".{filepath.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, filepath)
+    finally:
+        tmp_path.unlink(missing_ok=True)
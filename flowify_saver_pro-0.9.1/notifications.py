@@ -0,0 +1,251 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import time
+from collections import deque
+import gpu
+import blf
+import bgl
+from gpu_extras.batch import batch_for_shader
+import math
+
+class NotificationManager:
+    FADE_REDRAW_INTERVAL = 1 / 30
+    TEXT_SIZE = 12
+    TITLE_SIZE = 14
+
+    def __init__(self):
+        self.message = ""
+        self.title = "Flowify Saver Pro"
+        self.icon = "INFO"
+        self.opacity = 0.0
+        self.start_time = 0.0
+        self.duration = 3.0  # Seconds to display
+        self.fade_duration = 0.5  # Seconds for fade in/out
+        self.draw_handler = None
+        self.queue = deque(maxlen=5)
+        self._geometry = {}
+        self._uniform_shader = None
+
+    def show(self, message, title="Flowify Saver Pro", icon="INFO"):
+        """Schedule a new notification; it waits for the current one to finish."""
+        if self.is_active():
+            if (message, title, icon) not in self.queue:
+                self.queue.append((message, title, icon))
+            return
+
+        self._start(message, title, icon)
+        if not bpy.app.timers.is_registered(self.update):
+            bpy.app.timers.register(self.update, persistent=True)
+        self.draw_handler = bpy.types.SpaceView3D.draw_handler_add(
+            self.draw_notification, (bpy.context,), 'WINDOW', 'POST_PIXEL'
+        )
+        self.tag_redraw()
+
+    def _start(self, message, title, icon):
+        self.message = message
+        self.title = title
+        self.icon = icon
+        self._geometry = {}
+        self.opacity = 0.0
+        self.start_time = time.monotonic()
+
+    def is_active(self):
+        """Check if a notification is currently displayed."""
+        return self.draw_handler is not None
+
+    def hide(self):
+        """Remove the current notification and anything queued behind it."""
+        self.queue.clear()
+        if self.draw_handler:
+            bpy.types.SpaceView3D.draw_handler_remove(self.draw_handler, 'WINDOW')
+            self.draw_handler = None
+            self.tag_redraw()
+        if bpy.app.timers.is_registered(self.update):
+            bpy.app.timers.unregister(self.update)
+
+    @staticmethod
+    def tag_redraw():
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+
+    def update(self):
+        """Update notification opacity and handle dismissal."""
+        elapsed = time.monotonic() - self.start_time
+
+        if elapsed < self.fade_duration:
+            self.opacity = elapsed / self.fade_duration
+            interval = self.FADE_REDRAW_INTERVAL
+        elif elapsed < self.duration - self.fade_duration:
+            # Fully shown: nothing changes until the fade-out starts
+            self.opacity = 1.0
+            interval = max(self.duration - self.fade_duration - elapsed, self.FADE_REDRAW_INTERVAL)
+        elif elapsed < self.duration:
+            self.opacity = (self.duration - elapsed) / self.fade_duration
+            interval = self.FADE_REDRAW_INTERVAL
+        elif self.queue:
+            self._start(*self.queue.popleft())
+            interval = self.FADE_REDRAW_INTERVAL
+        else:
+            # Returning None unregisters the timer
+            if self.draw_handler:
+                bpy.types.SpaceView3D.draw_handler_remove(self.draw_handler, 'WINDOW')
+                self.draw_handler = None
+            self.tag_redraw()
+            return None
+
+        self.tag_redraw()
+        return interval
+
+    def _geometry_for(self, region_width, region_height):
+        """Build the box, border and icon batches once per message and region size."""
+        key = (region_width, region_height)
+        geometry = self._geometry.get(key)
+        if geometry is not None:
+            return geometry
+
+        padding = 10
+        margin = 20
+        max_width = 300
+        font_id = 0
+
+        blf.size(font_id, self.TEXT_SIZE)
+        message_width = blf.dimensions(font_id, self.message)[0]
+        blf.size(font_id, self.TITLE_SIZE)
+        title_width = blf.dimensions(font_id, self.title)[0]
+        content_width = max(message_width, title_width)
+        box_width = min(max(content_width + padding * 2 + 30, 200), max_width)
+        box_height = 60
+        x = region_width - box_width - margin
+        y = region_height - box_height - margin
+
+        shader = self._shader()
+        radius = 8
+        segments = 16
+        vertices = []
+        indices = []
+
+        for corner in [(0, 0), (0, 1), (1, 1), (1, 0)]:
+            cx = x + (box_width if corner[0] else 0)
+            cy = y + (box_height if corner[1] else 0)
+            for i in range(segments + 1):
+                angle = math.pi / 2 * corner[0] + (math.pi / 2) * (1 - corner[1]) + (i / segments) * (math.pi / 2)
+                dx = radius * math.cos(angle) * (-1 if corner[0] else 1)
+                dy = radius * math.sin(angle) * (-1 if corner[1] else 1)
+                vertices.append((cx + dx, cy + dy))
+
+        vertices.extend([
+            (x + radius, y + radius),
+            (x + box_width - radius, y + radius),
+            (x + box_width - radius, y + box_height - radius),
+            (x + radius, y + box_height - radius)
+        ])
+
+        center_idx = len(vertices) - 4
+        for i in range(4):
+            for j in range(segments):
+                idx = i * (segments + 1) + j
+                next_idx = idx + 1 if j < segments else i * (segments + 1)
+                indices.extend([(center_idx + i, idx, next_idx)])
+            if i < 3:
+                indices.append((center_idx + i, center_idx + i + 1, (i + 1) * (segments + 1)))
+
+        vertices_border = [
+            (x, y), (x + box_width, y),
+            (x + box_width, y + box_height), (x, y + box_height), (x, y)
+        ]
+
+        icon_size = 16
+        icon_x = x + padding
+        icon_y = y + box_height / 2
+        segments = 32
+        icon_vertices = [(icon_x, icon_y)]
+        for i in range(segments + 1):
+            angle = 2 * math.pi * i / segments
+            icon_vertices.append((icon_x + icon_size / 2 * math.cos(angle), icon_y + icon_size / 2 * math.sin(angle)))
+        icon_indices = [(0, i + 1, i + 2) for i in range(segments)]
+        icon_indices[-1] = (0, segments + 1, 1)
+
+        geometry = {
+            'background': batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices),
+            'border': batch_for_shader(shader, 'LINE_STRIP', {"pos": vertices_border}),
+            'icon': batch_for_shader(shader, 'TRIS', {"pos": icon_vertices}, indices=icon_indices),
+            'title_position': (x + padding + 30, y + box_height - padding - 20, 0),
+            'message_position': (x + padding + 30, y + box_height - padding - 40, 0),
+        }
+        self._geometry[key] = geometry
+        return geometry
+
+    def _shader(self):
+        if self._uniform_shader is None:
+            self._uniform_shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+        return self._uniform_shader
+
+    def draw_notification(self, context):
+        """Draw the notification in the 3D View."""
+        try:
+            region = context.region
+            geometry = self._geometry_for(region.width, region.height)
+            font_id = 0
+
+            bg_color = (0.1, 0.1, 0.1, 0.8 * self.opacity)
+            border_color = (0.3, 0.3, 0.3, 1.0 * self.opacity)
+            text_color = (1.0, 1.0, 1.0, 1.0 * self.opacity)
+            icon_colors = {
+                'INFO': (0.0, 0.5, 1.0, 1.0 * self.opacity),
+                'WARNING': (1.0, 0.7, 0.0, 1.0 * self.opacity),
+                'ERROR': (1.0, 0.0, 0.0, 1.0 * self.opacity)
+            }
+            icon_color = icon_colors.get(self.icon, icon_colors['INFO'])
+
+            bgl.glEnable(bgl.GL_BLEND)
+            shader = self._shader()
+            shader.bind()
+            shader.uniform_float("color", bg_color)
+            geometry['background'].draw(shader)
+
+            bgl.glLineWidth(1)
+            shader.uniform_float("color", border_color)
+            geometry['border'].draw(shader)
+
+            shader.uniform_float("color", icon_color)
+            geometry['icon'].draw(shader)
+
+            blf.size(font_id, self.TITLE_SIZE)
+            blf.color(font_id, *text_color)
+            blf.position(font_id, *geometry['title_position'])
+            blf.draw(font_id, self.title)
+
+            blf.size(font_id, self.TEXT_SIZE)
+            blf.position(font_id, *geometry['message_position'])
+            blf.draw(font_id, self.message)
+
+            bgl.glDisable(bgl.GL_BLEND)
+            bgl.glLineWidth(1)
+        except Exception:
+            self.hide()
+
+# Global notification manager
+notification_manager = NotificationManager()
+
+def show_notification(message, title="Flowify Saver Pro", icon="INFO"):
+    """Display a notification in the 3D View."""
+    notification_manager.show(message, title, icon)
@@ -0,0 +1,584 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import sqlite3
+from pathlib import Path
+import os
+import platform
+import struct
+
+from .notifications import show_notification
+from .utils import COMPRESSION_SUFFIXES, DECODE_ERRORS, get_recent_files, is_blend_path, recent_files_cache
+from .metrics import save_metrics
+from .catalog import VersionDatabase
+from .retention import prune_backups, RetentionPolicy
+from .replication import replication_spec
+from .blendfile import DATABLOCK_COLLECTIONS, blend_index
+from .core import backup_worker, FlowifyCore, project_coordinator, replicator, scrub_runner
+from .search import SEARCH_WORKERS, search_indexer, search_roots
+from .browser import version_browser
+from .autosave import autosave_timer, project_settings
+
+class WM_OT_FlowifySaveProject(bpy.types.Operator):
+    bl_idname = "wm.flowify_save_project"
+    bl_label = "Save As"
+    bl_options = {'REGISTER'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filename: bpy.props.StringProperty(subtype="FILE_NAME")
+    directory: bpy.props.StringProperty(subtype="DIR_PATH")
+
+    def execute(self, context):
+        if not self.filename.strip() or any(c in self.filename for c in r'<>:"/\|?*'):
+            self.report({'ERROR'}, "Invalid filename")
+            show_notification("Invalid filename", icon='ERROR')
+            return {'CANCELLED'}
+
+        filename_path = Path(self.filename)
+        if filename_path.suffix.lower() != '.blend':
+            self.filename = f"{filename_path.stem}.blend"
+        
+        filepath = Path(self.directory) / self.filename
+        
+        if not filepath.parent.exists():
+            self.report({'ERROR'}, f"Directory does not exist")
+            show_notification(f"Directory does not exist", icon='ERROR')
+            return {'CANCELLED'}
+        if not os.access(filepath.parent, os.W_OK):
+            self.report({'ERROR'}, f"No write permission")
+            show_notification(f"No write permission", icon='ERROR')
+            return {'CANCELLED'}
+        
+        if FlowifyCore.safe_save(filepath, overwrite=True):
+            self.report({'INFO'}, f"Project saved: {filepath.name}")
+            show_notification(f"Project saved: {filepath.name}", icon='INFO')
+            if bpy.app.timers.is_registered(autosave_timer):
+                bpy.app.timers.unregister(autosave_timer)
+            bpy.app.timers.register(autosave_timer, persistent=True)
+            return {'FINISHED'}
+        
+        self.report({'ERROR'}, "Failed to save project")
+        show_notification("Failed to save project", icon='ERROR')
+        return {'CANCELLED'}
+
+    def invoke(self, context, event):
+        if bpy.data.is_saved and bpy.data.filepath:
+            self.filename = Path(bpy.data.filepath).name
+            self.directory = os.path.dirname(bpy.data.filepath)
+        else:
+            self.filename = "untitled.blend"
+            self.directory = os.path.expanduser("~/Documents")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class WM_OT_FlowifyCreateBackup(bpy.types.Operator):
+    bl_idname = "wm.flowify_create_backup"
+    bl_label = "Create Manual Backup"
+    
+    def execute(self, context):
+        props = context.scene.flowify_props
+        original_mode = props.auto_save_mode
+        if original_mode == 'OVERWRITE':
+            props.auto_save_mode = 'SUFFIX'
+        backup_path = FlowifyCore.create_backup(context)
+        props.auto_save_mode = original_mode
+        if backup_path:
+            self.report({'INFO'}, f"Backup created: {backup_path.name}")
+            show_notification(f"Backup created: {backup_path.name}", icon='INFO')
+            return {'FINISHED'}
+        self.report({'ERROR'}, "Backup creation failed")
+        show_notification("Backup creation failed", icon='ERROR')
+        return {'CANCELLED'}
+
+class WM_OT_FlowifyOpenProject(bpy.types.Operator):
+    bl_idname = "wm.flowify_open_project"
+    bl_label = "Open"
+    bl_options = {'REGISTER'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    def execute(self, context):
+        filepath = Path(self.filepath)
+        if not filepath.exists():
+            self.report({'ERROR'}, f"File does not exist")
+            show_notification(f"File does not exist", icon='ERROR')
+            return {'CANCELLED'}
+        if not is_blend_path(filepath):
+            self.report({'ERROR'}, "Please select a .blend file")
+            show_notification("Please select a .blend file", icon='ERROR')
+            return {'CANCELLED'}
+
+        if filepath.suffix in COMPRESSION_SUFFIXES.values():
+            filepath = FlowifyCore.decompress_backup(filepath)
+            if filepath is None:
+                self.report({'ERROR'}, "Could not decompress backup")
+                show_notification("Could not decompress backup", icon='ERROR')
+                return {'CANCELLED'}
+
+        bpy.ops.wm.open_mainfile(filepath=str(filepath))
+        self.report({'INFO'}, f"Opened: {filepath.name}")
+        show_notification(f"Opened: {filepath.name}", icon='INFO')
+        if not bpy.app.timers.is_registered(autosave_timer):
+            bpy.app.timers.register(autosave_timer, persistent=True)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class WM_OT_FlowifyOpenBackupFolder(bpy.types.Operator):
+    bl_idname = "wm.flowify_open_backup_folder"
+    bl_label = "Open Backup Folder"
+    
+    def execute(self, context):
+        if bpy.data.is_saved and bpy.data.filepath:
+            backup_dir = os.path.dirname(bpy.data.filepath)
+        else:
+            backup_dir = os.path.expanduser("~/Documents")
+        
+        if not os.path.exists(backup_dir):
+            self.report({'ERROR'}, f"Directory does not exist")
+            show_notification(f"Directory does not exist", icon='ERROR')
+            return {'CANCELLED'}
+        
+        if platform.system() == "Windows":
+            os.startfile(backup_dir)
+        elif platform.system() == "Darwin":
+            os.system(f"open {backup_dir}")
+        else:
+            os.system(f"xdg-open {backup_dir}")
+        
+        self.report({'INFO'}, f"Opened backup folder")
+        show_notification(f"Opened backup folder", icon='INFO')
+        return {'FINISHED'}
+
+class WM_OT_FlowifyOpenRecentProject(bpy.types.Operator):
+    bl_idname = "wm.flowify_open_recent_project"
+    bl_label = "Open Recent"
+    bl_options = {'REGISTER'}
+
+    def recent_files_items(self, context):
+        return recent_files_cache.get_items()
+
+    recent_file: bpy.props.EnumProperty(
+        name="Recent File",
+        description="Select a recent .blend file to open",
+        items=recent_files_items
+    )
+
+    def execute(self, context):
+        if self.recent_file == "NONE":
+            self.report({'WARNING'}, "No recent file selected")
+            show_notification("No recent file selected", icon='WARNING')
+            return {'CANCELLED'}
+        
+        filepath = Path(self.recent_file)
+        if not recent_files_cache.exists(self.recent_file):
+            self.report({'ERROR'}, f"File does not exist")
+            show_notification(f"File does not exist", icon='ERROR')
+            return {'CANCELLED'}
+        if not filepath.suffix.lower() == '.blend':
+            self.report({'ERROR'}, "Please select a .blend file")
+            show_notification("Please select a .blend file", icon='ERROR')
+            return {'CANCELLED'}
+
+        bpy.ops.wm.open_mainfile(filepath=str(filepath))
+        self.report({'INFO'}, f"Opened: {filepath.name}")
+        show_notification(f"Opened: {filepath.name}", icon='INFO')
+        if not bpy.app.timers.is_registered(autosave_timer):
+            bpy.app.timers.register(autosave_timer, persistent=True)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        recent_files = get_recent_files()
+        if not recent_files:
+            self.report({'WARNING'}, "No recent .blend files found")
+            show_notification("No recent .blend files found", icon='WARNING')
+            return {'CANCELLED'}
+        context.window_manager.invoke_props_dialog(self, width=400)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Select Recent Project")
+        layout.prop(self, "recent_file", text="")
+
+class WM_OT_FlowifyRestoreVersion(bpy.types.Operator):
+    bl_idname = "wm.flowify_restore_version"
+    bl_label = "Restore Version"
+    bl_options = {'REGISTER'}
+
+    status_labels = {'CORRUPT': "  - CORRUPT", 'MISSING': "  - MISSING DATA"}
+    # (file path, enum items) built when the dialog opens, kept alive for Blender
+    cached_items = (None, None)
+    retired_items = None
+
+    @classmethod
+    def build_items(cls, filepath):
+        items = []
+        if filepath:
+            original_path = Path(filepath)
+            base_name = FlowifyCore.project_base_name(original_path, 'VERSIONED')
+            db = VersionDatabase()
+            for manifest_id, version, timestamp, size, status in db.get_manifests(original_path.parent, base_name):
+                items.append((f"M:{manifest_id}", f"v{version:03d}  {timestamp[:19].replace('T', ' ')}  (deduplicated)"
+                              + cls.status_labels.get(status, ''), f"{size / (1024 * 1024):.1f} MB"))
+            for row in db.get_delta_versions(original_path.parent, base_name):
+                version_id, version, timestamp, size, kind, chain_length = row[:6]
+                items.append((f"D:{version_id}", f"v{version:03d}  {timestamp[:19].replace('T', ' ')}  (delta)"
+                              + cls.status_labels.get(row[9], ''),
+                              f"{size / (1024 * 1024):.1f} MB, {chain_length} deltas from keyframe"))
+        if not items:
+            items = [("NONE", "No stored versions", "")]
+        cls.retired_items = cls.cached_items[1]
+        cls.cached_items = (filepath, items)
+        return items
+
+    def version_items(self, context):
+        """The cached list, so redraws neither query the catalog nor hand Blender short-lived strings."""
+        filepath = bpy.data.filepath if bpy.data.is_saved else ''
+        if self.cached_items[0] != filepath:
+            return self.build_items(filepath)
+        return self.cached_items[1]
+
+    version: bpy.props.EnumProperty(
+        name="Version",
+        description="Select a deduplicated or delta version to rebuild",
+        items=version_items
+    )
+
+    def execute(self, context):
+        if self.version == "NONE":
+            self.report({'WARNING'}, "No version selected")
+            show_notification("No version selected", icon='WARNING')
+            return {'CANCELLED'}
+
+        original_path = Path(bpy.data.filepath)
+        base_name = FlowifyCore.project_base_name(original_path, 'VERSIONED')
+        db = VersionDatabase()
+        kind, version_id = self.version.split(':')
+        version_id = int(version_id)
+        if kind == 'M':
+            rows = db.get_manifests(original_path.parent, base_name)
+        else:
+            rows = db.get_delta_versions(original_path.parent, base_name)
+        version = next(row[1] for row in rows if row[0] == version_id)
+        target_path = original_path.parent / f"{base_name}_v{version:03d}{original_path.suffix}"
+        if target_path.exists():
+            target_path = target_path.with_name(f"{target_path.stem}_restored{original_path.suffix}")
+
+        if kind == 'M':
+            restored = FlowifyCore.restore_deduplicated_version(version_id, target_path)
+        else:
+            restored = FlowifyCore.restore_delta_version(version_id, target_path)
+        if restored:
+            self.report({'INFO'}, f"Restored: {target_path.name}")
+            show_notification(f"Restored: {target_path.name}", icon='INFO')
+            return {'FINISHED'}
+        self.report({'ERROR'}, "Restore failed: backup data is missing or damaged")
+        show_notification("Restore failed", icon='ERROR')
+        return {'CANCELLED'}
+
+    def invoke(self, context, event):
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            self.report({'WARNING'}, "File is not saved")
+            show_notification("File is not saved", icon='WARNING')
+            return {'CANCELLED'}
+        self.build_items(bpy.data.filepath)
+        context.window_manager.invoke_props_dialog(self, width=400)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Select Version to Restore")
+        layout.prop(self, "version", text="")
+
+class WM_OT_FlowifyRestoreDatablocks(bpy.types.Operator):
+    bl_idname = "wm.flowify_restore_datablocks"
+    bl_label = "Restore Datablocks"
+    bl_description = "Append selected objects, materials or other datablocks from a backup into the open file"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH", options={'SKIP_SAVE'})
+    link: bpy.props.BoolProperty(
+        name="Link",
+        description="Link the datablocks instead of appending them; uncompressed backups only",
+        default=False
+    )
+
+    def execute(self, context):
+        items = context.window_manager.flowify_restore_items
+        selection = [(item.kind, item.name) for item in items if item.selected]
+        if not selection:
+            self.report({'WARNING'}, "No datablocks selected")
+            show_notification("No datablocks selected", icon='WARNING')
+            return {'CANCELLED'}
+        name = Path(self.filepath).name
+        try:
+            loaded = FlowifyCore.append_datablocks(self.filepath, selection, context.scene, self.link)
+        except DECODE_ERRORS + (RuntimeError,) as e:
+            self.report({'ERROR'}, f"Could not restore from {name}: {e}")
+            show_notification("Restore failed", icon='ERROR')
+            return {'CANCELLED'}
+        items.clear()
+        message = f"Restored {len(loaded)} datablocks from {name}"
+        renamed = [block.name for block in loaded if block.name not in {name for kind, name in selection}]
+        if renamed:
+            message += f"; {len(renamed)} renamed to avoid existing names"
+        if len(loaded) < len(selection):
+            message += f"; {len(selection) - len(loaded)} not found"
+        self.report({'INFO'}, message)
+        show_notification(message, icon='INFO')
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        try:
+            datablocks = blend_index(self.filepath)
+        except DECODE_ERRORS + (ValueError, struct.error) as e:
+            self.report({'ERROR'}, f"Could not read backup: {e}")
+            show_notification("Could not read backup", icon='ERROR')
+            return {'CANCELLED'}
+        wm = context.window_manager
+        wm.flowify_restore_items.clear()
+        for kind, name, size in sorted(datablocks):
+            if kind in DATABLOCK_COLLECTIONS:
+                item = wm.flowify_restore_items.add()
+                item.name = name
+                item.kind = kind
+                item.size_kb = size / 1024
+        wm.flowify_restore_index = 0
+        wm.invoke_props_dialog(self, width=500)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        wm = context.window_manager
+        layout.label(text=f"Select datablocks to restore from {Path(self.filepath).name}")
+        layout.template_list("FLOWIFY_UL_Datablocks", "", wm, "flowify_restore_items", wm, "flowify_restore_index",
+                             rows=12)
+        row = layout.row()
+        row.enabled = Path(self.filepath).suffix not in COMPRESSION_SUFFIXES.values()
+        row.prop(self, "link")
+
+class WM_OT_FlowifyPruneBackups(bpy.types.Operator):
+    bl_idname = "wm.flowify_prune_backups"
+    bl_label = "Prune Backups"
+    bl_options = {'REGISTER'}
+
+    def _prune(self, context, dry_run):
+        props = context.scene.flowify_props
+        original_path = Path(bpy.data.filepath)
+        base_name = FlowifyCore.project_base_name(original_path, props.backup_pattern)
+        return prune_backups(original_path.parent, base_name, RetentionPolicy.from_props(props),
+                             dry_run=dry_run, protected=(original_path,))
+
+    def execute(self, context):
+        report = self._prune(context, dry_run=False)
+        self.report({'INFO'}, report.summary())
+        show_notification(report.summary(), icon='INFO')
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            self.report({'WARNING'}, "File is not saved")
+            show_notification("File is not saved", icon='WARNING')
+            return {'CANCELLED'}
+        self.preview = self._prune(context, dry_run=True)
+        if not self.preview.entries:
+            self.report({'INFO'}, "Nothing to prune")
+            show_notification("Nothing to prune", icon='INFO')
+            return {'CANCELLED'}
+        return context.window_manager.invoke_props_dialog(self, width=450)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text=self.preview.summary())
+        col = layout.column(align=True)
+        for name, size, reason in self.preview.entries[:15]:
+            col.label(text=f"{name}  ({size / (1024 * 1024):.1f} MB, {reason})")
+        if len(self.preview.entries) > 15:
+            col.label(text=f"... and {len(self.preview.entries) - 15} more")
+
+class WM_OT_FlowifyVerifyBackups(bpy.types.Operator):
+    bl_idname = "wm.flowify_verify_backups"
+    bl_label = "Verify Backups"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            self.report({'WARNING'}, "File is not saved")
+            show_notification("File is not saved", icon='WARNING')
+            return {'CANCELLED'}
+        bandwidth = context.scene.flowify_props.scrub_bandwidth * 1024 * 1024
+        if not scrub_runner.start(Path(bpy.data.filepath).parent, bandwidth):
+            self.report({'INFO'}, "Verification is already running")
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Verifying backups in the background")
+        show_notification("Verifying backups in the background", icon='INFO')
+        return {'FINISHED'}
+
+class WM_OT_FlowifyReplicateNow(bpy.types.Operator):
+    bl_idname = "wm.flowify_replicate_now"
+    bl_label = "Replicate Now"
+    bl_description = "Retry failed uploads and send everything still queued"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        props = context.scene.flowify_props
+        if not props.replication_target:
+            self.report({'WARNING'}, "No replication target set")
+            show_notification("No replication target set", icon='WARNING')
+            return {'CANCELLED'}
+        spec = replication_spec(props.replication_target)
+        try:
+            VersionDatabase().requeue_failed_replication(spec)
+        except sqlite3.Error as e:
+            self.report({'ERROR'}, f"Could not read the replication queue: {e}")
+            return {'CANCELLED'}
+        replicator.configure(spec, props.replication_endpoint, props.replication_bandwidth * 1024 * 1024,
+                             props.replication_connections)
+        replicator.last_error = None
+        replicator.kick()
+        self.report({'INFO'}, "Replicating backups in the background")
+        return {'FINISHED'}
+
+class WM_OT_FlowifyBrowseVersions(bpy.types.Operator):
+    bl_idname = "wm.flowify_browse_versions"
+    bl_label = "Browse Versions"
+    bl_options = {'REGISTER'}
+
+    action: bpy.props.EnumProperty(
+        items=[
+            ('REFRESH', "Refresh", "Reload the current page"),
+            ('FIRST', "First", "Show the newest backups"),
+            ('PREVIOUS', "Previous", "Show newer backups"),
+            ('NEXT', "Next", "Show older backups")
+        ],
+        default='REFRESH'
+    )
+
+    def execute(self, context):
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            self.report({'WARNING'}, "File is not saved")
+            return {'CANCELLED'}
+        page = {'REFRESH': version_browser.page, 'FIRST': 0,
+                'PREVIOUS': version_browser.page - 1, 'NEXT': version_browser.page + 1}[self.action]
+        version_browser.load(context.window_manager, Path(bpy.data.filepath),
+                             context.scene.flowify_props.backup_pattern, page)
+        return {'FINISHED'}
+
+class WM_OT_FlowifyCompareVersions(bpy.types.Operator):
+    bl_idname = "wm.flowify_compare_versions"
+    bl_label = "What Changed"
+    bl_description = "List the datablocks added, removed or resized since the previous backup"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        index = context.window_manager.flowify_version_index
+        if not 0 <= index < len(version_browser.rows):
+            self.report({'WARNING'}, "No version selected")
+            return {'CANCELLED'}
+        try:
+            comparison = version_browser.compare(index)
+        except DECODE_ERRORS + (ValueError, struct.error) as e:
+            self.report({'ERROR'}, f"Could not read backup: {e}")
+            show_notification("Could not read backup", icon='ERROR')
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{len(comparison.added)} added, {len(comparison.removed)} removed, "
+                              f"{len(comparison.resized)} resized")
+        return {'FINISHED'}
+
+class WM_OT_FlowifyUpdateSearchIndex(bpy.types.Operator):
+    bl_idname = "wm.flowify_update_search_index"
+    bl_label = "Update Index"
+    bl_description = "Read new and changed .blend files in the search folders into the search index"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        roots = search_roots(context.scene.flowify_props)
+        if not roots:
+            self.report({'WARNING'}, "No folders to index; save the file or set Search Folders")
+            return {'CANCELLED'}
+        if not search_indexer.start(roots, SEARCH_WORKERS):
+            self.report({'INFO'}, "The search index is already being updated")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Indexing {len(roots)} folders in the background")
+        return {'FINISHED'}
+
+class WM_OT_FlowifyExportMetrics(bpy.types.Operator):
+    bl_idname = "wm.flowify_export_metrics"
+    bl_label = "Export Metrics"
+    bl_options = {'REGISTER'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('JSONL', "JSON Lines", "One record per save, with phase timings"),
+            ('PROMETHEUS', "Prometheus", "Text file for the node_exporter textfile collector")
+        ],
+        default='JSONL'
+    )
+
+    def execute(self, context):
+        if not self.filepath:
+            self.report({'ERROR'}, "No file selected")
+            return {'CANCELLED'}
+        try:
+            if self.format == 'PROMETHEUS':
+                save_metrics.export_prometheus(self.filepath)
+            else:
+                save_metrics.export_jsonl(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not export metrics: {e}")
+            show_notification("Could not export metrics", icon='ERROR')
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported metrics: {Path(self.filepath).name}")
+        show_notification(f"Exported metrics: {Path(self.filepath).name}", icon='INFO')
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "flowify_metrics.prom" if self.format == 'PROMETHEUS' else "flowify_metrics.jsonl"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class WM_OT_FlowifyAutoSave(bpy.types.Operator):
+    bl_idname = "wm.flowify_auto_save"
+    bl_label = "Auto Save"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        props = project_settings()[0]
+        if props.auto_save_mode == 'OVERWRITE':
+            backup_path = FlowifyCore.create_backup(context, props)
+            if backup_path:
+                self.report({'INFO'}, f"Auto-saved in '{backup_path}'")
+                show_notification(f"Auto-saved in '{backup_path}'", icon='INFO')
+                return {'FINISHED'}
+            return {'CANCELLED'}
+
+        job = FlowifyCore.stage_backup(context, props)
+        if job is None:
+            return {'CANCELLED'}
+        library_jobs = project_coordinator.library_jobs(props)
+        backup_worker.submit(job, *library_jobs)
+        self.report({'INFO'}, f"Auto-save staged in {job.stall_time:.2f} s"
+                              + (f" with {len(library_jobs)} libraries" if library_jobs else ""))
+        return {'FINISHED'}
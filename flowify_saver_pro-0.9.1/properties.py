@@ -0,0 +1,195 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+
+from .search import SEARCH_WORKERS, search_indexer, search_roots
+
+def backup_pattern_update(self, context):
+    """Callback for backup_pattern changes."""
+    pass
+
+def search_query_update(self, context):
+    """Search as soon as the query is confirmed."""
+    search_indexer.search(self.search_query, search_roots(self), SEARCH_WORKERS)
+
+class FlowifyProperties(bpy.types.PropertyGroup):
+    auto_save_enabled: bpy.props.BoolProperty(
+        name="Enable Auto-Save",
+        default=False
+    )
+    auto_save_interval: bpy.props.IntProperty(
+        name="Interval (minutes)",
+        default=5,
+        min=1
+    )
+    auto_save_mode: bpy.props.EnumProperty(
+        name="Auto-save Mode",
+        description="Choose how auto-saves are stored: overwrite or create new file",
+        items=[
+            ('OVERWRITE', "Overwrite", "Overwrite the current file"),
+            ('SUFFIX', "Suffix", "Save with an incrementing suffix or timestamp"),
+            ('DEDUPLICATED', "Deduplicated", "Store versions as chunks in a shared store, keeping unchanged data only once"),
+            ('DELTA', "Delta", "Store a full keyframe every few versions and binary differences in between")
+        ],
+        default='SUFFIX'
+    )
+    idle_grace_period: bpy.props.IntProperty(
+        name="Idle Grace (seconds)",
+        description="Postpone an auto-save until there has been no editing for this long",
+        default=5,
+        min=0
+    )
+    max_deferral: bpy.props.IntProperty(
+        name="Max Deferral (minutes)",
+        description="Auto-save anyway once a save has been postponed this long",
+        default=2,
+        min=0
+    )
+    delta_keyframe_interval: bpy.props.IntProperty(
+        name="Keyframe Every",
+        description="Store a full copy every this many delta versions; bounds how many deltas a restore applies",
+        default=10,
+        min=1,
+        max=100
+    )
+    retention_enabled: bpy.props.BoolProperty(
+        name="Prune Old Backups",
+        description="Thin out old backups after each new one according to the retention settings",
+        default=False
+    )
+    retention_keep_last: bpy.props.IntProperty(
+        name="Keep Last",
+        description="Always keep this many of the newest backups",
+        default=10,
+        min=1
+    )
+    retention_hourly_hours: bpy.props.IntProperty(
+        name="Hourly for (hours)",
+        description="Keep one backup per hour for this many hours",
+        default=24,
+        min=0
+    )
+    retention_daily_days: bpy.props.IntProperty(
+        name="Daily for (days)",
+        description="Keep one backup per day for this many days",
+        default=30,
+        min=0
+    )
+    retention_weekly_weeks: bpy.props.IntProperty(
+        name="Weekly for (weeks)",
+        description="Keep one backup per week for this many weeks after that (0 keeps them forever)",
+        default=0,
+        min=0
+    )
+    retention_max_size: bpy.props.IntProperty(
+        name="Max Size (MB)",
+        description="Delete the oldest backups once a project's backups exceed this size (0 for no limit)",
+        default=0,
+        min=0
+    )
+    scrub_bandwidth: bpy.props.IntProperty(
+        name="Verify Bandwidth (MB/s)",
+        description="Read limit while verifying backups in the background, so saving and playback stay smooth (0 for no limit)",
+        default=50,
+        min=0
+    )
+    search_query: bpy.props.StringProperty(
+        name="Search",
+        description="Find files and backups by file or datablock name; add date:, after: or before: "
+                    "with YYYY-MM-DD, today, yesterday or a weekday to filter by modification date",
+        options={'SKIP_SAVE'},
+        update=search_query_update
+    )
+    search_roots: bpy.props.StringProperty(
+        name="Search Folders",
+        description="Project folders to index, separated by ';' (default: the open file's folder and those of its libraries)",
+        default=""
+    )
+    replication_enabled: bpy.props.BoolProperty(
+        name="Replicate Backups",
+        description="Copy every new backup to a second location in the background",
+        default=False
+    )
+    replication_target: bpy.props.StringProperty(
+        name="Target",
+        description="Folder on another drive or network share, or an s3://bucket/prefix URL. "
+                    "S3 credentials come from the usual AWS environment variables or config files",
+        default=""
+    )
+    replication_endpoint: bpy.props.StringProperty(
+        name="S3 Endpoint",
+        description="Endpoint URL for S3-compatible servers such as MinIO; leave empty for AWS",
+        default=""
+    )
+    replication_bandwidth: bpy.props.IntProperty(
+        name="Upload Bandwidth (MB/s)",
+        description="Upload limit, so replication does not saturate the network (0 for no limit)",
+        default=0,
+        min=0
+    )
+    replication_connections: bpy.props.IntProperty(
+        name="Connections",
+        description="Uploads running in parallel",
+        default=4,
+        min=1,
+        max=16
+    )
+    backup_compression: bpy.props.EnumProperty(
+        name="Compression",
+        description="How backups are compressed",
+        items=[
+            ('NONE', "None", "Write backups uncompressed"),
+            ('BLENDER', "Blender", "Use Blender's built-in compression; backups open directly"),
+            ('ZSTD', "Zstandard (.zst)", "Stream-compress backups with Zstandard after saving"),
+            ('GZIP', "Gzip (.gz)", "Stream-compress backups with gzip after saving"),
+            ('LZMA', "LZMA (.xz)", "Stream-compress backups with LZMA after saving; smallest but slowest")
+        ],
+        default='NONE'
+    )
+    compression_level: bpy.props.IntProperty(
+        name="Compression Level",
+        description="Codec level; clamped to 1-9 for gzip, 0-9 for LZMA and 1-22 for Zstandard",
+        default=3,
+        min=0,
+        max=22
+    )
+    backup_pattern: bpy.props.EnumProperty(
+        name="Backup Pattern",
+        description="Naming pattern for backups",
+        items=[
+            ('VERSIONED', "Versioned (e.g., _v001)", "Use incrementing version numbers"),
+            ('TIMESTAMPED', "Timestamped (e.g., _backup_DDMMYYYY_HH-MM-SS)", "Use date and time")
+        ],
+        default='VERSIONED',
+        update=backup_pattern_update
+    )
+
+class FlowifyVersionItem(bpy.types.PropertyGroup):
+    """One row of the version browser's current page."""
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    timestamp: bpy.props.StringProperty()
+    size_mb: bpy.props.FloatProperty()
+    status: bpy.props.StringProperty()
+    thumbnail_key: bpy.props.StringProperty()
+
+class FlowifyDatablockItem(bpy.types.PropertyGroup):
+    """One datablock of a backup offered for selective restore."""
+    kind: bpy.props.StringProperty()
+    size_kb: bpy.props.FloatProperty()
+    selected: bpy.props.BoolProperty(default=False)
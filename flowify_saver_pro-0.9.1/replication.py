@@ -0,0 +1,183 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from pathlib import Path
+import os
+import json
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None
+import math
+
+from .utils import STREAM_BLOCK_SIZE, durable_replace
+
+REPLICATION_ERRORS = (OSError,) + ((BotoCoreError, ClientError) if boto3 else ())
+
+def replication_spec(target):
+    """Canonical form of a replication target: an s3:// URL, or an absolute directory on another volume or share."""
+    target = target.strip()
+    if target.startswith('s3://'):
+        return target.rstrip('/')
+    return str(Path(os.path.expanduser(bpy.path.abspath(target))).resolve())
+
+def remote_directory(directory):
+    """Mirror a local directory's path under a target, keeping drive letters apart on Windows."""
+    directory = Path(directory)
+    relative = directory.relative_to(directory.anchor).as_posix()
+    drive = directory.drive.rstrip(':')
+    return f"{drive}/{relative}" if drive else relative
+
+class DirectoryTarget:
+    """Another local volume or a mounted NFS/SMB share."""
+    def __init__(self, root):
+        self.root = Path(root)
+        if not self.root.is_dir():
+            raise OSError(f"Replication target {self.root} is not available")
+
+    def exists(self, key, size):
+        try:
+            return (self.root / key).stat().st_size == size
+        except OSError:
+            return False
+
+    def put(self, source, key, limiter, stop):
+        """Copy source to key and return the bytes sent, or None when stopped part way."""
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + '.partial')
+        size = source.stat().st_size
+        offset = partial.stat().st_size if partial.exists() else 0
+        with open(source, 'rb') as src, open(partial, 'r+b' if offset else 'wb') as dst:
+            if 0 < offset <= size:
+                # A crash can leave the last block unwritten, so resume only after one that matches
+                offset = max(offset - STREAM_BLOCK_SIZE, 0)
+                src.seek(offset)
+                dst.seek(offset)
+                if src.read(STREAM_BLOCK_SIZE) != dst.read(STREAM_BLOCK_SIZE):
+                    offset = 0
+            else:
+                offset = 0
+            src.seek(offset)
+            dst.seek(offset)
+            dst.truncate()
+            while block := src.read(STREAM_BLOCK_SIZE):
+                if stop.is_set():
+                    return None
+                limiter.consume(len(block))
+                dst.write(block)
+        durable_replace(partial, target)
+        return size - offset
+
+    def put_bytes(self, data, key):
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + '.partial')
+        partial.write_bytes(data)
+        durable_replace(partial, target)
+
+    def close(self):
+        pass
+
+class S3Target:
+    """An S3-compatible bucket, including self-hosted stand-ins such as MinIO via the endpoint URL."""
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, url, endpoint=None, connections=4):
+        if boto3 is None:
+            raise OSError("S3 replication needs the boto3 package")
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = boto3.client('s3', endpoint_url=endpoint or None,
+                                   config=BotoConfig(max_pool_connections=connections,
+                                                     retries={'max_attempts': 5, 'mode': 'standard'}))
+
+    def _key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key, size):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))['ContentLength'] == size
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in {'404', 'NoSuchKey', 'NotFound'}:
+                return False
+            raise
+
+    def _unfinished_upload(self, key):
+        uploads = self.client.list_multipart_uploads(Bucket=self.bucket, Prefix=key).get('Uploads', [])
+        upload_id = next((upload['UploadId'] for upload in uploads if upload['Key'] == key), None)
+        parts = {}
+        if upload_id is not None:
+            for page in self.client.get_paginator('list_parts').paginate(Bucket=self.bucket, Key=key,
+                                                                           UploadId=upload_id):
+                for part in page.get('Parts', []):
+                    parts[part['PartNumber']] = (part['ETag'], part['Size'])
+        return upload_id, parts
+
+    def put(self, source, key, limiter, stop):
+        """Upload source to key and return the bytes sent, or None when stopped part way."""
+        key = self._key(key)
+        size = source.stat().st_size
+        if size <= self.PART_SIZE:
+            data = source.read_bytes()
+            limiter.consume(len(data))
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+            return size
+
+        upload_id, parts = self._unfinished_upload(key)
+        if upload_id is None:
+            upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)['UploadId']
+        sent = 0
+        with open(source, 'rb') as f:
+            for number in range(1, math.ceil(size / self.PART_SIZE) + 1):
+                part_size = min(self.PART_SIZE, size - (number - 1) * self.PART_SIZE)
+                if number in parts and parts[number][1] == part_size:
+                    continue
+                if stop.is_set():
+                    return None
+                f.seek((number - 1) * self.PART_SIZE)
+                data = f.read(part_size)
+                limiter.consume(len(data))
+                response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                   PartNumber=number, Body=data)
+                parts[number] = (response['ETag'], part_size)
+                sent += part_size
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': parts[number][0]} for number in sorted(parts)]})
+        return sent
+
+    def put_bytes(self, data, key):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def close(self):
+        self.client.close()
+
+def open_replication_target(spec, endpoint=None, connections=4):
+    if spec.startswith('s3://'):
+        return S3Target(spec, endpoint, connections)
+    return DirectoryTarget(spec)
+
+def replication_document(key, document):
+    """A queue item carrying a small JSON description, such as the chunk list of a deduplicated version."""
+    data = json.dumps(document, indent=1).encode('utf-8')
+    return key, None, data, len(data)
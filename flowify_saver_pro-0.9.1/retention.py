@@ -0,0 +1,138 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import datetime
+from pathlib import Path
+
+from .catalog import VersionDatabase
+from .stores import ChunkStore, DeltaStore
+
+class RetentionPolicy:
+    """Tiered thinning: the newest N, then one per hour, per day and per week, within a size cap."""
+    def __init__(self, keep_last=10, hourly_hours=24, daily_days=30, weekly_weeks=0, max_bytes=0):
+        self.keep_last = keep_last
+        self.hourly_hours = hourly_hours
+        self.daily_days = daily_days
+        self.weekly_weeks = weekly_weeks
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_props(cls, props):
+        return cls(props.retention_keep_last, props.retention_hourly_hours, props.retention_daily_days,
+                   props.retention_weekly_weeks, props.retention_max_size * 1024 * 1024)
+
+    def _bucket(self, index, timestamp, now):
+        age = now - timestamp
+        if index < self.keep_last:
+            return ('last', index)
+        if age < datetime.timedelta(hours=self.hourly_hours):
+            return ('hour', timestamp.strftime('%Y%m%d%H'))
+        if age < datetime.timedelta(hours=self.hourly_hours, days=self.daily_days):
+            return ('day', timestamp.date())
+        if not self.weekly_weeks or age < datetime.timedelta(hours=self.hourly_hours, days=self.daily_days,
+                                                             weeks=self.weekly_weeks):
+            return ('week', timestamp.isocalendar()[:2])
+        return None
+
+    def select(self, entries, now):
+        """Split (key, timestamp, size) entries into kept entries and (entry, reason) deletions."""
+        keep = []
+        delete = []
+        seen = set()
+        for index, entry in enumerate(sorted(entries, key=lambda e: e[1], reverse=True)):
+            bucket = self._bucket(index, entry[1], now)
+            if bucket is None:
+                delete.append((entry, "expired"))
+            elif bucket in seen:
+                delete.append((entry, "thinned"))
+            else:
+                seen.add(bucket)
+                keep.append(entry)
+
+        if self.max_bytes:
+            total = sum(entry[2] for entry in keep)
+            while len(keep) > 1 and total > self.max_bytes:
+                entry = keep.pop()
+                total -= entry[2]
+                delete.append((entry, "over size limit"))
+        return keep, delete
+
+class RetentionReport:
+    """What a pruning pass deleted, or would delete in a dry run."""
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.entries = []
+        self.freed_bytes = 0
+
+    def add(self, name, size, reason):
+        self.entries.append((name, size, reason))
+        self.freed_bytes += size
+
+    def summary(self):
+        verb = "Would delete" if self.dry_run else "Deleted"
+        return f"{verb} {len(self.entries)} backups ({self.freed_bytes / (1024 * 1024):.1f} MB)"
+
+def prune_backups(directory, base_name, policy, dry_run=False, protected=(), now=None):
+    """Apply a retention policy to one project's catalogued backups without scanning the disk."""
+    db = VersionDatabase()
+    now = now or datetime.datetime.now()
+    report = RetentionReport(dry_run)
+    protected = {str(path) for path in protected}
+
+    entries = [(row, datetime.datetime.fromisoformat(row[2]), row[3] or 0)
+               for row in db.get_version_sizes(directory, base_name) if row[1] not in protected]
+    deleted_ids = []
+    for (row, timestamp, size), reason in policy.select(entries, now)[1]:
+        if not dry_run:
+            try:
+                Path(row[1]).unlink(missing_ok=True)
+            except OSError:
+                continue
+            deleted_ids.append(row[0])
+        report.add(Path(row[1]).name, size, reason)
+    if deleted_ids:
+        db.delete_versions(deleted_ids)
+
+    entries = [(row, datetime.datetime.fromisoformat(row[2]), row[3] or 0)
+               for row in db.get_manifests(directory, base_name)]
+    deleted_ids = []
+    for (row, timestamp, size), reason in policy.select(entries, now)[1]:
+        deleted_ids.append(row[0])
+        report.add(f"{base_name} v{row[1]:03d} (deduplicated)", size, reason)
+    if deleted_ids and not dry_run:
+        ChunkStore().remove(db.delete_manifests(deleted_ids))
+
+    rows = db.get_delta_versions(directory, base_name)
+    entries = [(row, datetime.datetime.fromisoformat(row[2]), row[8] or 0) for row in rows]
+    doomed = {entry[0][0]: reason for entry, reason in policy.select(entries, now)[1]}
+    # A delta needs every version back to its keyframe, so only whole chains can go
+    keyframes = {}
+    chains = {}
+    for row in sorted(rows, key=lambda r: r[1]):
+        keyframes[row[0]] = row[0] if row[4] == 'FULL' else keyframes.get(row[6])
+        chains.setdefault(keyframes[row[0]], []).append(row)
+    deleted_rows = []
+    for members in chains.values():
+        if all(row[0] in doomed for row in members):
+            deleted_rows.extend(members)
+            for row in members:
+                report.add(f"{base_name} v{row[1]:03d} (delta)", row[8] or 0, doomed[row[0]])
+    if deleted_rows and not dry_run:
+        db.delete_delta_versions([row[0] for row in deleted_rows])
+        DeltaStore().remove([row[7] for row in deleted_rows])
+    return report
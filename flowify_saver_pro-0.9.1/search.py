@@ -0,0 +1,212 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+import sqlite3
+from pathlib import Path
+import os
+import struct
+import threading
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .notifications import show_notification
+from .utils import DECODE_ERRORS, iter_project_files
+from .catalog import VersionDatabase
+from .blendfile import read_blend_index
+from .core import project_coordinator
+
+def index_search_file(filepath):
+    """Stat one .blend and list its datablocks for the search index, or None if it disappeared."""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    try:
+        version, datablocks = read_blend_index(filepath)
+    except DECODE_ERRORS + (ValueError, struct.error):
+        version, datablocks = None, []
+    return filepath, stat.st_size, stat.st_mtime_ns, version, datablocks
+
+SEARCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+def search_executor(workers, processes=False):
+    """A pool of threads, or of forked processes for the headless command line."""
+    if processes and 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(workers)
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+def search_date(value, today=None):
+    """Parse YYYY-MM-DD, today, yesterday or a weekday name, which means the last such day before today."""
+    today = today or datetime.date.today()
+    value = value.lower()
+    if value == 'today':
+        return today
+    if value == 'yesterday':
+        return today - datetime.timedelta(days=1)
+    for index, day in enumerate(WEEKDAYS):
+        if len(value) >= 3 and day.startswith(value):
+            return today - datetime.timedelta(days=(today.weekday() - index - 1) % 7 + 1)
+    return datetime.date.fromisoformat(value)
+
+def parse_search_query(text, today=None):
+    """Split a search into name terms and a date range from date:, after: or before:.
+
+    Returns (terms, after, before) with ISO timestamps or None for the bounds.
+    """
+    terms = []
+    after = before = None
+    for token in text.split():
+        key, sep, value = token.partition(':')
+        key = key.lower()
+        if sep and value and key in {'date', 'after', 'before'}:
+            day = search_date(value, today)
+            if key in {'date', 'after'}:
+                after = datetime.datetime.combine(day, datetime.time()).isoformat()
+            if key in {'date', 'before'}:
+                end = day + datetime.timedelta(days=1) if key == 'date' else day
+                before = datetime.datetime.combine(end, datetime.time()).isoformat()
+        else:
+            terms.append(token)
+    return terms, after, before
+
+def search_roots(props):
+    """Folders to index: the ones listed in the settings, or those of the open file and its libraries."""
+    roots = [Path(bpy.path.abspath(root.strip())).expanduser() for root in props.search_roots.split(';') if root.strip()]
+    if not roots:
+        roots = sorted(project_coordinator.directories())
+    return [root for root in roots if root.is_dir()]
+
+class SearchIndexer:
+    """Keeps the full-text search index in step with every .blend under a set of project roots."""
+    BATCH_SIZE = 200
+    REFRESH_INTERVAL = 300
+    RESULT_LIMIT = 100
+
+    def __init__(self):
+        self.thread = None
+        self.cancelled = False
+        self.progress = (0, 0)
+        self.summary = None
+        self.last_run = None
+        self.results = []
+        self.query_error = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self, roots, workers=4, processes=False):
+        """Update the index for roots and return (read, removed, unchanged) file counts.
+
+        processes reads files in forked worker processes, which only the command line asks for.
+        """
+        db = VersionDatabase()
+        changed = []
+        removed = unchanged = 0
+        for root in roots:
+            known = db.get_search_stamps(root)
+            for path in iter_project_files([root], backups=None):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if known.pop(str(path), None) == (stat.st_size, stat.st_mtime_ns):
+                    unchanged += 1
+                else:
+                    changed.append(str(path))
+            # Whatever was not found again has been deleted or moved
+            db.remove_search_entries(list(known))
+            removed += len(known)
+        self.progress = (0, len(changed))
+        executor = search_executor(max(1, workers), processes)
+        batch = []
+        done = 0
+        try:
+            for entry in executor.map(index_search_file, changed, chunksize=8):
+                if self.cancelled:
+                    break
+                done += 1
+                if entry is not None:
+                    batch.append(entry)
+                if len(batch) >= self.BATCH_SIZE:
+                    db.update_search_entries(batch)
+                    batch = []
+                self.progress = (done, len(changed))
+            db.update_search_entries(batch)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.last_run = time.monotonic()
+        return done, removed, unchanged
+
+    def start(self, roots, workers=4):
+        if self.running or not roots:
+            return False
+        self.cancelled = False
+        self.summary = None
+        self.thread = threading.Thread(target=self._run, args=(roots, workers), name="flowify_search_index",
+                                       daemon=True)
+        self.thread.start()
+        if not bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.register(self.poll, first_interval=0.5, persistent=True)
+        return True
+
+    def _run(self, roots, workers):
+        try:
+            done, removed, unchanged = self.run(roots, workers)
+            self.summary = f"Search index: {done} files read, {removed} removed, {unchanged} unchanged"
+        except (OSError, sqlite3.Error) as e:
+            self.summary = f"Search index failed: {e}"
+
+    def poll(self):
+        if self.running:
+            return 0.5
+        if self.summary is not None and not self.cancelled:
+            show_notification(self.summary, icon='ERROR' if 'failed' in self.summary else 'INFO')
+        return None
+
+    def search(self, text, roots=None, workers=4):
+        """Run a search against the index as it is, refreshing a stale index in the background."""
+        self.results = []
+        self.query_error = None
+        if roots and (self.last_run is None or time.monotonic() - self.last_run > self.REFRESH_INTERVAL):
+            self.start(roots, workers)
+        if not text.strip():
+            return self.results
+        try:
+            terms, after, before = parse_search_query(text)
+            self.results = VersionDatabase().search(terms, after, before, self.RESULT_LIMIT)
+        except ValueError as e:
+            self.query_error = str(e)
+        except sqlite3.Error as e:
+            self.query_error = f"Search failed: {e}"
+        return self.results
+
+    def shutdown(self):
+        self.cancelled = True
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if bpy.app.timers.is_registered(self.poll):
+            bpy.app.timers.unregister(self.poll)
+
+search_indexer = SearchIndexer()
@@ -0,0 +1,277 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from pathlib import Path
+import os
+import hashlib
+import json
+import struct
+import shutil
+import numpy as np
+
+from .utils import STREAM_BLOCK_SIZE, data_dir
+
+class ContentChunker:
+    """Content-defined chunking with a windowed gear hash; subclasses pick the chunk sizes."""
+    MIN_CHUNK = 256 * 1024
+    MAX_CHUNK = 4 * 1024 * 1024
+    BOUNDARY_MASK = (1 << 20) - 1  # ~1 MiB average on top of MIN_CHUNK
+    WINDOW = 64
+    READ_SIZE = 8 * 1024 * 1024
+    _GEAR = np.random.default_rng(0x466C6F77).integers(0, 2**32, 256, dtype=np.uint32)
+
+    @classmethod
+    def _cut_points(cls, buf, final):
+        """Return chunk end offsets in buf; the unterminated tail is left out unless final."""
+        data = np.frombuffer(buf, dtype=np.uint8)
+        sums = np.cumsum(cls._GEAR[data], dtype=np.uint32)
+        window = sums[cls.WINDOW:] - sums[:-cls.WINDOW]
+        candidates = np.flatnonzero((window & cls.BOUNDARY_MASK) == 0) + cls.WINDOW + 1
+        cuts = []
+        start = 0
+        while True:
+            i = np.searchsorted(candidates, start + cls.MIN_CHUNK)
+            if i < len(candidates) and candidates[i] <= start + cls.MAX_CHUNK:
+                end = int(candidates[i])
+            elif start + cls.MAX_CHUNK <= len(buf):
+                end = start + cls.MAX_CHUNK
+            else:
+                break
+            cuts.append(end)
+            start = end
+        if final and start < len(buf):
+            cuts.append(len(buf))
+        return cuts
+
+    @classmethod
+    def iter_chunks(cls, f):
+        """Split a binary stream into content-defined chunks."""
+        buf = b''
+        while True:
+            block = f.read(cls.READ_SIZE)
+            buf += block
+            start = 0
+            for end in cls._cut_points(buf, final=not block):
+                yield buf[start:end]
+                start = end
+            if not block:
+                return
+            buf = buf[start:]
+
+class ChunkStore(ContentChunker):
+    """Content-addressed store of .blend chunks shared by all deduplicated versions."""
+    def __init__(self, root=None):
+        if root is None:
+            root = data_dir() / 'chunks'
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def chunk_path(self, digest):
+        return self.root / digest[:2] / digest
+
+    def put(self, chunk):
+        """Store a chunk unless it is already present; return (digest, bytes_written)."""
+        digest = hashlib.blake2b(chunk, digest_size=20).hexdigest()
+        path = self.chunk_path(digest)
+        if path.exists():
+            return digest, 0
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open('wb') as f:
+            f.write(chunk)
+        os.replace(tmp_path, path)
+        return digest, len(chunk)
+
+    def store_file(self, filepath):
+        """Chunk a file into the store and return (chunks, size, stored_bytes)."""
+        chunks = []
+        size = stored_bytes = 0
+        with open(filepath, 'rb') as f:
+            for chunk in self.iter_chunks(f):
+                digest, written = self.put(chunk)
+                chunks.append((digest, len(chunk)))
+                size += len(chunk)
+                stored_bytes += written
+        return chunks, size, stored_bytes
+
+    def remove(self, digests):
+        for digest in digests:
+            self.chunk_path(digest).unlink(missing_ok=True)
+
+    def restore_file(self, chunks, target_path):
+        """Rebuild a file from its manifest; return False if a chunk is missing or damaged."""
+        target_path = Path(target_path)
+        tmp_path = target_path.with_name(target_path.name + '.tmp')
+        try:
+            with tmp_path.open('wb') as out:
+                for digest, length in chunks:
+                    data = self.chunk_path(digest).read_bytes()
+                    if len(data) != length:
+                        raise OSError(f"Chunk {digest} is damaged")
+                    out.write(data)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return False
+        os.replace(tmp_path, target_path)
+        return True
+
+class DeltaStore(ContentChunker):
+    """Keyframes and binary deltas between consecutive versions."""
+    MIN_CHUNK = 8 * 1024
+    MAX_CHUNK = 256 * 1024
+    BOUNDARY_MASK = (1 << 14) - 1
+    READ_SIZE = 4 * 1024 * 1024
+    MAGIC = b'FLDELTA1'
+
+    def __init__(self, root=None):
+        if root is None:
+            root = data_dir() / 'deltas'
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, object_name):
+        return self.root / object_name
+
+    def _basis_paths(self, directory, base_name):
+        key = hashlib.blake2b(f"{directory}\0{base_name}".encode(), digest_size=8).hexdigest()
+        return self.root / f"{key}.basis", self.root / f"{key}.index"
+
+    def load_basis(self, directory, base_name, version_id):
+        """Return (basis_path, index) for the version a new delta would follow, or None if not cached."""
+        basis_path, index_path = self._basis_paths(directory, base_name)
+        try:
+            with index_path.open('r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('version_id') != version_id or not basis_path.exists():
+            return None
+        return basis_path, index['chunks']
+
+    def save_basis(self, src_path, directory, base_name, version_id, chunks):
+        """Keep src as the basis for the next delta; moves src."""
+        basis_path, index_path = self._basis_paths(directory, base_name)
+        os.replace(src_path, basis_path)
+        tmp_path = index_path.with_suffix('.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump({'version_id': version_id, 'chunks': chunks}, f)
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def index_file(cls, filepath):
+        """Map chunk digest to (offset, length) for a file."""
+        chunks = {}
+        offset = 0
+        with open(filepath, 'rb') as f:
+            for chunk in cls.iter_chunks(f):
+                chunks.setdefault(hashlib.blake2b(chunk, digest_size=16).hexdigest(), (offset, len(chunk)))
+                offset += len(chunk)
+        return chunks
+
+    def write_keyframe(self, src_path, object_name):
+        target = self.object_path(object_name)
+        try:
+            os.link(src_path, target)
+        except OSError:
+            shutil.copyfile(src_path, target)
+        return target.stat().st_size
+
+    def write_delta(self, src_path, basis_chunks, object_name):
+        """Encode src against the basis index; return (delta_bytes, src_index)."""
+        target = self.object_path(object_name)
+        tmp_path = target.with_suffix('.tmp')
+        chunks = {}
+        offset = 0
+        pending_copy = None
+        try:
+            with open(src_path, 'rb') as src, tmp_path.open('wb') as out:
+                out.write(self.MAGIC)
+                for chunk in self.iter_chunks(src):
+                    digest = hashlib.blake2b(chunk, digest_size=16).hexdigest()
+                    chunks.setdefault(digest, (offset, len(chunk)))
+                    offset += len(chunk)
+                    match = basis_chunks.get(digest)
+                    if match is not None:
+                        if pending_copy and pending_copy[0] + pending_copy[1] == match[0]:
+                            pending_copy = (pending_copy[0], pending_copy[1] + match[1])
+                            continue
+                        if pending_copy:
+                            out.write(b'C' + struct.pack('<QI', *pending_copy))
+                        pending_copy = tuple(match)
+                    else:
+                        if pending_copy:
+                            out.write(b'C' + struct.pack('<QI', *pending_copy))
+                            pending_copy = None
+                        out.write(b'D' + struct.pack('<I', len(chunk)))
+                        out.write(chunk)
+                if pending_copy:
+                    out.write(b'C' + struct.pack('<QI', *pending_copy))
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return target.stat().st_size, chunks
+
+    def apply(self, basis_path, object_name, out_path):
+        with open(basis_path, 'rb') as basis, self.object_path(object_name).open('rb') as delta, \
+                open(out_path, 'wb') as out:
+            if delta.read(len(self.MAGIC)) != self.MAGIC:
+                raise OSError(f"{object_name} is not a delta")
+            while op := delta.read(1):
+                if op == b'C':
+                    offset, length = struct.unpack('<QI', delta.read(12))
+                    basis.seek(offset)
+                    while length:
+                        block = basis.read(min(length, STREAM_BLOCK_SIZE))
+                        if not block:
+                            raise OSError("Delta basis is truncated")
+                        out.write(block)
+                        length -= len(block)
+                elif op == b'D':
+                    length, = struct.unpack('<I', delta.read(4))
+                    block = delta.read(length)
+                    if len(block) != length:
+                        raise OSError(f"{object_name} is truncated")
+                    out.write(block)
+                else:
+                    raise OSError(f"{object_name} is damaged")
+
+    def restore(self, chain, target_path):
+        """Rebuild a version from its keyframe and deltas; return False if any object is missing or damaged."""
+        target_path = Path(target_path)
+        current = self.object_path(chain[0])
+        temporaries = []
+        try:
+            for step, object_name in enumerate(chain[1:]):
+                out_path = target_path.with_name(f"{target_path.name}.{step}.tmp")
+                temporaries.append(out_path)
+                self.apply(current, object_name, out_path)
+                current = out_path
+            if temporaries:
+                os.replace(current, target_path)
+            else:
+                shutil.copyfile(current, target_path)
+        except (OSError, struct.error):
+            return False
+        finally:
+            for tmp_path in temporaries:
+                tmp_path.unlink(missing_ok=True)
+        return True
+
+    def remove(self, object_names):
+        for object_name in object_names:
+            self.object_path(object_name).unlink(missing_ok=True)
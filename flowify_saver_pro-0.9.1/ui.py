@@ -0,0 +1,285 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from pathlib import Path
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+import math
+
+from .utils import COMPRESSION_SUFFIXES
+from .metrics import save_metrics
+from .replication import replication_spec
+from .core import replicator, scrub_runner
+from .search import search_indexer
+from .browser import thumbnail_cache, version_browser, VersionBrowser
+from .autosave import autosave_scheduler, project_settings
+
+def draw_flowify_icon(self, context):
+    layout = self.layout
+    props = project_settings()[0]
+    icon = 'RADIOBUT_ON' if props.auto_save_enabled else 'RADIOBUT_OFF'
+    layout.popover(panel="FLOWIFY_PT_POPOVER_PANEL", icon=icon, text="")
+
+def draw_main_settings(layout, context):
+    """The actions and auto-save settings shared by the header popover and the N-panel."""
+    props = context.scene.flowify_props
+    
+    box = layout.box()
+    box.label(text="Flowify Pro", icon='TOOL_SETTINGS')
+    
+    box.operator("wm.flowify_save_project", icon='FILE_TICK')
+    box.operator("wm.flowify_create_backup", icon='FILE_BACKUP')
+    box.operator("wm.flowify_open_project", icon='FILE')
+    box.operator("wm.flowify_open_backup_folder", icon='FILE_FOLDER')
+    box.operator("wm.flowify_open_recent_project", icon='FILE_REFRESH')
+    box.operator("wm.flowify_restore_version", icon='RECOVER_LAST')
+    
+    box.separator(factor=0.5)
+    
+    layout.use_property_split = True
+    layout.use_property_decorate = False
+    col = box.column(align=True)
+    col.prop(props, "auto_save_enabled", icon='CHECKBOX_HLT' if props.auto_save_enabled else 'CHECKBOX_DEHLT')
+    project_scene = project_settings()[1]
+    if project_scene != context.scene:
+        col.label(text=f"Auto-save uses the settings of scene '{project_scene.name}'", icon='INFO')
+    box.separator(factor=0.7)
+    box.prop(props, "auto_save_mode", icon='FILE_CACHE')
+    box.separator(factor=0.7)
+    box.prop(props, "auto_save_interval", icon='TIME')
+    box.prop(props, "idle_grace_period")
+    box.prop(props, "max_deferral")
+    box.separator(factor=0.7)
+    box.prop(props, "backup_pattern", icon='OUTLINER_DATA_GP_LAYER')
+    box.prop(props, "backup_compression", icon='PACKAGE')
+    if props.backup_compression in COMPRESSION_SUFFIXES:
+        box.prop(props, "compression_level")
+    counts = autosave_scheduler.counts
+    if counts['SKIPPED_CLEAN'] or counts['DEFERRED']:
+        box.label(text=f"Skipped {counts['SKIPPED_CLEAN']} unchanged ({autosave_scheduler.bytes_avoided / (1024 * 1024):.0f} MB), "
+                       f"deferred {counts['DEFERRED']}", icon='INFO')
+
+class FLOWIFY_PT_PopoverPanel(bpy.types.Panel):
+    bl_label = "Flowify Pro"
+    bl_idname = "FLOWIFY_PT_POPOVER_PANEL"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'HEADER'
+    bl_ui_units_x = 20
+
+    def draw(self, context):
+        draw_main_settings(self.layout, context)
+
+class FLOWIFY_PT_NPanel(bpy.types.Panel):
+    bl_label = "Flowify Pro"
+    bl_idname = "FLOWIFY_PT_NPANEL"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Flowify"
+
+    SEARCH_LINES = 10
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.flowify_props
+        draw_main_settings(layout, context)
+
+        box = layout.box()
+        box.prop(props, "retention_enabled", icon='TRASH')
+        col = box.column(align=True)
+        col.active = props.retention_enabled
+        col.prop(props, "retention_keep_last")
+        col.prop(props, "retention_hourly_hours")
+        col.prop(props, "retention_daily_days")
+        col.prop(props, "retention_weekly_weeks")
+        col.prop(props, "retention_max_size")
+        box.operator("wm.flowify_prune_backups", icon='BRUSH_DATA')
+
+        box = layout.box()
+        box.prop(props, "scrub_bandwidth")
+        if scrub_runner.running:
+            box.label(text="Verifying backups...", icon='SORTTIME')
+        else:
+            box.operator("wm.flowify_verify_backups", icon='CHECKMARK')
+        if bpy.data.is_saved and bpy.data.filepath:
+            damaged = scrub_runner.damaged(Path(bpy.data.filepath), props.backup_pattern)
+            for name, status in damaged[:5]:
+                box.label(text=f"{name}: {status.lower()}", icon='ERROR')
+            if len(damaged) > 5:
+                box.label(text=f"... and {len(damaged) - 5} more")
+
+        box = layout.box()
+        box.prop(props, "replication_enabled", icon='EXPORT')
+        col = box.column(align=True)
+        col.active = props.replication_enabled
+        col.prop(props, "replication_target")
+        if props.replication_target.strip().startswith('s3://'):
+            col.prop(props, "replication_endpoint")
+            if boto3 is None:
+                col.label(text="S3 needs the boto3 package", icon='ERROR')
+        col.prop(props, "replication_bandwidth")
+        col.prop(props, "replication_connections")
+        if props.replication_target:
+            counts = replicator.status(replication_spec(props.replication_target))
+            pending, pending_bytes = counts.get('PENDING', (0, 0))
+            failed = counts.get('FAILED', (0, 0))[0]
+            if pending or failed:
+                col.label(text=f"{pending} queued ({pending_bytes / (1024 * 1024):.0f} MB), {failed} failed",
+                          icon='SORTTIME' if replicator.running else 'INFO')
+            elif counts:
+                col.label(text="All backups replicated", icon='CHECKMARK')
+            if replicator.last_error:
+                col.label(text=replicator.last_error, icon='ERROR')
+            col.operator("wm.flowify_replicate_now", icon='FILE_REFRESH')
+
+        box = layout.box()
+        box.prop(props, "search_query", text="", icon='VIEWZOOM')
+        row = box.row(align=True)
+        row.prop(props, "search_roots", text="")
+        if search_indexer.running:
+            done, total = search_indexer.progress
+            row.label(text=f"Indexing {done}/{total}", icon='SORTTIME')
+        else:
+            row.operator("wm.flowify_update_search_index", text="", icon='FILE_REFRESH')
+        if search_indexer.query_error:
+            box.label(text=search_indexer.query_error, icon='ERROR')
+        elif props.search_query.strip() and not search_indexer.results:
+            box.label(text="No matches")
+        col = box.column(align=True)
+        col.operator_context = 'EXEC_DEFAULT'
+        for filepath, modified, size, matches in search_indexer.results[:self.SEARCH_LINES]:
+            row = col.row(align=True)
+            text = f"{Path(filepath).name}  {modified[:16].replace('T', ' ')}"
+            if matches:
+                text += f"  ({', '.join(matches[:3])}{', ...' if len(matches) > 3 else ''})"
+            row.label(text=text)
+            row.operator("wm.flowify_open_project", text="", icon='FILE').filepath = filepath
+            row.operator_context = 'INVOKE_DEFAULT'
+            row.operator("wm.flowify_restore_datablocks", text="", icon='APPEND_BLEND').filepath = filepath
+        if len(search_indexer.results) > self.SEARCH_LINES:
+            col.label(text=f"... and {len(search_indexer.results) - self.SEARCH_LINES} more")
+
+        box = layout.box()
+        box.label(text="Save Metrics", icon='SORTTIME')
+        col = box.column(align=True)
+        for label, field, unit, scale in (("Duration", 'total_seconds', "s", 1),
+                                          ("UI stall", 'stall_seconds', "s", 1),
+                                          ("Written", 'bytes_written', "MB", 1024 * 1024)):
+            stats = save_metrics.stats(field)
+            if stats:
+                last, mean, p95 = (value / scale for value in stats)
+                col.label(text=f"{label}: {last:.2f} / {mean:.2f} / {p95:.2f} {unit} (last/avg/p95)")
+        if not save_metrics.stats('total_seconds'):
+            col.label(text="No saves recorded yet")
+        row = box.row(align=True)
+        row.operator("wm.flowify_export_metrics", text="JSON Lines", icon='EXPORT').format = 'JSONL'
+        row.operator("wm.flowify_export_metrics", text="Prometheus", icon='EXPORT').format = 'PROMETHEUS'
+
+class FLOWIFY_UL_Versions(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        icon_value = thumbnail_cache.icon_id(item.thumbnail_key, item.filepath)
+        row = layout.row(align=True)
+        if item.status in {'CORRUPT', 'MISSING'}:
+            row.label(text=item.name, icon='ERROR')
+        elif icon_value:
+            row.label(text=item.name, icon_value=icon_value)
+        else:
+            row.label(text=item.name, icon='FILE_BLEND')
+        row.label(text=item.timestamp)
+        row.label(text=f"{item.size_mb:.1f} MB")
+
+class FLOWIFY_UL_Datablocks(bpy.types.UIList):
+    icons = {'Object': 'OBJECT_DATA', 'Mesh': 'MESH_DATA', 'Material': 'MATERIAL', 'Image': 'IMAGE_DATA',
+             'Collection': 'OUTLINER_COLLECTION', 'Scene': 'SCENE_DATA', 'World': 'WORLD', 'Camera': 'CAMERA_DATA',
+             'Light': 'LIGHT', 'bNodeTree': 'NODETREE', 'bAction': 'ACTION', 'Tex': 'TEXTURE'}
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "selected", text="")
+        row.label(text=item.name, icon=self.icons.get(item.kind, 'DOT'))
+        row.label(text=f"{item.size_kb:.0f} KB")
+
+class FLOWIFY_PT_VersionBrowser(bpy.types.Panel):
+    bl_label = "Versions"
+    bl_idname = "FLOWIFY_PT_VERSION_BROWSER"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Flowify"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        if not bpy.data.is_saved or not bpy.data.filepath:
+            layout.label(text="Save the file to browse its backups", icon='INFO')
+            return
+        wm = context.window_manager
+        project = VersionBrowser.project_for(Path(bpy.data.filepath), context.scene.flowify_props.backup_pattern)
+        if version_browser.project != project:
+            layout.operator("wm.flowify_browse_versions", text="Load Versions", icon='FILE_REFRESH').action = 'REFRESH'
+            return
+
+        row = layout.row(align=True)
+        sub = row.row(align=True)
+        sub.enabled = version_browser.page > 0
+        sub.operator("wm.flowify_browse_versions", text="", icon='REW').action = 'FIRST'
+        sub.operator("wm.flowify_browse_versions", text="", icon='TRIA_LEFT').action = 'PREVIOUS'
+        pages = max(1, math.ceil(version_browser.total / VersionBrowser.PAGE_SIZE))
+        row.label(text=f"Page {version_browser.page + 1} of {pages} ({version_browser.total} backups)")
+        sub = row.row(align=True)
+        sub.enabled = version_browser.has_next
+        sub.operator("wm.flowify_browse_versions", text="", icon='TRIA_RIGHT').action = 'NEXT'
+        row.operator("wm.flowify_browse_versions", text="", icon='FILE_REFRESH').action = 'REFRESH'
+
+        layout.template_list("FLOWIFY_UL_Versions", "", wm, "flowify_versions", wm, "flowify_version_index", rows=8)
+        if 0 <= wm.flowify_version_index < len(wm.flowify_versions):
+            item = wm.flowify_versions[wm.flowify_version_index]
+            icon_value = thumbnail_cache.icon_id(item.thumbnail_key, item.filepath)
+            if icon_value:
+                layout.template_icon(icon_value=icon_value, scale=8.0)
+            layout.operator_context = 'EXEC_DEFAULT'
+            layout.operator("wm.flowify_open_project", text=f"Open {item.name}", icon='FILE').filepath = item.filepath
+            row = layout.row(align=True)
+            row.operator("wm.flowify_compare_versions", icon='ARROW_LEFTRIGHT')
+            row.operator_context = 'INVOKE_DEFAULT'
+            row.operator("wm.flowify_restore_datablocks", text="Restore Datablocks",
+                         icon='APPEND_BLEND').filepath = item.filepath
+            comparison = version_browser.comparison
+            if comparison and comparison.filepath == item.filepath:
+                self.draw_comparison(layout.box(), comparison)
+
+    CHANGE_LINES = 12
+
+    def draw_comparison(self, box, comparison):
+        box.label(text=", ".join(f"{count} {kind}" for kind, (count, size) in sorted(comparison.summary.items())
+                                 if kind in ('Object', 'Mesh', 'Image', 'Scene')) or "No datablocks")
+        if comparison.previous is None:
+            box.label(text="First backup, nothing to compare against")
+            return
+        box.label(text=f"Since {Path(comparison.previous).name}:")
+        lines = [('ADD', f"{kind} {name}") for kind, name in comparison.added]
+        lines += [('REMOVE', f"{kind} {name}") for kind, name in comparison.removed]
+        lines += [('MODIFIER', f"{kind} {name}: {old / 1024:.0f} KB -> {new / 1024:.0f} KB")
+                  for kind, name, old, new in comparison.resized]
+        if not lines:
+            box.label(text="No datablock changes", icon='CHECKMARK')
+        for icon, text in lines[:self.CHANGE_LINES]:
+            box.label(text=text, icon=icon)
+        if len(lines) > self.CHANGE_LINES:
+            box.label(text=f"... and {len(lines) - self.CHANGE_LINES} more")
@@ -0,0 +1,278 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+import datetime
+from pathlib import Path
+import os
+import re
+import hashlib
+import gzip
+import lzma
+import zlib
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class RecentFilesCache:
+    """Recent .blend files, re-read only when recent-files.txt changes and stat-ed in the background."""
+    MAX_ITEMS = 10
+
+    def __init__(self, path=None):
+        self.path = path
+        self.signature = None
+        self.files = []
+        self.names = []
+        self.status = {}
+        self.items = [("NONE", "No recent files", "")]
+        # Blender reads enum item strings after the callback returns
+        self._retired_items = None
+        self._items_stale = False
+        self.executor = None
+
+    def refresh(self):
+        recent_file_path = self.path or Path(bpy.utils.user_resource('CONFIG')) / "recent-files.txt"
+        try:
+            stat = recent_file_path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self.signature:
+            return
+        self.signature = signature
+
+        recent_files = []
+        if signature is not None:
+            with recent_file_path.open('r', encoding='utf-8') as f:
+                for line in f:
+                    file_path = line.strip()
+                    if file_path and Path(file_path).suffix.lower() == '.blend':
+                        recent_files.append(file_path)
+        self.files = recent_files
+        self.names = [Path(file_path).name for file_path in recent_files]
+        self.status = {}
+        self._items_stale = True
+        self._stat_in_background(signature)
+
+    def _stat_in_background(self, signature):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="flowify_recent")
+        for file_path in self.files:
+            future = self.executor.submit(self._stat, file_path)
+            future.add_done_callback(lambda f, file_path=file_path: f.cancelled() or
+                                     self._stat_done(signature, file_path, f.result()))
+
+    @staticmethod
+    def _stat(file_path):
+        try:
+            return True, os.stat(file_path).st_size
+        except OSError:
+            return False, 0
+
+    def _stat_done(self, signature, file_path, result):
+        if signature == self.signature:
+            self.status[file_path] = result
+            self._items_stale = True
+
+    def get_items(self):
+        """Enum items for the recent-files dialog, rebuilt only when something changed."""
+        self.refresh()
+        if self._items_stale:
+            self._items_stale = False
+            items = []
+            for file_path, name in zip(self.files[:self.MAX_ITEMS], self.names):
+                status = self.status.get(file_path)
+                if status is None:
+                    items.append((file_path, name, file_path))
+                elif status[0]:
+                    items.append((file_path, name, f"{file_path} ({status[1] / (1024 * 1024):.1f} MB)"))
+                else:
+                    items.append((file_path, f"{name} (missing)", file_path))
+            self._retired_items = self.items
+            self.items = items or [("NONE", "No recent files", "")]
+        return self.items
+
+    def exists(self, file_path):
+        """Use the background stat result when there is one."""
+        status = self.status.get(file_path)
+        if status is None:
+            return Path(file_path).exists()
+        return status[0]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+recent_files_cache = RecentFilesCache()
+
+def get_recent_files():
+    """Retrieve recent .blend files from recent-files.txt."""
+    recent_files_cache.refresh()
+    return recent_files_cache.files
+
+VERSION_PATTERN = r'_v(\d{3})$'
+
+TIMESTAMP_PATTERN = r'_backup_\d{8}_\d{2}-\d{2}-\d{2}(?:_\d{3})?$'
+
+TIMESTAMP_FIELDS = r'_backup_(\d{2})(\d{2})(\d{4})_(\d{2})-(\d{2})-(\d{2})(?:_(\d{3}))?$'
+
+STAGING_DIR = '.flowify_staging'
+
+# Tells this session's journal entries apart from ones a crashed session left behind
+SESSION_ID = uuid.uuid4().hex
+
+def data_dir():
+    """Where the catalog and stores live; FLOWIFY_DATA_DIR points batch jobs at a shared location."""
+    override = os.environ.get('FLOWIFY_DATA_DIR')
+    if override:
+        return Path(override)
+    return Path(bpy.utils.extension_path_user('flowify_saver_pro'))
+
+def backup_base_name(stem):
+    """Strip a versioned or timestamped backup suffix from a file stem."""
+    return re.sub(TIMESTAMP_PATTERN, '', re.sub(VERSION_PATTERN, '', stem))
+
+def parse_backup_name(filepath):
+    """Split a backup's name into (base_name, version, timestamp); parts that do not apply are None."""
+    stem = strip_compression_suffix(Path(filepath)).stem
+    match = re.search(VERSION_PATTERN, stem)
+    if match:
+        return stem[:match.start()], int(match.group(1)), None
+    match = re.search(TIMESTAMP_FIELDS, stem)
+    if not match:
+        return stem, None, None
+    day, month, year, hour, minute, second, counter = (int(field or 0) for field in match.groups())
+    try:
+        timestamp = datetime.datetime(year, month, day, hour, minute, second, counter)
+    except ValueError:
+        timestamp = None
+    return stem[:match.start()], None, timestamp
+
+def file_digest(filepath, limiter=None):
+    """Stream a file through BLAKE2b and return its hex digest."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filepath, 'rb') as f:
+        while block := f.read(1024 * 1024):
+            if limiter is not None:
+                limiter.consume(len(block))
+            digest.update(block)
+    return digest.hexdigest()
+
+COMPRESSION_SUFFIXES = {'ZSTD': '.zst', 'GZIP': '.gz', 'LZMA': '.xz'}
+
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+def strip_compression_suffix(filepath):
+    """Return the .blend path a streamed-compressed backup decompresses to."""
+    filepath = Path(filepath)
+    if filepath.suffix in COMPRESSION_SUFFIXES.values():
+        return filepath.with_suffix('')
+    return filepath
+
+def is_blend_path(filepath):
+    return strip_compression_suffix(filepath).suffix.lower() == '.blend'
+
+def is_backup_path(filepath):
+    """A compressed .blend, or a .blend whose name carries a version or timestamp suffix."""
+    filepath = Path(filepath)
+    if not is_blend_path(filepath):
+        return False
+    blend_path = strip_compression_suffix(filepath)
+    return blend_path != filepath or backup_base_name(blend_path.stem) != blend_path.stem
+
+def open_compressed(raw, codec, level):
+    """Wrap a binary file opened for writing in a gzip, xz or zstd stream."""
+    if codec == 'GZIP':
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=min(max(level, 1), 9), mtime=0)
+    if codec == 'LZMA':
+        return lzma.LZMAFile(raw, 'wb', preset=min(level, 9))
+    return zstandard.ZstdCompressor(level=min(max(level, 1), 22)).stream_writer(raw, closefd=False)
+
+def compress_file(src_path, dst_path, codec, level):
+    """Stream src into dst with the given codec, one block at a time."""
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as raw:
+        with open_compressed(raw, codec, level) as dst:
+            shutil.copyfileobj(src, dst, STREAM_BLOCK_SIZE)
+
+DECODE_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard else ())
+
+def stream_codec(f):
+    """Sniff the codec of a file opened for binary reading, leaving it at the start."""
+    magic = f.read(6)
+    f.seek(0)
+    if magic.startswith(b'\x1f\x8b'):
+        return 'GZIP'
+    if magic.startswith(b'\xfd7zXZ\x00'):
+        return 'LZMA'
+    if magic.startswith(b'\x28\xb5\x2f\xfd'):
+        return 'ZSTD'
+    return 'NONE'
+
+def decompressing_reader(f, codec):
+    """Wrap a binary file opened for reading in a decoder for codec."""
+    if codec == 'GZIP':
+        return gzip.GzipFile(fileobj=f, mode='rb')
+    if codec == 'LZMA':
+        return lzma.LZMAFile(f, 'rb')
+    if codec == 'ZSTD' and zstandard is not None:
+        # Blender writes one frame per block plus a seek table
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True, read_across_frames=True)
+    return f
+
+def open_decompressed(filepath):
+    """Open a backup for reading, decompressing gzip, xz or zstd streams on the fly."""
+    f = open(filepath, 'rb')
+    return decompressing_reader(f, stream_codec(f))
+
+def decompress_file(src_path, dst_path):
+    with open_decompressed(src_path) as src, open(dst_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, STREAM_BLOCK_SIZE)
+
+def fsync_directory(directory):
+    """Flush a directory's entries, such as a rename into it."""
+    if os.name != 'nt':
+        # Windows cannot open directories
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def durable_replace(src_path, dst_path):
+    """Flush src to disk, rename it over dst in one step and flush the directory entry."""
+    with open(src_path, 'r+b') as f:
+        os.fsync(f.fileno())
+    os.replace(src_path, dst_path)
+    fsync_directory(Path(dst_path).parent)
+
+def iter_project_files(roots, backups=False):
+    """Walk project trees for working .blend files, their backups (backups=True) or both (None)."""
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if filename.startswith('.') or not is_blend_path(path):
+                    continue
+                if backups is None or is_backup_path(path) == backups:
+                    yield path
@@ -0,0 +1,296 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import datetime
+import sqlite3
+from pathlib import Path
+import os
+import re
+import sys
+import struct
+import threading
+import time
+import ctypes
+import select
+
+from .utils import VERSION_PATTERN, backup_base_name, is_backup_path, strip_compression_suffix
+from .catalog import VersionDatabase
+
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'fuse.rclone', '9p', 'afs', 'ceph',
+                       'glusterfs', 'davfs', 'fuse.davfs2'}
+
+def filesystem_type(directory):
+    """Linux filesystem type of the mount holding directory, from /proc/self/mounts, or None."""
+    try:
+        with open('/proc/self/mounts', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    directory = str(directory)
+    best = None
+    for mount_point, fs_type in mounts:
+        # /proc/self/mounts escapes spaces as \040
+        mount_point = mount_point.replace('\\040', ' ')
+        inside = directory == mount_point or directory.startswith(mount_point.rstrip('/') + '/')
+        if inside and (best is None or len(mount_point) > len(best[0])):
+            best = (mount_point, fs_type)
+    return best[1] if best else None
+
+class Inotify:
+    """Minimal ctypes binding for Linux inotify, reporting files finished, moved or deleted in a directory."""
+    CLOSE_WRITE = 0x8
+    MOVED_FROM = 0x40
+    MOVED_TO = 0x80
+    DELETE = 0x200
+    DELETE_SELF = 0x400
+    MOVE_SELF = 0x800
+    Q_OVERFLOW = 0x4000
+    IGNORED = 0x8000
+    ISDIR = 0x40000000
+    WATCH_MASK = CLOSE_WRITE | MOVED_FROM | MOVED_TO | DELETE | DELETE_SELF | MOVE_SELF
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+
+    def add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self.directories[wd] = directory
+        return wd
+
+    def remove(self, wd):
+        self.directories.pop(wd, None)
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """Wait up to timeout seconds; return ([(directory, name, added)], overflowed, dropped directories)."""
+        events, overflowed, dropped = [], False, []
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return events, overflowed, dropped
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events, overflowed, dropped
+        offset = 0
+        while offset < len(buf):
+            wd, mask, cookie, length = self.EVENT.unpack_from(buf, offset)
+            name = os.fsdecode(buf[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0'))
+            offset += self.EVENT.size + length
+            if mask & self.Q_OVERFLOW:
+                overflowed = True
+            elif mask & (self.DELETE_SELF | self.MOVE_SELF | self.IGNORED):
+                if wd in self.directories:
+                    dropped.append(self.directories.pop(wd))
+            elif wd in self.directories and not mask & self.ISDIR:
+                events.append((self.directories[wd], name, bool(mask & (self.CLOSE_WRITE | self.MOVED_TO))))
+        return events, overflowed, dropped
+
+    def close(self):
+        os.close(self.fd)
+
+class DirectoryWatcher:
+    """Keeps the version catalog in step with backups added or removed outside the add-on."""
+    POLL_INTERVAL = 5.0
+    # Some SMB servers do not update directory mtimes, so list polled directories now and then regardless
+    FULL_POLL_EVERY = 12
+
+    def __init__(self):
+        self.thread = None
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.wanted = set()
+        self.inotify = None
+        self.watches = {}
+        self.polled = {}
+        self.poll_count = 0
+
+    def watch(self, directories):
+        """Watch exactly these directories from now on; returns immediately."""
+        with self.lock:
+            self.wanted = {Path(directory) for directory in directories}
+        if self.thread is None or not self.thread.is_alive():
+            self.stop.clear()
+            self.thread = threading.Thread(target=self._run, name="flowify_watch", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        if sys.platform.startswith('linux'):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None
+        next_poll = 0.0
+        try:
+            while not self.stop.is_set():
+                self._update_watches()
+                if self.inotify is not None and self.watches:
+                    events, overflowed, dropped = self.inotify.read(1.0)
+                    for directory in dropped:
+                        self.watches.pop(directory, None)
+                    if overflowed:
+                        for directory in list(self.watches):
+                            try:
+                                self.reconcile(directory)
+                            except (OSError, sqlite3.Error):
+                                self._drop(directory)
+                    self.apply(events)
+                else:
+                    self.stop.wait(1.0)
+                if time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + self.POLL_INTERVAL
+                    self.poll_count += 1
+                    for directory in list(self.polled):
+                        self._poll(directory)
+        finally:
+            if self.inotify is not None:
+                self.inotify.close()
+                self.inotify = None
+            self.watches.clear()
+            self.polled.clear()
+
+    def _update_watches(self):
+        with self.lock:
+            wanted = set(self.wanted)
+        for directory in set(self.watches) - wanted:
+            self.inotify.remove(self.watches.pop(directory))
+        for directory in set(self.polled) - wanted:
+            del self.polled[directory]
+        for directory in wanted - set(self.watches) - set(self.polled):
+            if not directory.is_dir():
+                continue
+            if self.inotify is not None and filesystem_type(directory) not in NETWORK_FILESYSTEMS:
+                try:
+                    # Watch before listing so nothing changed in between goes unseen
+                    self.watches[directory] = self.inotify.add(directory)
+                except OSError:
+                    pass
+            try:
+                listing = self.reconcile(directory)
+                if directory not in self.watches:
+                    self.polled[directory] = (directory.stat().st_mtime_ns, listing)
+            except (OSError, sqlite3.Error):
+                # Gone or unreadable; picked up again once it can be listed
+                self._drop(directory)
+
+    def _drop(self, directory):
+        wd = self.watches.pop(directory, None)
+        if wd is not None:
+            self.inotify.remove(wd)
+        self.polled.pop(directory, None)
+
+    @staticmethod
+    def _list(directory):
+        listing = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith('.') and is_backup_path(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    listing[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return listing
+
+    def reconcile(self, directory):
+        """List the directory once and make its catalog entries and version counters match."""
+        db = VersionDatabase()
+        listing = self._list(directory)
+        catalogued = {Path(row[1]).name for row in db.get_versions_under(directory) if Path(row[1]).parent == directory}
+        events = [(directory, name, True) for name in listing.keys() - catalogued]
+        events += [(directory, name, False) for name in catalogued - listing.keys()]
+        self.apply(events, (directory, listing))
+        return listing
+
+    def _poll(self, directory):
+        mtime, previous = self.polled[directory]
+        try:
+            current_mtime = directory.stat().st_mtime_ns
+            if current_mtime == mtime and self.poll_count % self.FULL_POLL_EVERY:
+                return
+            listing = self._list(directory)
+        except OSError:
+            return
+        events = [(directory, name, True) for name, stat in listing.items() if previous.get(name) != stat]
+        events += [(directory, name, False) for name in previous.keys() - listing.keys()]
+        self.polled[directory] = (current_mtime, listing)
+        try:
+            self.apply(events, (directory, listing))
+        except sqlite3.Error:
+            pass
+
+    def apply(self, events, listed=None):
+        """Apply (directory, name, added) events to the catalog in one transaction.
+
+        listed is (directory, listing) for a directory that was just listed in full.
+        """
+        if not events and listed is None:
+            return
+        db = VersionDatabase()
+        highest = {}
+        with db.transaction():
+            for directory, name, added in events:
+                path = directory / name
+                if name.startswith('.') or not is_backup_path(name):
+                    continue
+                base_name = backup_base_name(strip_compression_suffix(path).stem)
+                if not added:
+                    db.forget_version(path)
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                # Our own backups are catalogued with their checksum by commit_backups
+                if not db.is_catalogued(path):
+                    db.add_version(path, base_name=base_name, size=stat.st_size,
+                                   timestamp=datetime.datetime.fromtimestamp(stat.st_mtime))
+                match = re.search(VERSION_PATTERN, strip_compression_suffix(path).stem)
+                if match:
+                    key = (directory, base_name)
+                    highest[key] = max(highest.get(key, 0), int(match.group(1)))
+            listed_directory, listing = listed or (None, {})
+            for name in listing:
+                match = re.search(VERSION_PATTERN, strip_compression_suffix(name).stem)
+                if match:
+                    key = (listed_directory, backup_base_name(strip_compression_suffix(name).stem))
+                    highest[key] = max(highest.get(key, 0), int(match.group(1)))
+
+            for directory in {event[0] for event in events} | ({listed_directory} if listed else set()):
+                try:
+                    dir_mtime = directory.stat().st_mtime_ns
+                except OSError:
+                    continue
+                counters = db.get_version_counters(directory)
+                for base_name in counters.keys() | {key[1] for key in highest if key[0] == directory}:
+                    counter = counters.get(base_name)
+                    if counter is None and directory != listed_directory:
+                        continue
+                    # Never lower a counter, so numbers of deleted backups are not handed out again
+                    last_version = max(counter[0] if counter else 0, highest.get((directory, base_name), 0))
+                    db.set_version_counter(directory, base_name, last_version, dir_mtime)
+
+    def shutdown(self):
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+directory_watcher = DirectoryWatcher()
@@ -0,0 +1,89 @@
+"""Loads the add-on outside Blender against a stub bpy and shares the catalog fixture."""
+import importlib.util
+import sqlite3
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import pytest
+
+ADDON_DIR = Path(__file__).resolve().parent.parent / "flowify_saver_pro-0.9.1"
+
+
+class _Stub:
+    """Stands in for any Blender API object the add-on touches at import time."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+    def __getattr__(self, name):
+        return _Stub()
+
+    def __iter__(self):
+        return iter(())
+
+
+class _Types:
+    """bpy.types: every name is a plain base class the add-on's classes can derive from."""
+    def __getattr__(self, name):
+        base = type(name, (), {})
+        setattr(self, name, base)
+        return base
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    module.__getattr__ = lambda attr: _Stub()
+    sys.modules[name] = module
+    return module
+
+
+def _load_addon():
+    user_dir = tempfile.mkdtemp()
+    handlers = _module("bpy.app.handlers", persistent=lambda func: func)
+    app = _module("bpy.app", handlers=handlers, background=True, version=(4, 3, 0), binary_path="blender",
+                  timers=types.SimpleNamespace(register=lambda *a, **k: None, unregister=lambda *a: None,
+                                               is_registered=lambda func: False))
+    previews = _module("bpy.utils.previews", new=lambda: {}, remove=lambda collection: None)
+    utils = _module("bpy.utils", previews=previews, register_class=lambda cls: None,
+                    unregister_class=lambda cls: None, extension_path_user=lambda *a, **k: user_dir,
+                    user_resource=lambda *a, **k: user_dir)
+    props = types.SimpleNamespace(**{name: (lambda *a, **k: None) for name in (
+        "BoolProperty", "IntProperty", "FloatProperty", "EnumProperty", "StringProperty",
+        "PointerProperty", "CollectionProperty")})
+    _module("bpy", types=_Types(), props=props, app=app, utils=utils, data=_Stub(), context=_Stub(), ops=_Stub(),
+            path=types.SimpleNamespace(abspath=lambda path: path))
+    for name in ("gpu", "blf", "bgl", "gpu_extras"):
+        _module(name)
+    _module("gpu_extras.batch", batch_for_shader=_Stub())
+
+    spec = importlib.util.spec_from_file_location("flowify_saver_pro", ADDON_DIR / "__init__.py",
+                                                  submodule_search_locations=[str(ADDON_DIR)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["flowify_saver_pro"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+if "flowify_saver_pro" not in sys.modules:
+    _load_addon()
+
+from flowify_saver_pro.catalog import VersionDatabase  # noqa: E402
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """A fresh catalog held in memory, with the chunk and delta stores under tmp_path."""
+    monkeypatch.setenv("FLOWIFY_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(VersionDatabase, "_instance", None)
+    db = VersionDatabase()
+    memory = sqlite3.connect(":memory:", check_same_thread=False)
+    db.local.conn = memory
+    db._migrate()
+    yield db
+    db.close()
+    memory.close()
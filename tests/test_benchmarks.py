@@ -0,0 +1,59 @@
+"""Smoke tests for the benchmark suites that run without a Blender session, at tiny sizes."""
+import random
+
+from flowify_saver_pro import benchmarks
+
+
+def test_timing_summary():
+    assert benchmarks.timing_summary([0.3, 0.1, 0.2]) == {'runs': 3, 'min_seconds': 0.1, 'median_seconds': 0.2,
+                                                    'max_seconds': 0.3}
+
+
+def test_get_suffix_suite(catalog, tmp_path):
+    results = benchmarks.benchmark_get_suffix(tmp_path, counts=(3,), repeats=2)
+    assert [result['case'] for result in results] == ['warm/3', 'cold/3', 'timestamped/3']
+    assert all(result['runs'] == 2 for result in results)
+
+
+def test_recent_files_suite(tmp_path):
+    results = benchmarks.benchmark_recent_files(tmp_path, counts=(4,), repeats=2)
+    assert [result['case'] for result in results] == ['read/4', 'stat/4', 'cached/4']
+
+
+def test_catalog_suite(catalog, tmp_path):
+    results = benchmarks.benchmark_catalog(tmp_path, counts=(5,), repeats=2)
+    assert {result['case'] for result in results} == {
+        'latest/5', 'count/5', 'first_page/5', 'middle_page/5', 'tree/5'}
+
+
+def test_compression_suite(tmp_path):
+    sample = tmp_path / "sample.blend"
+    sample.write_bytes(b"BLENDER-v405" + bytes(64 * 1024))
+    results = benchmarks.benchmark_compression([sample], codecs=('GZIP', 'LZMA'))
+    assert [result['codec'] for result in results] == ['GZIP', 'LZMA']
+    assert all(0 < result['ratio'] < 1 for result in results)
+    assert list(tmp_path.iterdir()) == [sample]
+
+
+def test_delta_suite(catalog, tmp_path):
+    body = random.Random(0).randbytes(256 * 1024)
+    paths = []
+    for index in range(4):
+        paths.append(tmp_path / f"edit_{index}.blend")
+        # The same body each time, with a small edit at the front
+        paths[-1].write_bytes(bytes([index]) * 16 + body)
+    results = benchmarks.benchmark_delta(paths, keyframe_intervals=(1, 4))
+    keyframes, chain = results
+    assert keyframes['ratio'] == 1.0 and keyframes['max_chain_length'] == 0
+    assert chain['max_chain_length'] == 3
+    assert chain['stored_bytes'] < keyframes['stored_bytes']
+
+
+def test_compare_flags_only_regressions_over_the_noise_floor():
+    baseline = {'results': [{'suite': 'catalog', 'case': 'tree/5', 'median_seconds': 0.010},
+                            {'suite': 'catalog', 'case': 'count/5', 'median_seconds': 0.0001}]}
+    results = [{'suite': 'catalog', 'case': 'tree/5', 'median_seconds': 0.020},
+               {'suite': 'catalog', 'case': 'count/5', 'median_seconds': 0.0005}]
+    regressions = benchmarks.compare_benchmarks(results, baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("catalog tree/5")
+    assert results[1]['change']['median_seconds'] > 0.2
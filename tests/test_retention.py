@@ -0,0 +1,246 @@
+"""Retention policy and pruning tests, run outside Blender against a stub bpy."""
+import datetime
+from pathlib import Path
+
+# Loaded against the stub bpy by conftest.py
+from flowify_saver_pro.retention import RetentionPolicy, prune_backups
+from flowify_saver_pro.stores import ChunkStore, DeltaStore
+
+NOW = datetime.datetime(2026, 6, 30, 12, 0)
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+
+
+def history(days=182, every=datetime.timedelta(minutes=30), size=1):
+    """One backup every `every` for `days` days before NOW, newest first."""
+    entries = []
+    timestamp = NOW - every
+    while timestamp > NOW - datetime.timedelta(days=days):
+        entries.append((f"backup_{len(entries)}", timestamp, size))
+        timestamp -= every
+    return entries
+
+
+def reasons(delete):
+    return {entry[0]: reason for entry, reason in delete}
+
+
+def test_every_entry_is_kept_or_deleted_once():
+    entries = history()
+    keep, delete = RetentionPolicy(keep_last=10, hourly_hours=24, daily_days=30, weekly_weeks=12).select(entries, NOW)
+    assert len(keep) + len(delete) == len(entries)
+    assert {e[0] for e in keep}.isdisjoint(reasons(delete))
+
+
+def test_keep_last_survives_thinning():
+    entries = history(days=1, every=datetime.timedelta(minutes=5))
+    keep, _ = RetentionPolicy(keep_last=10, hourly_hours=24, daily_days=0).select(entries, NOW)
+    assert [e[0] for e in keep[:10]] == [e[0] for e in entries[:10]]
+
+
+def test_keep_last_only():
+    entries = history(days=7)
+    keep, delete = RetentionPolicy(keep_last=5, hourly_hours=0, daily_days=0, weekly_weeks=1).select(entries, NOW)
+    # Anything past the newest five falls straight into the weekly tier, one per ISO week
+    assert keep[:5] == entries[:5]
+    weeks = [e[1].isocalendar()[:2] for e in keep[5:]]
+    assert len(weeks) == len(set(weeks))
+
+
+def test_hourly_tier_keeps_newest_per_hour():
+    entries = history(days=2, every=datetime.timedelta(minutes=10))
+    keep, delete = RetentionPolicy(keep_last=0, hourly_hours=24, daily_days=0, weekly_weeks=0).select(entries, NOW)
+    hourly = [e for e in keep if NOW - e[1] < 24 * HOUR]
+    hours = [e[1].strftime('%Y%m%d%H') for e in hourly]
+    assert len(hours) == len(set(hours)) == 24
+    for kept in hourly:
+        same_hour = [e for e in entries if e[1].strftime('%Y%m%d%H') == kept[1].strftime('%Y%m%d%H')]
+        assert kept[1] == max(e[1] for e in same_hour)
+    assert set(reasons(delete).values()) == {"thinned"}
+
+
+def test_hour_to_day_boundary():
+    entries = [
+        ("hour", NOW - 24 * HOUR + datetime.timedelta(minutes=1), 1),
+        ("day", NOW - 24 * HOUR, 1),
+        ("same_day", NOW - 25 * HOUR, 1),
+    ]
+    keep, delete = RetentionPolicy(keep_last=0, hourly_hours=24, daily_days=30).select(entries, NOW)
+    assert [e[0] for e in keep] == ["hour", "day"]
+    assert reasons(delete) == {"same_day": "thinned"}
+
+
+def test_daily_tier_keeps_one_per_day():
+    entries = history(days=40)
+    keep, _ = RetentionPolicy(keep_last=0, hourly_hours=24, daily_days=30, weekly_weeks=0).select(entries, NOW)
+    daily = [e for e in keep if 24 * HOUR <= NOW - e[1] < 24 * HOUR + 30 * DAY]
+    dates = [e[1].date() for e in daily]
+    assert len(dates) == len(set(dates))
+    assert len(dates) in (30, 31)
+
+
+def test_day_to_week_boundary():
+    edge = NOW - (24 * HOUR + 30 * DAY)
+    entries = [
+        ("day", edge + datetime.timedelta(minutes=1), 1),
+        ("week", edge, 1),
+        ("same_week", edge - datetime.timedelta(minutes=1), 1),
+    ]
+    keep, delete = RetentionPolicy(keep_last=0, hourly_hours=24, daily_days=30, weekly_weeks=4).select(entries, NOW)
+    assert [e[0] for e in keep] == ["day", "week"]
+    assert reasons(delete) == {"same_week": "thinned"}
+
+
+def test_weekly_tier_expires_after_window():
+    edge = NOW - (24 * HOUR + 30 * DAY + datetime.timedelta(weeks=12))
+    entries = [
+        ("inside", edge + datetime.timedelta(minutes=1), 1),
+        ("expired", edge, 1),
+    ]
+    keep, delete = RetentionPolicy(keep_last=0, hourly_hours=24, daily_days=30, weekly_weeks=12).select(entries, NOW)
+    assert [e[0] for e in keep] == ["inside"]
+    assert reasons(delete) == {"expired": "expired"}
+
+
+def test_six_months_tiers():
+    entries = history()
+    policy = RetentionPolicy(keep_last=10, hourly_hours=24, daily_days=30, weekly_weeks=12)
+    keep, delete = policy.select(entries, NOW)
+    weekly_end = 24 * HOUR + 30 * DAY + datetime.timedelta(weeks=12)
+
+    weekly = [e for e in keep if NOW - e[1] >= 24 * HOUR + 30 * DAY]
+    weeks = [e[1].isocalendar()[:2] for e in weekly]
+    assert len(weeks) == len(set(weeks))
+    assert all(NOW - e[1] < weekly_end for e in keep)
+    expired = [e for e, reason in delete if reason == "expired"]
+    assert expired and all(NOW - e[1] >= weekly_end for e in expired)
+    # 10 newest + the rest of the last day's hours + 30 days + about 12 weeks
+    assert 60 <= len(keep) <= 80
+
+
+def test_unlimited_weeks_never_expire():
+    entries = history()
+    _, delete = RetentionPolicy(keep_last=10, hourly_hours=24, daily_days=30, weekly_weeks=0).select(entries, NOW)
+    assert "expired" not in set(reasons(delete).values())
+
+
+def test_size_cap_drops_oldest_kept_first():
+    entries = history(size=100)
+    policy = RetentionPolicy(keep_last=10, hourly_hours=24, daily_days=30, weekly_weeks=12)
+    uncapped, _ = policy.select(entries, NOW)
+    policy.max_bytes = 100 * 25
+    keep, delete = policy.select(entries, NOW)
+    assert keep == uncapped[:25]
+    over = [e for e, reason in delete if reason == "over size limit"]
+    assert over == list(reversed(uncapped[25:]))
+
+
+def test_size_cap_keeps_newest_backup():
+    entries = history(days=3, size=1024)
+    keep, delete = RetentionPolicy(keep_last=10, max_bytes=1).select(entries, NOW)
+    assert keep == entries[:1]
+    assert len(delete) == len(entries) - 1
+
+
+def add_suffixed(db, directory, ages, size=100):
+    """Write and catalog shot_v001... with the given ages, newest first."""
+    directory.mkdir(exist_ok=True)
+    paths = []
+    for number, age in enumerate(ages, start=1):
+        path = directory / f"shot_v{number:03d}.blend"
+        path.write_bytes(b"x" * size)
+        db.add_version(path, base_name="shot", size=size, timestamp=NOW - age)
+        paths.append(path)
+    return paths
+
+
+def set_timestamp(db, table, row_id, timestamp):
+    with db.transaction():
+        db.conn.execute(f"UPDATE {table} SET timestamp = ? WHERE id = ?", (timestamp.isoformat(), row_id))
+
+
+MONTHLY = RetentionPolicy(keep_last=3, hourly_hours=0, daily_days=0, weekly_weeks=4)
+
+
+def test_prune_deletes_expired_files_and_rows(catalog, tmp_path):
+    directory = tmp_path / "proj"
+    paths = add_suffixed(catalog, directory, [HOUR, 2 * HOUR, 3 * HOUR, 10 * DAY, 40 * DAY, 100 * DAY])
+    report = prune_backups(directory, "shot", MONTHLY, now=NOW)
+    assert sorted((name, reason) for name, size, reason in report.entries) == [
+        ("shot_v005.blend", "expired"), ("shot_v006.blend", "expired")]
+    assert report.freed_bytes == 200
+    assert [path.exists() for path in paths] == [True, True, True, True, False, False]
+    assert sorted(Path(row[1]).name for row in catalog.get_version_sizes(directory, "shot")) == [
+        "shot_v001.blend", "shot_v002.blend", "shot_v003.blend", "shot_v004.blend"]
+
+
+def test_prune_dry_run_deletes_nothing(catalog, tmp_path):
+    directory = tmp_path / "proj"
+    paths = add_suffixed(catalog, directory, [HOUR, 2 * HOUR, 3 * HOUR, 40 * DAY])
+    report = prune_backups(directory, "shot", MONTHLY, dry_run=True, now=NOW)
+    assert [name for name, size, reason in report.entries] == ["shot_v004.blend"]
+    assert report.summary().startswith("Would delete 1 backups")
+    assert all(path.exists() for path in paths)
+    assert len(catalog.get_version_sizes(directory, "shot")) == 4
+
+
+def test_prune_skips_protected_paths(catalog, tmp_path):
+    directory = tmp_path / "proj"
+    paths = add_suffixed(catalog, directory, [HOUR, 2 * HOUR, 3 * HOUR, 40 * DAY, 50 * DAY])
+    report = prune_backups(directory, "shot", MONTHLY, protected=[paths[3]], now=NOW)
+    assert [name for name, size, reason in report.entries] == ["shot_v005.blend"]
+    assert paths[3].exists() and not paths[4].exists()
+
+
+def add_delta_chain(db, store, directory, ages):
+    """Catalog a keyframe followed by deltas with the given ages and create their objects."""
+    ids = []
+    for index, age in enumerate(ages):
+        object_name = f"object_{len(list(store.root.iterdir()))}"
+        store.object_path(object_name).write_bytes(b"d" * 10)
+        version_id, _ = db.add_delta_version(directory, "shot", "DELTA" if index else "FULL",
+                                             ids[-1] if ids else None, index, object_name, 1000, 10)
+        set_timestamp(db, "delta_versions", version_id, NOW - age)
+        ids.append(version_id)
+    return ids
+
+
+def test_prune_keeps_a_delta_chain_a_kept_version_needs(catalog, tmp_path):
+    directory = tmp_path / "proj"
+    store = DeltaStore()
+    old_chain = add_delta_chain(catalog, store, directory, [200 * DAY, 199 * DAY])
+    live_chain = add_delta_chain(catalog, store, directory, [100 * DAY, 99 * DAY, HOUR])
+    policy = RetentionPolicy(keep_last=1, hourly_hours=0, daily_days=0, weekly_weeks=4)
+
+    # The live keyframe has expired on its own, but the newest delta cannot be rebuilt without it
+    doomed = {entry[0][0] for entry, reason in policy.select(
+        [(row, datetime.datetime.fromisoformat(row[2]), row[8]) for row in catalog.get_delta_versions(directory, "shot")],
+        NOW)[1]}
+    assert live_chain[0] in doomed
+
+    report = prune_backups(directory, "shot", policy, now=NOW)
+    assert sorted(name for name, size, reason in report.entries) == [
+        "shot v001 (delta)", "shot v002 (delta)"]
+    remaining = catalog.get_delta_versions(directory, "shot")
+    assert sorted(row[0] for row in remaining) == live_chain
+    assert sorted(path.name for path in store.root.iterdir()) == sorted(row[7] for row in remaining)
+    assert catalog.get_delta_chain(live_chain[-1]) == [row[7] for row in sorted(remaining)]
+    assert not set(old_chain) & {row[0] for row in remaining}
+
+
+def test_prune_removes_only_unshared_chunks(catalog, tmp_path):
+    directory = tmp_path / "proj"
+    store = ChunkStore()
+    shared, _ = store.put(b"shared chunk")
+    unique, _ = store.put(b"only in the old version")
+    old = catalog.add_manifest(directory, "shot", [(shared, 12), (unique, 23)], 35, 35)
+    catalog.add_manifest(directory, "shot", [(shared, 12)], 12, 0)
+    for manifest_id, version, timestamp, size, status in catalog.get_manifests(directory, "shot"):
+        set_timestamp(catalog, "manifests", manifest_id, NOW - (40 * DAY if version == old else HOUR))
+
+    report = prune_backups(directory, "shot", RetentionPolicy(keep_last=1, hourly_hours=0, daily_days=0,
+                                                                    weekly_weeks=4), now=NOW)
+    assert [name for name, size, reason in report.entries] == ["shot v001 (deduplicated)"]
+    assert [row[1] for row in catalog.get_manifests(directory, "shot")] == [2]
+    assert store.chunk_path(shared).exists()
+    assert not store.chunk_path(unique).exists()